@@ -0,0 +1,170 @@
+import gzip
+import re
+import zlib
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli est une dépendance optionnelle
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard est une dépendance optionnelle
+    zstandard = None
+
+
+_ACCEPT_ENCODING_RE = re.compile(r'\s*([a-z0-9*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?', re.IGNORECASE)
+
+
+def get_compression_level(encoding):
+    """Renvoie le niveau de compression configuré pour l'encodage."""
+    return settings.COMPRESSION_LEVELS[encoding]
+
+
+def gzip_compress(content, level):
+    """Compresse content au format gzip."""
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+def gzip_stream(chunks, level):
+    """Compresse un flux au format gzip ; chaque morceau est transmis dès qu'il est compressé."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def brotli_compress(content, level):
+    """Compresse content au format brotli."""
+    return brotli.compress(content, quality=level)
+
+
+def brotli_stream(chunks, level):
+    """Compresse un flux au format brotli ; chaque morceau est transmis dès qu'il est compressé."""
+    compressor = brotli.Compressor(quality=level)
+    for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def zstd_compress(content, level):
+    """Compresse content au format zstd."""
+    return zstandard.ZstdCompressor(level=level).compress(content)
+
+
+def zstd_stream(chunks, level):
+    """Compresse un flux au format zstd ; chaque morceau est transmis dès qu'il est compressé."""
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# Encodages disponibles, par ordre de préférence (zstd offre le meilleur compromis coût CPU / taille)
+CODECS = {}
+if zstandard is not None:
+    CODECS['zstd'] = (zstd_compress, zstd_stream)
+if brotli is not None:
+    CODECS['br'] = (brotli_compress, brotli_stream)
+CODECS['gzip'] = (gzip_compress, gzip_stream)
+
+
+def encode_etag(etag, encoding):
+    """
+        Renvoie l'ETag de la représentation compressée : « "3" » devient « "3-gzip" », « W/"3" » devient « W/"3-gzip" ».
+        Une représentation compressée est une autre représentation que la réponse non compressée :
+        elle ne peut pas partager son ETag fort (RFC 9110, section 8.8.3).
+    """
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def strip_etag_encoding(opaque_tag):
+    """Retire de la valeur d'un ETag (sans guillemets) le suffixe ajouté par encode_etag, s'il est présent."""
+    value, _, encoding = opaque_tag.rpartition('-')
+    return value if value and encoding in ('zstd', 'br', 'gzip') else opaque_tag
+
+
+def select_encoding(accept_encoding):
+    """
+        Renvoie l'encodage à utiliser d'après l'en-tête Accept-Encoding, ou None.
+        Les encodages refusés (q=0) sont ignorés ; à qualité égale, l'ordre de CODECS est retenu.
+    """
+    accepted = {}
+    for part in accept_encoding.split(','):
+        match = _ACCEPT_ENCODING_RE.match(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        accepted[match.group(1).lower()] = quality
+
+    wildcard = accepted.get('*', 0.0)
+    candidates = [
+        (accepted.get(encoding, wildcard), -position, encoding)
+        for position, encoding in enumerate(CODECS)
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+class APICompressionMiddleware:
+    """
+        Middleware compressant les réponses de l'API (COMPRESSION_PATH_PREFIXES).
+
+        Encodages : zstd et brotli lorsque les bibliothèques sont installées, gzip sinon.
+        Les réponses plus petites que COMPRESSION_MIN_SIZE ne sont pas compressées ;
+        les réponses en flux (StreamingHttpResponse) sont compressées morceau par morceau.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if not request.path.startswith(tuple(settings.COMPRESSION_PATH_PREFIXES)):
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = select_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compress, stream = CODECS[encoding]
+        level = get_compression_level(encoding)
+
+        if response.streaming:
+            # Les flux asynchrones ne sont pas compressés
+            if getattr(response, 'is_async', False):
+                return response
+            response.streaming_content = stream(response.streaming_content, level)
+            del response.headers['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+            compressed = compress(response.content, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # L'ETag dépend de l'encodage (« "3-gzip" ») et reste fort : il peut être renvoyé dans If-Match,
+        # get_if_match_version retire le suffixe avant de comparer le numéro de version
+        if response.has_header('ETag'):
+            response.headers['ETag'] = encode_etag(response.headers['ETag'], encoding)
+        response.headers['Content-Encoding'] = encoding
+        return response
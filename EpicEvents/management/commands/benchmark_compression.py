@@ -0,0 +1,113 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rich.console import Console
+from rich.table import Table
+
+from EpicEvents.compression import CODECS
+from EpicEvents.renderers import FastJSONRenderer
+from events.models import Event
+from events.serializers import EventDetailSerializer
+from profiles.models import User, Client
+
+
+class Command(BaseCommand):
+    """
+        Cette commande mesure le coût CPU de la compression des réponses de l'API
+        et les octets économisés, pour chaque encodage disponible et plusieurs niveaux.
+
+        La réponse mesurée est celle de all_events_details, construite en mémoire
+        (événements d'un trimestre chargé, clients répétés d'un événement à l'autre).
+    """
+    help = 'Mesurer le coût et le gain de la compression des réponses de l\'API'
+
+    # Niveaux mesurés pour chaque encodage, en plus du niveau configuré
+    LEVELS = {'gzip': [1, 6, 9], 'br': [1, 4, 6, 9], 'zstd': [1, 3, 6, 12]}
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument('--rows', type=int, default=10000, help="Nombre d'événements de la réponse")
+        parser.add_argument('--repeat', type=int, default=3, help='Nombre de répétitions (meilleur temps retenu)')
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande et affiche les résultats sous forme de tableau.
+        """
+        console = Console()
+        content = FastJSONRenderer().render(
+            EventDetailSerializer(self.build_events(options['rows']), many=True).data
+        )
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Encodage", style="cyan")
+        table.add_column("Niveau", style="cyan")
+        table.add_column("Temps (ms)", style="cyan")
+        table.add_column("Débit (Mo/s)", style="cyan")
+        table.add_column("Taille (octets)", style="cyan")
+        table.add_column("Octets économisés", style="cyan")
+
+        for encoding, (compress, _) in CODECS.items():
+            levels = sorted(set(self.LEVELS.get(encoding, [])) | {settings.COMPRESSION_LEVELS[encoding]})
+            for level in levels:
+                best, size = self.measure(compress, content, level, options['repeat'])
+                configured = " (configuré)" if level == settings.COMPRESSION_LEVELS[encoding] else ""
+                table.add_row(
+                    encoding,
+                    f"{level}{configured}",
+                    f"{best * 1000:.1f}",
+                    f"{len(content) / best / 1e6:.0f}",
+                    str(size),
+                    f"{100 * (1 - size / len(content)):.1f} %",
+                )
+
+        console.print(
+            f"[bold magenta]Compression de all_events_details : {options['rows']} événements, "
+            f"{len(content)} octets[/bold magenta]"
+        )
+        console.print(table)
+
+    def build_events(self, rows):
+        """
+            Construit des événements en mémoire pour un nombre réduit de clients, comme sur un trimestre chargé.
+        """
+        support_contacts = [User(full_name=f'Support {index}', role=User.ROLE_SUPPORT) for index in range(5)]
+        clients = [
+            Client(full_name=f'Client {index}', email=f'client{index}@example.com', phone_number='+33123456789')
+            for index in range(50)
+        ]
+        start = timezone.now()
+        events = []
+        for index in range(rows):
+            client = clients[index % len(clients)]
+            events.append(Event(
+                id=index + 1,
+                event_name=f'Événement {index}',
+                client=client,
+                client_contact=f'{client.email} {client.phone_number}',
+                contract_id=index + 1,
+                event_date_start=start + timedelta(hours=index),
+                event_date_end=start + timedelta(hours=index + 4),
+                support_contact=support_contacts[index % len(support_contacts)],
+                location='Springfield',
+                attendees=100 + index % 50,
+                notes='Installation de la salle la veille, traiteur sur place.',
+            ))
+        return events
+
+    def measure(self, compress, content, level, repeat):
+        """
+            Renvoie le meilleur temps de compression (secondes) et la taille compressée.
+        """
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            compressed = compress(content, level)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, len(compressed)
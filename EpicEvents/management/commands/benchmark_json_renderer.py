@@ -0,0 +1,100 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rich.console import Console
+from rich.table import Table
+
+from EpicEvents.renderers import FastJSONRenderer, fast_json_available
+from events.models import Event
+from events.serializers import EventDetailSerializer
+from profiles.models import User, Client
+
+
+class Command(BaseCommand):
+    """
+        Cette commande compare le temps de rendu JSON de la sortie d'EventDetailSerializer :
+        - JSONRenderer de DRF (json standard),
+        - FastJSONRenderer (orjson s'il est installé).
+
+        Les événements sont construits en mémoire : la base de données n'est pas utilisée,
+        seul le temps de rendu est mesuré.
+    """
+    help = 'Comparer le temps de rendu JSON des détails des événements'
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument('--rows', type=int, default=10000, help="Nombre d'événements rendus")
+        parser.add_argument('--repeat', type=int, default=5, help='Nombre de répétitions (meilleur temps retenu)')
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande et affiche les résultats sous forme de tableau.
+        """
+        console = Console()
+        rows = options['rows']
+        repeat = options['repeat']
+
+        data = EventDetailSerializer(self.build_events(rows), many=True).data
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Renderer", style="cyan")
+        table.add_column("Meilleur temps (ms)", style="cyan")
+        table.add_column("Taille (octets)", style="cyan")
+        table.add_column("Accélération", style="cyan")
+
+        renderers = [('JSONRenderer (json)', JSONRenderer())]
+        if fast_json_available():
+            renderers.append(('FastJSONRenderer (orjson)', FastJSONRenderer()))
+        else:
+            console.print("[bold yellow]orjson n'est pas installé : FastJSONRenderer utilise json.[/bold yellow]")
+
+        reference = None
+        for name, renderer in renderers:
+            best, size = self.measure(renderer, data, repeat)
+            reference = reference or best
+            table.add_row(name, f"{best * 1000:.1f}", str(size), f"x{reference / best:.1f}")
+
+        console.print(f"[bold magenta]Rendu de {rows} événements ({repeat} répétitions)[/bold magenta]")
+        console.print(table)
+
+    def build_events(self, rows):
+        """
+            Construit des événements en mémoire, avec leur client et leur contact support.
+        """
+        support_contact = User(full_name='Bart Simpson', role=User.ROLE_SUPPORT)
+        start = timezone.now()
+        events = []
+        for index in range(rows):
+            client = Client(full_name=f'Client {index}', email=f'client{index}@example.com')
+            events.append(Event(
+                id=index + 1,
+                event_name=f'Événement {index}',
+                client=client,
+                client_contact=f'client{index}@example.com +33123456789',
+                contract_id=index + 1,
+                event_date_start=start + timedelta(days=index),
+                event_date_end=start + timedelta(days=index, hours=4),
+                support_contact=support_contact,
+                location='Springfield',
+                attendees=100 + index % 50,
+                notes='Notes « accentuées » de l’événement',
+            ))
+        return events
+
+    def measure(self, renderer, data, repeat):
+        """
+            Renvoie le meilleur temps de rendu (secondes) et la taille du JSON produit.
+        """
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            content = renderer.render(data)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, len(content)
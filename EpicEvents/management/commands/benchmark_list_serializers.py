@@ -0,0 +1,104 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework import serializers
+from rich.console import Console
+from rich.table import Table
+
+from contracts.models import Contract
+from events.models import Event
+from events.serializers import EventListSerializer
+from profiles.models import User, Client
+
+
+class Command(BaseCommand):
+    """
+        Cette commande compare la sérialisation de la liste des événements (EventListSerializer) :
+        - chemin ModelSerializer (instanciation des modèles, puis champs DRF pour chaque ligne),
+        - chemin rapide ValuesListSerializer (requête .values_list() et convertisseurs précompilés).
+
+        Les données de mesure sont créées dans une transaction annulée à la fin de la commande.
+    """
+    help = 'Comparer la sérialisation des listes par ModelSerializer et par .values_list()'
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='Nombres de lignes mesurés'
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Nombre de répétitions (meilleur temps retenu)')
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande et affiche les résultats sous forme de tableau.
+        """
+        console = Console()
+        sizes = sorted(options['sizes'])
+        repeat = options['repeat']
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Lignes", style="cyan")
+        table.add_column("ModelSerializer (ms)", style="cyan")
+        table.add_column(".values_list() (ms)", style="cyan")
+        table.add_column("Accélération", style="cyan")
+
+        with transaction.atomic():
+            self.create_events(sizes[-1])
+            queryset = Event.objects.order_by('id')
+
+            for size in sizes:
+                # Chemin standard : ListSerializer avec jointures, comme avant le chemin rapide
+                model_time = self.measure(lambda: serializers.ListSerializer(
+                    queryset.select_related('client', 'support_contact')[:size], child=EventListSerializer()
+                ).data, repeat)
+                values_time = self.measure(lambda: EventListSerializer(queryset[:size], many=True).data, repeat)
+                table.add_row(
+                    str(size), f"{model_time * 1000:.1f}", f"{values_time * 1000:.1f}",
+                    f"x{model_time / values_time:.1f}"
+                )
+
+            # Les données de mesure ne sont pas conservées
+            transaction.set_rollback(True)
+
+        console.print(f"[bold magenta]Sérialisation de la liste des événements ({repeat} répétitions)[/bold magenta]")
+        console.print(table)
+
+    def create_events(self, count):
+        """
+            Crée count événements (avec leurs contrats) pour un client et un contact support temporaires.
+            bulk_create n'appelle pas save() : aucun effet secondaire n'est déclenché.
+        """
+        support_contact = User.objects.create_user(
+            email='benchmark-support@example.com', password=None, role=User.ROLE_SUPPORT, full_name='Benchmark'
+        )
+        client = Client.objects.bulk_create([
+            Client(email='benchmark-client@example.com', full_name='Client Benchmark', company_name='Benchmark')
+        ])[0]
+        contracts = Contract.objects.bulk_create(
+            [Contract(client=client) for _ in range(count)], batch_size=1000
+        )
+        Event.objects.bulk_create([
+            Event(
+                event_name=f'Événement {index}',
+                contract=contract,
+                client=client,
+                support_contact=support_contact if index % 2 else None,
+            )
+            for index, contract in enumerate(contracts)
+        ], batch_size=1000)
+
+    def measure(self, serialize, repeat):
+        """
+            Renvoie le meilleur temps de sérialisation (secondes).
+        """
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            serialize()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
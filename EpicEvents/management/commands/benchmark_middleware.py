@@ -0,0 +1,108 @@
+import sys
+import time
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import path
+from django.views.decorators.csrf import csrf_protect
+from rich.console import Console
+from rich.table import Table
+
+
+# Pile de middlewares unique utilisée avant l'aiguillage par chemin
+FULL_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'EpicEvents.compression.APICompressionMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'dbrouter.middleware.ReplicaRoutingMiddleware',
+]
+
+
+def ping(request):
+    """Vue de mesure : la réponse ne dépend d'aucune base de données."""
+    return HttpResponse(b'{}', content_type='application/json')
+
+
+# Les vues de l'API étaient décorées par csrf_protect
+urlpatterns = [
+    path('crm/ping/', ping),
+    path('crm/ping-csrf/', csrf_protect(ping)),
+    path('admin/ping/', ping),
+]
+
+
+class Command(BaseCommand):
+    """
+        Cette commande mesure le coût par requête de la pile de middlewares :
+        - pile complète unique (sessions, CSRF, authentification, messages, X-Frame-Options) et vue csrf_protect,
+        - pile allégée des routes de l'API (PathDispatchMiddleware),
+        - pile navigateur des autres routes, pour comparaison.
+
+        La vue mesurée ne fait aucun travail : seul le coût des middlewares est mesuré.
+    """
+    help = 'Mesurer le coût par requête de la pile de middlewares'
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument('--requests', type=int, default=20000, help='Nombre de requêtes par mesure')
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande et affiche les résultats sous forme de tableau.
+        """
+        console = Console()
+        count = options['requests']
+
+        measures = [
+            ("Pile complète (avant), /crm/", FULL_MIDDLEWARE, '/crm/ping-csrf/'),
+            ("Pile allégée de l'API, /crm/", settings.MIDDLEWARE, '/crm/ping/'),
+            ("Pile navigateur, /admin/", settings.MIDDLEWARE, '/admin/ping/'),
+        ]
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Configuration", style="cyan")
+        table.add_column("µs / requête", style="cyan")
+        table.add_column("Économie", style="cyan")
+
+        reference = None
+        for name, middleware, url in measures:
+            per_request = self.measure(middleware, url, count)
+            reference = reference or per_request
+            table.add_row(name, f"{per_request * 1e6:.1f}", f"{(reference - per_request) * 1e6:.1f} µs")
+
+        console.print(f"[bold magenta]Coût de la pile de middlewares ({count} requêtes)[/bold magenta]")
+        console.print(table)
+
+    def measure(self, middleware, url, count):
+        """
+            Renvoie le temps moyen (secondes) d'une requête GET authentifiée par jeton à travers la pile.
+        """
+        factory = RequestFactory()
+        with override_settings(MIDDLEWARE=middleware, ALLOWED_HOSTS=['testserver']):
+            handler = BaseHandler()
+            handler.load_middleware()
+
+            def request():
+                request = factory.get(url, HTTP_AUTHORIZATION='Bearer jeton', HTTP_ACCEPT_ENCODING='gzip')
+                request.urlconf = sys.modules[__name__]
+                return request
+
+            # Préchauffage
+            for _ in range(100):
+                handler.get_response(request())
+
+            start = time.perf_counter()
+            for _ in range(count):
+                handler.get_response(request())
+            return (time.perf_counter() - start) / count
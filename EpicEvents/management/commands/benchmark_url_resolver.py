@@ -0,0 +1,138 @@
+import time
+from django.contrib import admin
+from django.core.management.base import BaseCommand
+from django.urls import include, path
+from django.urls.resolvers import RegexPattern, URLResolver
+from rest_framework.routers import SimpleRouter
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rich.console import Console
+from rich.table import Table
+
+from EpicEvents import urls
+from changefeed.views import ChangeFeedView
+from profiles.views import ClientViewSet, UserViewSet
+from contracts.views import ContractViewSet
+from events.views import EventViewSet
+
+
+# Chemins mesurés : les routes des événements sont les plus sollicitées
+HOT_PATHS = [
+    '/crm/events/',
+    '/crm/events/42/',
+    '/crm/events/42/event_details/',
+    '/crm/events/events_without_support/',
+    '/crm/contracts/42/payments/',
+    '/crm/users/42/',
+]
+
+
+class LegacyURLConf:
+    """
+        Table de routage précédente, reconstruite pour comparaison : chaque ViewSet était enregistré
+        trois fois sur un routeur unique, suivi des chemins explicites.
+    """
+
+    def __init__(self):
+        router = SimpleRouter()
+        for prefix, viewset in [
+            ('users', UserViewSet), ('clients', ClientViewSet),
+            ('contracts', ContractViewSet), ('events', EventViewSet),
+        ]:
+            singular = prefix[:-1]
+            router.register(prefix, viewset, basename=prefix)
+            router.register(rf'{prefix}/(?P<{singular}_pk>\d+)/', viewset, basename=prefix)
+            router.register(
+                rf'{prefix}/(?P<{singular}_pk>\d+)/{singular}_details', viewset, basename=f'{singular}-details'
+            )
+
+        explicit = [
+            (UserViewSet, 'users', ['all_users_details'], 'user_details'),
+            (ClientViewSet, 'clients', ['all_clients_details'], 'client_details'),
+            (ContractViewSet, 'contracts', ['all_contracts_details', 'filtered_contracts'], 'contract_details'),
+            (EventViewSet, 'events', ['all_events_details', 'events_without_support'], 'event_details'),
+        ]
+
+        self.urlpatterns = [
+            path('admin/', admin.site.urls),
+            path('crm-auth/', include('rest_framework.urls')),
+            path('crm/login/', TokenObtainPairView.as_view()),
+            path('crm/token/refresh/', TokenRefreshView.as_view()),
+        ]
+        for viewset, prefix, collection_actions, details_action in explicit:
+            for action in collection_actions:
+                self.urlpatterns.append(path(f'crm/{prefix}/{action}/', viewset.as_view({'get': action})))
+            self.urlpatterns.append(
+                path(f'crm/{prefix}/{details_action}/<int:pk>/', viewset.as_view({'get': details_action}))
+            )
+        self.urlpatterns += [
+            path('crm/events/', EventViewSet.as_view({'get': 'events_list', 'post': 'create'})),
+            path('crm/changes/', ChangeFeedView.as_view()),
+            path('crm/', include(router.urls)),
+        ]
+
+
+def count_patterns(resolver):
+    """Renvoie le nombre de routes terminales d'un résolveur."""
+    return sum(
+        count_patterns(pattern) if isinstance(pattern, URLResolver) else 1
+        for pattern in resolver.url_patterns
+    )
+
+
+class Command(BaseCommand):
+    """
+        Cette commande compare la résolution des URLs de l'API entre l'ancienne table de routage
+        (ViewSets enregistrés trois fois) et la table actuelle regroupée par préfixe de ressource.
+
+        Pour chaque chemin, la résolution est répétée sur un résolveur déjà initialisé :
+        seul le parcours des routes est mesuré.
+    """
+    help = 'Mesurer le temps de résolution des URLs de l\'API'
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument('--iterations', type=int, default=20000, help='Nombre de résolutions par chemin')
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande et affiche les résultats sous forme de tableau.
+        """
+        console = Console()
+        iterations = options['iterations']
+
+        legacy = URLResolver(RegexPattern(r'^/'), LegacyURLConf())
+        current = URLResolver(RegexPattern(r'^/'), urls)
+
+        console.print(
+            f"[bold magenta]Routes : {count_patterns(legacy)} avant, {count_patterns(current)} après[/bold magenta]"
+        )
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Chemin", style="cyan")
+        table.add_column("Avant (µs)", style="cyan")
+        table.add_column("Après (µs)", style="cyan")
+        table.add_column("Accélération", style="cyan")
+
+        for url in HOT_PATHS:
+            before = self.measure(legacy, url, iterations)
+            after = self.measure(current, url, iterations)
+            table.add_row(url, f"{before * 1e6:.2f}", f"{after * 1e6:.2f}", f"x{before / after:.1f}")
+
+        console.print(table)
+
+    def measure(self, resolver, url, iterations):
+        """
+            Renvoie le temps moyen (secondes) de résolution du chemin par le résolveur.
+        """
+        # Préchauffage (compilation des expressions régulières)
+        for _ in range(100):
+            resolver.resolve(url)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            resolver.resolve(url)
+        return (time.perf_counter() - start) / iterations
@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.module_loading import import_string
+
+
+class MiddlewareChain:
+    """
+        Chaîne de middlewares construite comme le fait le gestionnaire de requêtes de Django
+        (BaseHandler.load_middleware), en mode synchrone.
+
+        Attributs:
+            handler: Point d'entrée de la chaîne.
+            view_middleware: Méthodes process_view, dans l'ordre d'appel.
+            template_response_middleware: Méthodes process_template_response, dans l'ordre d'appel.
+            exception_middleware: Méthodes process_exception, dans l'ordre d'appel.
+    """
+
+    def __init__(self, middleware_paths, get_response):
+        self.view_middleware = []
+        self.template_response_middleware = []
+        self.exception_middleware = []
+
+        handler = convert_exception_to_response(get_response)
+        for middleware_path in reversed(middleware_paths):
+            middleware = import_string(middleware_path)
+            try:
+                mw_instance = middleware(handler)
+            except MiddlewareNotUsed:
+                continue
+
+            if hasattr(mw_instance, 'process_view'):
+                self.view_middleware.insert(0, mw_instance.process_view)
+            if hasattr(mw_instance, 'process_template_response'):
+                self.template_response_middleware.append(mw_instance.process_template_response)
+            if hasattr(mw_instance, 'process_exception'):
+                self.exception_middleware.append(mw_instance.process_exception)
+
+            handler = convert_exception_to_response(mw_instance)
+
+        self.handler = handler
+
+
+def is_api_request(request):
+    """Indique si la requête vise une route de l'API (API_PATH_PREFIXES)."""
+    return request.path_info.startswith(tuple(settings.API_PATH_PREFIXES))
+
+
+class PathDispatchMiddleware:
+    """
+        Middleware aiguillant chaque requête vers une chaîne de middlewares selon son chemin.
+
+        Les routes de l'API (API_PATH_PREFIXES, authentifiées par jeton JWT) traversent API_MIDDLEWARE ;
+        les autres routes (admin/, crm-auth/, ...) traversent BROWSER_MIDDLEWARE
+        (sessions, CSRF, authentification, messages, protection contre l'intégration dans un cadre).
+
+        Les méthodes process_view, process_template_response et process_exception de la chaîne choisie
+        sont appelées par celles de ce middleware, qui doit donc être le dernier de MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.api_chain = MiddlewareChain(settings.API_MIDDLEWARE, get_response)
+        self.browser_chain = MiddlewareChain(settings.BROWSER_MIDDLEWARE, get_response)
+
+    def get_chain(self, request):
+        """Renvoie la chaîne de middlewares de la requête."""
+        return self.api_chain if is_api_request(request) else self.browser_chain
+
+    def __call__(self, request):
+        return self.get_chain(request).handler(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Appelle les méthodes process_view de la chaîne de la requête."""
+        for process_view in self.get_chain(request).view_middleware:
+            response = process_view(request, view_func, view_args, view_kwargs)
+            if response:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        """Appelle les méthodes process_template_response de la chaîne de la requête."""
+        for process_template_response in self.get_chain(request).template_response_middleware:
+            response = process_template_response(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        """Appelle les méthodes process_exception de la chaîne de la requête."""
+        for process_exception in self.get_chain(request).exception_middleware:
+            response = process_exception(request, exception)
+            if response:
+                return response
+        return None
@@ -0,0 +1,30 @@
+from django.db.models import QuerySet
+from rest_framework.pagination import LimitOffsetPagination
+
+
+class QuerySetLimitOffsetPagination(LimitOffsetPagination):
+    """
+        Pagination limit/offset renvoyant la page sous forme de queryset non évalué.
+
+        Le sérialiseur reçoit ainsi un queryset et peut utiliser une requête .values_list()
+        (ValuesListSerializer) au lieu d'instancier les modèles de la page.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Renvoie la page demandée ; un queryset est découpé sans être évalué."""
+        if not isinstance(queryset, QuerySet):
+            return super().paginate_queryset(queryset, request, view)
+
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = self.get_count(queryset)
+        self.offset = self.get_offset(request)
+        self.request = request
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return queryset[self.offset:self.offset + self.limit]
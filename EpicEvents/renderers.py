@@ -0,0 +1,85 @@
+import codecs
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson est une dépendance optionnelle
+    orjson = None
+
+
+# Les types non gérés nativement par orjson (Decimal, timedelta, chaînes paresseuses, querysets, ...)
+# sont convertis par l'encodeur de DRF afin que les deux moteurs produisent le même JSON
+_default_encoder = encoders.JSONEncoder()
+
+# Séparateurs de ligne échappés comme le fait JSONRenderer, pour un JSON utilisable dans du JavaScript
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+def fast_json_available():
+    """Indique si le moteur orjson est installé."""
+    return orjson is not None
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+        Renderer JSON utilisant orjson lorsqu'il est installé, sinon le JSONRenderer de DRF (json standard).
+
+        Les datetimes sont écrits au format ISO 8601 avec le suffixe 'Z' pour UTC, les Decimal en nombres
+        et les UUID en chaînes, comme avec l'encodeur de DRF. Le JSONRenderer de DRF est utilisé
+        pour les indentations autres que 2 espaces, que orjson ne sait pas produire.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Renvoie data sérialisé en JSON (bytes)."""
+        # orjson produit un JSON compact et non échappé (UNICODE_JSON et COMPACT_JSON par défaut)
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type or '', renderer_context or {})
+        if indent not in (None, 2):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        option = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+
+        try:
+            ret = orjson.dumps(data, default=_default_encoder.default, option=option)
+        except orjson.JSONEncodeError:
+            # Cas non gérés par orjson (entiers de plus de 64 bits, ...) : repli sur le JSON standard
+            return super().render(data, accepted_media_type, renderer_context)
+
+        for separator, escaped in _LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """
+        Parser JSON utilisant orjson lorsqu'il est installé, sinon le JSONParser de DRF (json standard).
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Renvoie le contenu JSON de la requête sous forme de données Python."""
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        # orjson ne lit que l'UTF-8 et refuse NaN et Infinity, comme le mode STRICT_JSON
+        if orjson is None or not self.strict or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            data = orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+        return data
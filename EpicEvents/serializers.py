@@ -0,0 +1,374 @@
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Manager, QuerySet
+from rest_framework import serializers
+from rest_framework.serializers import ValidationError
+
+from search.autocomplete import autocomplete_index
+
+
+class SparseFieldsetMixin:
+    """
+        Mixin de sérialiseur pour les ensembles de champs partiels (?fields= et ?exclude=).
+
+        Les champs non demandés sont retirés du sérialiseur, et le queryset est réduit en conséquence :
+        seules les colonnes des champs conservés sont chargées (only()) et seules les jointures
+        nécessaires sont effectuées (select_related()).
+
+        Attributs:
+            always_loaded_fields: Colonnes toujours chargées, même si le champ n'est pas demandé
+                                  (par exemple la version renvoyée dans l'en-tête ETag).
+    """
+    always_loaded_fields = []
+
+    def __init__(self, *args, fields=None, **kwargs):
+        """Retire du sérialiseur les champs absents de la liste fields, si elle est fournie."""
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def get_sparse_fields(cls, request):
+        """
+            Renvoie la liste des champs demandés via les paramètres ?fields= et ?exclude=,
+            ou None si aucun de ces paramètres n'est fourni.
+            Lève une ValidationError si un champ inconnu est demandé.
+        """
+        params = getattr(request, 'query_params', None)
+        if not params or not (params.get('fields') or params.get('exclude')):
+            return None
+
+        available = list(cls().fields)
+        requested = [name.strip() for name in params.get('fields', '').split(',') if name.strip()]
+        excluded = [name.strip() for name in params.get('exclude', '').split(',') if name.strip()]
+
+        unknown = [name for name in requested + excluded if name not in available]
+        if unknown:
+            raise ValidationError({'fields': f"Unknown field(s): {', '.join(unknown)}."})
+
+        fields = requested or available
+        return [name for name in available if name in fields and name not in excluded]
+
+    @classmethod
+    def from_request(cls, request, queryset):
+        """Renvoie le sérialiseur (many=True) du queryset réduit aux champs demandés dans la requête."""
+        fields = cls.get_sparse_fields(request)
+        return cls(cls.get_sparse_queryset(queryset, fields), many=True, fields=fields)
+
+    @classmethod
+    def get_sparse_queryset(cls, queryset, fields=None):
+        """
+            Restreint le queryset aux colonnes et jointures nécessaires aux champs conservés.
+            Si un champ dépend d'une valeur qui n'est pas une colonne (propriété, méthode),
+            seules les jointures sont restreintes et toutes les colonnes sont chargées.
+        """
+        model = queryset.model
+        columns = {model._meta.pk.name, *cls.always_loaded_fields}
+        joins = set()
+        prune_columns = True
+
+        for field in cls(fields=fields).fields.values():
+            if field.write_only:
+                continue
+            lookup = cls._get_field_lookup(model, field)
+            if lookup is None:
+                prune_columns = False
+                continue
+            field_columns, field_joins = lookup
+            columns.update(field_columns)
+            joins.update(field_joins)
+
+        if joins:
+            queryset = queryset.select_related(*sorted(joins))
+        if prune_columns:
+            queryset = queryset.only(*sorted(columns))
+        return queryset
+
+    @staticmethod
+    def _get_field_lookup(model, field):
+        """
+            Renvoie les colonnes et les jointures nécessaires à un champ du sérialiseur,
+            ou None si elles ne peuvent pas être déterminées.
+        """
+        if field.source == '*':
+            return None
+
+        path, current = [], model
+        model_field = None
+        for attr in field.source_attrs:
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return None
+            if model_field.many_to_many or model_field.one_to_many:
+                return None
+            path.append(attr)
+            if not model_field.is_relation:
+                break
+            current = model_field.related_model
+
+        joins = {'__'.join(path[:index]) for index in range(1, len(path))}
+        columns = {'__'.join(path[:index]) for index in range(1, len(path) + 1)}
+
+        if model_field.is_relation:
+            # Une clé primaire seule est lue dans la colonne de la clé étrangère, sans jointure
+            use_pk_only = getattr(field, 'use_pk_only_optimization', lambda: False)()
+            if not use_pk_only:
+                joins.add('__'.join(path))
+                slug_field = getattr(field, 'slug_field', None)
+                if slug_field is None:
+                    return None
+                columns.add('__'.join(path + [slug_field]))
+
+        return columns, joins
+
+
+class SparseFieldsetViewMixin:
+    """
+        Mixin de ViewSet appliquant les ensembles de champs partiels (?fields= et ?exclude=)
+        des sérialiseurs SparseFieldsetMixin aux actions de lecture.
+
+        Attributs:
+            sparse_actions: Actions dont le queryset et le sérialiseur (get_serializer_class())
+                            sont réduits aux champs demandés.
+            details_action: Action '<ressource>_details', dont le queryset est réduit aux champs
+                            de details_serializer_class.
+            details_serializer_class: Sérialiseur de l'action details_action.
+            details_owner_field: Champ désignant l'utilisateur propriétaire de l'objet, filtré pour l'action
+                                 details_action, ou None si tous les objets sont accessibles.
+    """
+    sparse_actions = ('list', 'retrieve')
+    details_action = None
+    details_serializer_class = None
+    details_owner_field = None
+
+    def get_queryset(self):
+        """
+            Retourne le queryset en fonction de l'action de la vue.
+
+            Pour l'action details_action, le filtre de propriété (details_owner_field) est appliqué
+            directement dans la requête afin qu'un objet non autorisé ne soit jamais chargé.
+            Pour les actions de lecture, le queryset est réduit aux champs demandés (?fields= / ?exclude=).
+        """
+        queryset = super().get_queryset()
+        if self.details_action is not None and self.action == self.details_action:
+            if self.details_owner_field:
+                queryset = queryset.filter(**{self.details_owner_field: self.request.user})
+            serializer_class = self.details_serializer_class
+        elif self.action in self.sparse_actions:
+            serializer_class = self.get_serializer_class()
+        else:
+            return queryset
+        return serializer_class.get_sparse_queryset(queryset, serializer_class.get_sparse_fields(self.request))
+
+    def get_serializer(self, *args, **kwargs):
+        """Retourne le sérialiseur en ne conservant que les champs demandés pour les actions de lecture."""
+        if self.action in self.sparse_actions:
+            kwargs.setdefault('fields', self.get_serializer_class().get_sparse_fields(self.request))
+        return super().get_serializer(*args, **kwargs)
+
+
+class FuzzySlugRelatedField(serializers.SlugRelatedField):
+    """
+        SlugRelatedField dont la valeur peut être résolue de façon approximative à l'aide de l'index
+        de trigrammes en mémoire (search.autocomplete), sans requête LIKE '%...%'.
+
+        La correspondance exacte est toujours essayée en premier. En cas d'échec, selon le mode
+        (réglage FUZZY_NAME_RESOLUTION, remplaçable par le paramètre ?fuzzy= de la requête) :
+        - 'off' : l'erreur de SlugRelatedField est renvoyée telle quelle.
+        - 'suggest' : l'erreur propose les noms les plus proches.
+        - 'resolve' : le nom le plus proche est retenu s'il est suffisamment similaire et sans ex aequo,
+                      sinon l'erreur propose les noms les plus proches.
+        Le champ ne construit jamais l'index : tant qu'il ne l'est pas, seule la correspondance exacte est utilisée.
+
+        Attributs:
+            fuzzy_scope: Périmètre de l'index ('clients', 'sales', 'support' ou 'management').
+    """
+    FUZZY_MODES = ('off', 'suggest', 'resolve')
+
+    # Similarités minimales pour proposer et pour retenir un nom
+    suggest_min_similarity = 0.3
+    resolve_min_similarity = 0.5
+
+    def __init__(self, *args, fuzzy_scope, **kwargs):
+        """Initialise le champ avec le périmètre de l'index utilisé pour la résolution approximative."""
+        super().__init__(*args, **kwargs)
+        self.fuzzy_scope = fuzzy_scope
+
+    def get_fuzzy_mode(self):
+        """Renvoie le mode de résolution : paramètre ?fuzzy= de la requête, sinon réglage FUZZY_NAME_RESOLUTION."""
+        request = self.context.get('request')
+        mode = getattr(request, 'query_params', {}).get('fuzzy')
+        if mode not in self.FUZZY_MODES:
+            mode = getattr(settings, 'FUZZY_NAME_RESOLUTION', 'suggest')
+        return mode
+
+    def to_internal_value(self, data):
+        """Résout le nom exact, puis selon le mode le nom le plus proche."""
+        try:
+            return super().to_internal_value(data)
+        except ValidationError as error:
+            mode = self.get_fuzzy_mode()
+            if mode == 'off' or not isinstance(data, str):
+                raise
+
+            matches = autocomplete_index.nearest(
+                self.fuzzy_scope, data, min_similarity=self.suggest_min_similarity
+            )
+            if matches is None:
+                # L'index n'est pas encore construit : correspondance exacte uniquement
+                raise
+            if mode == 'resolve':
+                resolved = self.resolve_nearest(matches)
+                if resolved is not None:
+                    return resolved
+
+            if not matches:
+                raise
+            names = ', '.join(match['full_name'] for similarity, match in matches)
+            raise ValidationError(list(error.detail) + [f"Did you mean: {names}?"])
+
+    def resolve_nearest(self, matches):
+        """Renvoie l'objet le plus proche s'il est suffisamment similaire et sans ex aequo, sinon None."""
+        if not matches or matches[0][0] < self.resolve_min_similarity:
+            return None
+        if len(matches) > 1 and matches[1][0] == matches[0][0]:
+            return None
+        # Le queryset du champ s'applique toujours (rôle attendu, objet supprimé entre-temps)
+        return self.get_queryset().filter(pk=matches[0][1]['id']).first()
+
+
+class ValuesListSerializer(serializers.ListSerializer):
+    """
+        ListSerializer en lecture seule exécutant une requête .values_list() pour les querysets.
+
+        Les modèles ne sont pas instanciés et les champs DRF ne sont pas parcourus pour chaque ligne :
+        chaque tuple est converti en dictionnaire selon le plan précompilé du sérialiseur enfant.
+        Les listes d'objets et les sérialiseurs dont le plan ne peut pas être établi utilisent le chemin standard.
+    """
+
+    def to_representation(self, data):
+        """Renvoie la liste des dictionnaires représentant data."""
+        if isinstance(data, Manager):
+            data = data.all()
+        if isinstance(data, QuerySet):
+            plan = self.child.get_values_plan()
+            if plan is not None:
+                return plan.serialize(data)
+        return super().to_representation(data)
+
+
+class ValuesPlan:
+    """
+        Plan de sérialisation d'un queryset à partir de .values_list().
+
+        Attributs:
+            lookups: Colonnes lues par la requête.
+            entries: Pour chaque champ, (nom, indice de la colonne, indice de la colonne de garde, convertisseur).
+                     La colonne de garde est la clé étrangère d'une source imbriquée : si elle est vide,
+                     le champ est omis, comme le fait DRF. Le convertisseur est None lorsque la valeur
+                     de la base est déjà la représentation attendue.
+    """
+
+    # Champs dont la représentation est la valeur lue en base
+    IDENTITY_FIELDS = (
+        serializers.CharField,
+        serializers.IntegerField,
+        serializers.FloatField,
+        serializers.BooleanField,
+        serializers.ReadOnlyField,
+        serializers.RelatedField,
+    )
+
+    def __init__(self):
+        self.lookups = []
+        self.entries = []
+
+    def add(self, name, field, lookup, guard=None):
+        """Ajoute un champ au plan."""
+        converter = None if isinstance(field, self.IDENTITY_FIELDS) else field.to_representation
+        self.entries.append((
+            name,
+            self._index(lookup),
+            self._index(guard) if guard else None,
+            converter,
+        ))
+
+    def _index(self, lookup):
+        """Renvoie l'indice de la colonne dans la requête, en l'ajoutant si nécessaire."""
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return self.lookups.index(lookup)
+
+    def serialize(self, queryset):
+        """Exécute la requête et renvoie la liste des dictionnaires."""
+        rows = queryset.values_list(*self.lookups)
+        entries = self.entries
+
+        # Cas le plus fréquent : colonnes plates, sans conversion ni garde
+        if all(guard is None and converter is None for _, _, guard, converter in entries) and \
+                [index for _, index, _, _ in entries] == list(range(len(self.lookups))):
+            names = [name for name, _, _, _ in entries]
+            return [dict(zip(names, row)) for row in rows]
+
+        result = []
+        for row in rows:
+            item = {}
+            for name, index, guard, converter in entries:
+                if guard is not None and row[guard] is None:
+                    continue
+                value = row[index]
+                item[name] = value if converter is None or value is None else converter(value)
+            result.append(item)
+        return result
+
+
+class ValuesSerializerMixin:
+    """
+        Mixin de sérialiseur fournissant le plan utilisé par ValuesListSerializer
+        (à déclarer dans Meta.list_serializer_class) pour les listes (many=True).
+    """
+
+    def get_values_plan(self):
+        """
+            Renvoie le plan de sérialisation des champs du sérialiseur,
+            ou None si un champ ne correspond pas à une colonne.
+        """
+        model = self.Meta.model
+        plan = ValuesPlan()
+
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*':
+                return None
+
+            path, current, model_field = [], model, None
+            for attr in field.source_attrs:
+                if current is None:
+                    return None
+                try:
+                    model_field = current._meta.get_field(attr)
+                except FieldDoesNotExist:
+                    return None
+                if model_field.many_to_many or model_field.one_to_many:
+                    return None
+                path.append(attr)
+                current = model_field.related_model if model_field.is_relation else None
+
+            if model_field.is_relation:
+                if not isinstance(field, serializers.RelatedField):
+                    return None
+                # Une clé primaire est lue dans la colonne de la clé étrangère, un slug dans la table liée
+                if not getattr(field, 'use_pk_only_optimization', lambda: False)():
+                    slug_field = getattr(field, 'slug_field', None)
+                    if slug_field is None:
+                        return None
+                    path = path + [slug_field]
+                plan.add(name, field, '__'.join(path))
+            else:
+                guard = '__'.join(path[:-1]) if len(path) > 1 else None
+                plan.add(name, field, '__'.join(path), guard)
+
+        return plan
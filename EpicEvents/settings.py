@@ -33,8 +33,15 @@ DB_USER = config('DB_USER', default='')
 DB_PASSWORD = config('DB_PASSWORD', default='')
 DB_HOST = config('DB_HOST', default='')
 DB_PORT = config('DB_PORT', default='')
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+DB_REPLICA_PORT = config('DB_REPLICA_PORT', default='') or DB_PORT
 SENTRY_DSN = config('SENTRY_DSN', default='')
 
+# Mode de livraison des effets secondaires des sauvegardes (boîte d'envoi transactionnelle)
+# 'inline' : exécutés immédiatement pendant la requête
+# 'worker' : écrits dans la table outbox et traités par la commande run_outbox_worker
+OUTBOX_DELIVERY = config('OUTBOX_DELIVERY', default='inline') or 'inline'
+
 # Affiche le contenu de SENTRY_DSN (pour débogage)
 # Décommenter pour vérifier la clé "SENTRY_DSN"
 # print("SENTRY_DSN:", SENTRY_DSN)
@@ -96,20 +103,54 @@ INSTALLED_APPS = [
     'contracts',
     'events',
     'profiles',
+    'changefeed',
+    'outbox',
+    'dbrouter',
+    'search',
+    'archive',
+    # Application du projet : commandes de mesure des performances (benchmark_*)
+    'EpicEvents',
     'rest_framework',
     'rest_framework_simplejwt',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'EpicEvents.compression.APICompressionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    # Doit rester le dernier : aiguille la requête vers API_MIDDLEWARE ou BROWSER_MIDDLEWARE
+    'EpicEvents.middleware.PathDispatchMiddleware',
+]
+
+# Routes de l'API, authentifiées par jeton JWT : ni session, ni CSRF, ni messages
+API_PATH_PREFIXES = ['/crm/']
+
+API_MIDDLEWARE = [
+    'dbrouter.middleware.ReplicaRoutingMiddleware',
+]
+
+# Routes navigateur (admin/, crm-auth/, ...)
+BROWSER_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'dbrouter.middleware.ReplicaRoutingMiddleware',
 ]
 
+# Les middlewares de sessions, d'authentification et de messages requis par l'administration
+# sont déclarés dans BROWSER_MIDDLEWARE, que la vérification de l'administration ne parcourt pas
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
+# Compression des réponses de l'API (gzip, zstd et brotli si les bibliothèques sont installées)
+COMPRESSION_PATH_PREFIXES = ['/crm/']
+# Taille minimale (octets) d'une réponse pour être compressée
+COMPRESSION_MIN_SIZE = 1024
+# Niveaux de compression : compromis entre le coût CPU et les octets économisés
+# (voir la commande benchmark_compression)
+COMPRESSION_LEVELS = {'gzip': 6, 'br': 4, 'zstd': 3}
+
 ROOT_URLCONF = 'EpicEvents.urls'
 
 TEMPLATES = [
@@ -151,6 +192,64 @@ DATABASES = {
     }
 }
 
+# Base réplique en lecture seule, utilisée pour les requêtes GET lorsque DB_REPLICA_HOST est défini
+# Pendant les tests, la réplique est un miroir de la base principale
+if DB_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST,
+        'PORT': DB_REPLICA_PORT,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['dbrouter.routers.PrimaryReplicaRouter']
+
+# Alias de la réplique, ignoré s'il n'est pas présent dans DATABASES
+REPLICA_DATABASE_ALIAS = 'replica'
+# Durée pendant laquelle un utilisateur relit la base principale après une écriture
+# (le cache doit être partagé entre les processus pour que cette règle s'applique à tous les workers)
+REPLICA_STICKY_SECONDS = 5
+# Retard maximal de la réplique au-delà duquel les lectures retombent sur la base principale
+REPLICA_MAX_LAG_SECONDS = 2
+# Intervalle entre deux mesures du retard de la réplique
+REPLICA_LAG_CHECK_SECONDS = 5
+# Intervalle entre deux battements écrits sur la base principale par la commande run_replica_heartbeat
+# (inférieur à REPLICA_MAX_LAG_SECONDS : le retard mesuré dépasse le retard réel d'au plus cet intervalle)
+REPLICA_HEARTBEAT_SECONDS = 1
+
+# Délai (en secondes) avant qu'une écriture soit servie par le flux de modifications (crm/changes/)
+# ou qu'un paiement soit intégré par le compactage du registre (compact_payment_ledger) :
+# les dates d'écriture étant attribuées avant la validation, il doit dépasser la durée des transactions d'écriture
+CHANGEFEED_SETTLE_SECONDS = config('CHANGEFEED_SETTLE_SECONDS', default=30, cast=int)
+
+# Intervalle (en secondes) entre deux reconstructions de l'index d'autocomplétion en mémoire,
+# effectuées par un fil d'arrière-plan du serveur afin de prendre en compte les modifications des autres processus
+AUTOCOMPLETE_REFRESH_SECONDS = config('AUTOCOMPLETE_REFRESH_SECONDS', default=300, cast=int)
+
+# Résolution approximative des noms (client, sales_contact, support_contact) des contrats et des événements :
+# 'off' (correspondance exacte), 'suggest' (noms proches proposés dans l'erreur)
+# ou 'resolve' (nom le plus proche retenu)
+FUZZY_NAME_RESOLUTION = config('FUZZY_NAME_RESOLUTION', default='suggest')
+
+# Chevauchement des événements d'un même contact support lors de la création ou de la mise à jour :
+# 'warn' (l'événement est enregistré, les conflits sont signalés dans la réponse) ou 'reject' (réponse 409)
+EVENT_OVERLAP_POLICY = config('EVENT_OVERLAP_POLICY', default='warn')
+
+# Durée maximale (en jours) d'un événement, vérifiée par le modèle Event : elle borne la date de début
+# dans les recherches d'intervalle (calendrier, chevauchements)
+EVENT_MAX_DURATION_DAYS = config('EVENT_MAX_DURATION_DAYS', default=366, cast=int)
+
+# Intervalle maximal (en jours) interrogé par le calendrier des événements
+EVENT_CALENDAR_MAX_DAYS = config('EVENT_CALENDAR_MAX_DAYS', default=366, cast=int)
+
+# Rappels envoyés par la commande run_event_scheduler : délai avant le début de l'événement (en minutes)
+# et destination des rappels ('log', 'file' ou 'email')
+EVENT_REMINDER_LEAD_MINUTES = config('EVENT_REMINDER_LEAD_MINUTES', default=1440, cast=int)
+EVENT_REMINDER_SINK = config('EVENT_REMINDER_SINK', default='log')
+
+# Ancienneté (en mois) à partir de laquelle les événements terminés et les contrats soldés sont archivés
+ARCHIVE_AFTER_MONTHS = config('ARCHIVE_AFTER_MONTHS', default=12, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -198,9 +297,20 @@ SIMPLE_JWT = {
 }
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    # Pagination conservant la page sous forme de queryset (sérialisation par .values_list())
+    'DEFAULT_PAGINATION_CLASS': 'EpicEvents.pagination.QuerySetLimitOffsetPagination',
     'PAGE_SIZE': 10,
-    'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework_simplejwt.authentication.JWTAuthentication',)
+    'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework_simplejwt.authentication.JWTAuthentication',),
+    # Renderer et parser JSON rapides (orjson s'il est installé, json standard sinon)
+    'DEFAULT_RENDERER_CLASSES': (
+        'EpicEvents.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'EpicEvents.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 # Définir le modèle User personnalisé
@@ -22,32 +22,59 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from profiles.views import ClientViewSet, UserViewSet
 from contracts.views import ContractViewSet
 from events.views import EventViewSet
+from changefeed.views import ChangeFeedView
+from search.views import AutocompleteView, SearchView
 
 
-# Création du routeur simple
-router = SimpleRouter()
+def resource_routes(viewset, basename):
+    """
+        Renvoie les routes d'un ViewSet, générées par un routeur simple enregistré à la racine
+        de la ressource. Chaque ViewSet n'est enregistré qu'une seule fois : le préfixe de la
+        ressource est porté par l'include qui regroupe ses routes.
+    """
+    router = SimpleRouter()
+    router.register(r'', viewset, basename=basename)
+    return router.urls
 
-router.register(r"users", UserViewSet, basename="users")
-router.register(r"clients", ClientViewSet, basename="clients")
-router.register(r"contracts", ContractViewSet, basename="contracts")
-router.register(r"events", EventViewSet, basename="events")
 
-router.register(r"users/(?P<user_pk>\d+)/", UserViewSet, basename="users")
-router.register(r"users/(?P<user_pk>\d+)/user_details", UserViewSet, basename="user-details")
-
-router.register(r"clients/(?P<client_pk>\d+)/", ClientViewSet, basename="clients")
-router.register(r"clients/(?P<client_pk>\d+)/client_details", ClientViewSet, basename="client-details")
+# Routes des utilisateurs (crm/users/)
+users_patterns = [
+    path('user_details/<int:pk>/', UserViewSet.as_view({'get': 'user_details'}), name='user-details'),
+    *resource_routes(UserViewSet, 'users'),
+]
 
-router.register(r"contracts/(?P<contract_pk>\d+)/", ContractViewSet, basename="contracts")
-router.register(r"contracts/(?P<contract_pk>\d+)/contract_details", ContractViewSet, basename="contract-details")
+# Routes des clients (crm/clients/)
+clients_patterns = [
+    path('client_details/<int:pk>/', ClientViewSet.as_view({'get': 'client_details'}), name='client-details'),
+    *resource_routes(ClientViewSet, 'clients'),
+]
 
-router.register(r"events/(?P<event_pk>\d+)/", EventViewSet, basename="events")
-router.register(r"events/(?P<event_pk>\d+)/event_details", EventViewSet, basename="event-details")
+# Routes des contrats (crm/contracts/)
+contracts_patterns = [
+    path('contract_details/<int:pk>/', ContractViewSet.as_view(
+        {'get': 'contract_details'}), name='contract-details'
+    ),
+    *resource_routes(ContractViewSet, 'contracts'),
+]
 
+# Routes des événements (crm/events/)
+events_patterns = [
+    # La racine des événements renvoie la liste 'events_list' (GET) et crée un événement (POST)
+    path('', EventViewSet.as_view({
+        'get': 'events_list',
+        'post': 'create'}), name='events'
+    ),
+    path('event_details/<int:pk>/', EventViewSet.as_view({'get': 'event_details'}), name='event-details'),
+    *resource_routes(EventViewSet, 'events'),
+]
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
-    path('crm-auth/', include('rest_framework.urls')),
+    # Routes de l'API, regroupées par ressource afin que la résolution ne parcoure que le groupe concerné.
+    # Elles sont testées en premier : ce sont les plus sollicitées.
+    path('crm/events/', include(events_patterns)),
+    path('crm/contracts/', include(contracts_patterns)),
+    path('crm/clients/', include(clients_patterns)),
+    path('crm/users/', include(users_patterns)),
 
     # URL pour l'obtention du token JWT lors de la connexion
     path('crm/login/', TokenObtainPairView.as_view(), name='obtain_token'),
@@ -55,58 +82,15 @@ urlpatterns = [
     # URL pour le rafraîchissement du token JWT
     path('crm/token/refresh/', TokenRefreshView.as_view(), name='refresh_token'),
 
-    # Configure le chemin pour l'action 'all_users_details' et 'user_details'
-    path('crm/users/all_users_details/', UserViewSet.as_view(
-        {'get': 'all_users_details'}), name='all-users-details'
-    ),
-
-    path('crm/users/user_details/<int:pk>/', UserViewSet.as_view(
-        {'get': 'user_details'}), name='user-details'
-    ),
-
-    # Configure le chemin pour l'action 'all_clients_details' et 'client_details'
-    path('crm/clients/all_clients_details/', ClientViewSet.as_view(
-        {'get': 'all_clients_details'}), name='all-clients-details'
-    ),
-
-    path('crm/clients/client_details/<int:pk>/', ClientViewSet.as_view(
-        {'get': 'client_details'}), name='client-details'
-    ),
-
-    # Configure le chemin pour l'action 'all_contracts_details' et 'contract_details'
-    path('crm/contracts/all_contracts_details/', ContractViewSet.as_view(
-        {'get': 'all_contracts_details'}), name='all-contracts-details'
-    ),
-
-    path('crm/contracts/contract_details/<int:pk>/', ContractViewSet.as_view(
-        {'get': 'contract_details'}), name='contract-details'
-    ),
-
-    # Configure l'URL pour accéder au filtre des contrats non signés
-    path('crm/contracts/filtered_contracts/', ContractViewSet.as_view(
-        {'get': 'filtered_contracts'}), name='filtered-contracts'
-    ),
-
-    # Configure le chemin pour l'action 'all_contracts_details' et 'contract_details'
-    path('crm/events/all_events_details/', EventViewSet.as_view(
-        {'get': 'all_events_details'}), name='all-events-details'
-    ),
+    # Configure le chemin du flux de modifications pour la synchronisation incrémentale
+    path('crm/changes/', ChangeFeedView.as_view(), name='changes'),
 
-    path('crm/events/event_details/<int:pk>/', EventViewSet.as_view(
-        {'get': 'event_details'}), name='event-details'
-    ),
+    # Configure le chemin de la recherche plein texte (clients, événements, utilisateurs)
+    path('crm/search/', SearchView.as_view(), name='search'),
 
-    # Configure le chemin pour l'action 'events_without_support'
-    path('crm/events/events_without_support/', EventViewSet.as_view(
-        {'get': 'events_without_support'}), name='events-without-support'
-    ),
+    # Configure le chemin de l'autocomplétion des noms de clients et d'utilisateurs
+    path('crm/autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
 
-    # Configure le chemin pour l'action 'events_list' et 'create'
-    path('crm/events/', EventViewSet.as_view({
-        'get': 'events_list',
-        'post': 'create'}), name='events'
-    ),
-
-    # Inclusion des URLs gérées par le routeur simple sous le préfixe "crm/"
-    path('crm/', include(router.urls))
+    path('admin/', admin.site.urls),
+    path('crm-auth/', include('rest_framework.urls')),
 ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'EpicEvents.settings')
 
 application = get_wsgi_application()
+
+# Construit l'index d'autocomplétion au démarrage du serveur, puis le rafraîchit en arrière-plan
+from search.autocomplete import autocomplete_index  # noqa: E402
+
+autocomplete_index.start_refresh()
@@ -0,0 +1,28 @@
+from django.contrib import admin
+
+from .models import ArchivedContract, ArchivedEvent
+
+
+class ArchivedContractAdmin(admin.ModelAdmin):
+    """
+        Personnalisation de l'interface d'administration pour le modèle ArchivedContract.
+        Affiche les contrats soldés déplacés hors de la table des contrats.
+    """
+
+    list_display = ('id', 'client', 'sales_contact', 'total_amount', 'update_date', 'archived_at')
+    ordering = ('-archived_at',)
+
+
+class ArchivedEventAdmin(admin.ModelAdmin):
+    """
+        Personnalisation de l'interface d'administration pour le modèle ArchivedEvent.
+        Affiche les événements terminés déplacés hors de la table des événements.
+    """
+
+    list_display = ('id', 'event_name', 'client_name', 'event_date_start', 'event_date_end', 'archived_at')
+    ordering = ('-archived_at',)
+
+
+# Enregistre les classes d'administration des modèles archivés
+admin.site.register(ArchivedContract, ArchivedContractAdmin)
+admin.site.register(ArchivedEvent, ArchivedEventAdmin)
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from rich.console import Console
+from rich.table import Table
+
+from archive.models import (
+    archive_contracts, archive_events, get_archivable_contracts, get_archivable_events, get_archive_cutoff
+)
+
+
+class Command(BaseCommand):
+    """
+        Cette commande déplace les événements terminés et les contrats soldés les plus anciens
+        dans les tables d'archive, afin de réduire les tables parcourues par les listes et les filtres.
+        Les événements sont archivés en premier : un contrat n'est archivé qu'une fois son événement archivé.
+    """
+    help = 'Archiver les événements terminés et les contrats soldés'
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument(
+            '--months', type=int, default=None,
+            help='Ancienneté en mois à partir de laquelle les objets sont archivés (ARCHIVE_AFTER_MONTHS par défaut)'
+        )
+        parser.add_argument('--batch_size', type=int, default=500, help='Nombre d\'objets archivés par transaction')
+        parser.add_argument('--dry_run', action='store_true', help='Affiche le nombre d\'objets archivables')
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande et affiche le nombre d'objets archivés par ressource.
+        """
+        console = Console()
+        cutoff = get_archive_cutoff(options['months'])
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Ressource", style="cyan")
+        table.add_column("Archivables" if options['dry_run'] else "Archivés", style="cyan")
+
+        if options['dry_run']:
+            table.add_row("events", str(get_archivable_events(cutoff).count()))
+            table.add_row("contracts", str(get_archivable_contracts(cutoff).count()))
+        else:
+            table.add_row("events", str(archive_events(cutoff, batch_size=options['batch_size'])))
+            table.add_row("contracts", str(archive_contracts(cutoff, batch_size=options['batch_size'])))
+
+        console.print(f"[bold magenta]Archivage des objets antérieurs au {cutoff:%d/%m/%Y}[/bold magenta]")
+        console.print(table)
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('profiles', '0002_client_client_update_date_id_idx'),
+        ('contracts', '0005_contract_contract_update_date_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedContract',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('creation_date', models.DateTimeField()),
+                ('update_date', models.DateTimeField()),
+                ('status_contract', models.BooleanField(default=False, verbose_name='Contract signed')),
+                ('total_amount', models.FloatField(default=0.0)),
+                ('remaining_amount', models.FloatField(default=0.0)),
+                ('ledger_position', models.PositiveBigIntegerField(default=0)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('client', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='profiles.client', verbose_name='Client')),
+                ('sales_contact', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Sales Contact')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedContractPayment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('amount', models.FloatField()),
+                ('recorded_at', models.DateTimeField()),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='archive.archivedcontract')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedEvent',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('event_name', models.CharField(blank=True, max_length=255)),
+                ('client_name', models.CharField(blank=True, max_length=255)),
+                ('client_contact', models.CharField(blank=True, max_length=255)),
+                ('event_date_start', models.DateTimeField(blank=True, null=True)),
+                ('event_date_end', models.DateTimeField(blank=True, null=True)),
+                ('location', models.TextField(blank=True)),
+                ('attendees', models.PositiveIntegerField(default=0)),
+                ('notes', models.TextField(blank=True)),
+                ('update_date', models.DateTimeField()),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('client', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='profiles.client')),
+                ('contract', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='contracts.contract')),
+                ('support_contact', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['event_date_start', 'event_date_end'], name='archived_event_date_range_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,254 @@
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from changefeed.models import DeletionLog, reset_deletion_kind, set_deletion_kind
+from contracts.models import Contract, ContractPayment
+from events.models import Event
+from profiles.models import User, Client
+
+
+class ArchivedContractQuerySet(models.QuerySet):
+    """QuerySet des contrats archivés, compatible avec celui des contrats (ContractQuerySet)."""
+
+    def with_current_balance(self):
+        """Annote chaque contrat archivé avec son solde courant, figé lors de l'archivage."""
+        return self.annotate(current_remaining_amount_value=F('remaining_amount'))
+
+
+class ArchivedContract(models.Model):
+    """
+        Modèle représentant un contrat signé et entièrement payé, déplacé hors de la table des contrats.
+
+        Les champs sont ceux de Contract, l'identifiant d'origine est conservé. Le solde (remaining_amount)
+        intègre tous les paiements du registre, archivés avec le contrat (ArchivedContractPayment).
+        Champ supplémentaire:
+            archived_at: Date de l'archivage.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    sales_contact = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name="Sales Contact"
+    )
+    client = models.ForeignKey(
+        Client, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name="Client"
+    )
+    creation_date = models.DateTimeField()
+    update_date = models.DateTimeField()
+    status_contract = models.BooleanField(default=False, verbose_name="Contract signed")
+    total_amount = models.FloatField(default=0.0)
+    remaining_amount = models.FloatField(default=0.0)
+    ledger_position = models.PositiveBigIntegerField(default=0)
+    version = models.PositiveIntegerField(default=1)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    objects = ArchivedContractQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        """Renvoie une représentation lisible de l'instance de ArchivedContract."""
+        return f"Contrat archivé ID : {self.id} - {self.archived_at}"
+
+    @property
+    def current_remaining_amount(self):
+        """Renvoie le solde du contrat, figé lors de l'archivage."""
+        return self.remaining_amount
+
+
+class ArchivedContractPayment(models.Model):
+    """
+        Modèle représentant une écriture du registre des paiements d'un contrat archivé.
+        Les champs sont ceux de ContractPayment, l'identifiant d'origine est conservé.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    contract = models.ForeignKey(ArchivedContract, on_delete=models.CASCADE, related_name='payments')
+    amount = models.FloatField()
+    recorded_at = models.DateTimeField()
+    note = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        """Renvoie une représentation lisible de l'instance de ArchivedContractPayment."""
+        return f"Paiement archivé ID : {self.id} Contrat ID : {self.contract_id} - {self.amount}"
+
+
+class ArchivedEvent(models.Model):
+    """
+        Modèle représentant un événement terminé, déplacé hors de la table des événements.
+
+        Les champs sont ceux de Event, l'identifiant d'origine est conservé. Le contrat est référencé
+        sans contrainte de clé étrangère : il peut être encore actif ou lui-même archivé.
+        Champ supplémentaire:
+            archived_at: Date de l'archivage.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    event_name = models.CharField(max_length=255, blank=True)
+    contract = models.ForeignKey(
+        Contract, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+'
+    )
+    client = models.ForeignKey(Client, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    client_name = models.CharField(max_length=255, blank=True)
+    client_contact = models.CharField(max_length=255, blank=True)
+    event_date_start = models.DateTimeField(null=True, blank=True)
+    event_date_end = models.DateTimeField(null=True, blank=True)
+    support_contact = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    location = models.TextField(blank=True)
+    attendees = models.PositiveIntegerField(default=0)
+    notes = models.TextField(blank=True)
+    update_date = models.DateTimeField()
+    version = models.PositiveIntegerField(default=1)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['event_date_start', 'event_date_end'], name='archived_event_date_range_idx'),
+        ]
+
+    def __str__(self):
+        """Renvoie une représentation lisible de l'instance de ArchivedEvent."""
+        return f"Evénement archivé ID: {self.id} {self.event_name} - {self.client_name}"
+
+
+@receiver(post_save, sender=Event)
+def check_archived_event_contract(sender, instance, **kwargs):
+    """
+        Fonction de réception appelée lors de l'enregistrement d'un événement, dans la transaction de la sauvegarde.
+
+        Un contrat dont l'événement a été archivé n'est plus protégé par la contrainte unique_event_per_contract :
+        IntegrityError est levée si le contrat de l'événement est associé à un événement archivé.
+        La lecture est verrouillante : elle voit un archivage validé pendant l'insertion de l'événement.
+    """
+    if instance.contract_id is None:
+        return
+    if ArchivedEvent.objects.select_for_update().filter(contract_id=instance.contract_id).exists():
+        raise IntegrityError("An archived event already exists for this contract.")
+
+
+# Colonnes recopiées lors de l'archivage
+EVENT_ARCHIVE_FIELDS = (
+    'id', 'event_name', 'contract_id', 'client_id', 'client_name', 'client_contact', 'event_date_start',
+    'event_date_end', 'support_contact_id', 'location', 'attendees', 'notes', 'update_date', 'version',
+)
+CONTRACT_ARCHIVE_FIELDS = (
+    'id', 'sales_contact_id', 'client_id', 'creation_date', 'update_date', 'status_contract',
+    'total_amount', 'version',
+)
+
+
+def include_archived(request):
+    """Indique si la requête demande aussi les objets archivés (?include_archived=1)."""
+    params = getattr(request, 'query_params', None)
+    return bool(params) and params.get('include_archived', '').lower() in ('1', 'true')
+
+
+def get_archive_cutoff(months=None):
+    """Renvoie la date avant laquelle les objets sont archivés (ARCHIVE_AFTER_MONTHS mois par défaut)."""
+    if months is None:
+        months = getattr(settings, 'ARCHIVE_AFTER_MONTHS', 12)
+    return timezone.now() - relativedelta(months=months)
+
+
+def get_archivable_events(cutoff):
+    """
+        Renvoie les événements terminés avant cutoff (date de fin, ou de début à défaut).
+        Les événements sans contact support restent dans la file events_without_support et ne sont pas archivés.
+    """
+    return Event.objects.filter(support_contact__isnull=False).filter(
+        Q(event_date_end__lt=cutoff) | Q(event_date_end__isnull=True, event_date_start__lt=cutoff)
+    )
+
+
+def get_archivable_contracts(cutoff):
+    """
+        Renvoie les contrats signés, entièrement payés, non modifiés depuis cutoff et sans événement actif.
+        Ces contrats sont exclus de filtered_contracts : leur archivage ne modifie pas ce filtre.
+    """
+    return Contract.objects.with_current_balance().filter(
+        status_contract=True, current_remaining_amount_value__lte=0.0, update_date__lt=cutoff
+    ).filter(~Exists(Event.objects.filter(contract=OuterRef('pk'))))
+
+
+def archive_events(cutoff, batch_size=500):
+    """
+        Déplace les événements archivables dans la table des événements archivés.
+
+        Chaque lot de batch_size événements est traité dans une transaction courte : les lignes sont
+        verrouillées, recopiées (bulk_create) puis supprimées de la table des événements.
+        La suppression passe par l'ORM : le flux de modifications (trace de nature 'archived')
+        et l'index de recherche en sont informés.
+        Renvoie le nombre d'événements archivés.
+    """
+    archived = 0
+    token = set_deletion_kind(DeletionLog.KIND_ARCHIVED)
+    try:
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    get_archivable_events(cutoff).select_for_update().order_by('id').values(
+                        *EVENT_ARCHIVE_FIELDS
+                    )[:batch_size]
+                )
+                if not rows:
+                    break
+                ArchivedEvent.objects.bulk_create([ArchivedEvent(**row) for row in rows])
+                Event.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+            archived += len(rows)
+    finally:
+        reset_deletion_kind(token)
+    return archived
+
+
+def archive_contracts(cutoff, batch_size=500):
+    """
+        Déplace les contrats archivables et leur registre des paiements dans les tables d'archive.
+
+        Le solde archivé intègre tous les paiements du registre (ledger_position = dernier paiement).
+        Chaque lot de batch_size contrats est traité dans une transaction courte ; les traces de suppression
+        du flux de modifications sont de nature 'archived'.
+        Renvoie le nombre de contrats archivés.
+    """
+    archived = 0
+    token = set_deletion_kind(DeletionLog.KIND_ARCHIVED)
+    try:
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    get_archivable_contracts(cutoff).select_for_update().order_by('id').values(
+                        *CONTRACT_ARCHIVE_FIELDS, 'current_remaining_amount_value', 'ledger_position'
+                    )[:batch_size]
+                )
+                if not rows:
+                    break
+                contract_ids = [row['id'] for row in rows]
+                payments = list(ContractPayment.objects.filter(contract_id__in=contract_ids).values(
+                    'id', 'contract_id', 'amount', 'recorded_at', 'note'
+                ))
+                last_payments = {}
+                for payment in payments:
+                    contract_id = payment['contract_id']
+                    last_payments[contract_id] = max(payment['id'], last_payments.get(contract_id, 0))
+
+                ArchivedContract.objects.bulk_create([
+                    ArchivedContract(
+                        **{field: row[field] for field in CONTRACT_ARCHIVE_FIELDS},
+                        remaining_amount=row['current_remaining_amount_value'],
+                        ledger_position=last_payments.get(row['id'], row['ledger_position']),
+                    )
+                    for row in rows
+                ])
+                ArchivedContractPayment.objects.bulk_create(
+                    [ArchivedContractPayment(**payment) for payment in payments]
+                )
+                Contract.objects.filter(pk__in=contract_ids).delete()
+            archived += len(rows)
+    finally:
+        reset_deletion_kind(token)
+    return archived
@@ -0,0 +1,215 @@
+import pytest
+import datetime
+from io import StringIO
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import ArchivedContract, ArchivedContractPayment, ArchivedEvent, archive_contracts, archive_events
+from .models import get_archive_cutoff
+from changefeed.models import DeletionLog
+from contracts.models import Contract
+from events.models import Event
+from profiles.models import User, Client
+
+
+@pytest.mark.django_db
+class TestArchive(TestCase):
+    """
+        Classe de tests pour l'archivage des événements terminés et des contrats soldés.
+    """
+
+    def create_user(self, email, role, full_name, phone_number, is_staff=True):
+        """
+            Crée et retourne un utilisateur avec les paramètres spécifiés.
+        """
+        return User.objects.create_user(
+            email=email,
+            password='Pingou123',
+            role=role,
+            full_name=full_name,
+            phone_number=phone_number,
+            is_staff=is_staff,
+        )
+
+    def create_contract(self, total_amount, remaining_amount, status_contract):
+        """
+            Crée et retourne un contrat du client avec les paramètres spécifiés.
+        """
+        return Contract.objects.create(
+            client=self.client1,
+            sales_contact=self.sales_user,
+            total_amount=total_amount,
+            remaining_amount=remaining_amount,
+            status_contract=status_contract,
+        )
+
+    def create_event(self, event_name, contract, support_contact, year):
+        """
+            Crée et retourne un événement du client ayant lieu l'année indiquée.
+        """
+        return Event.objects.create(
+            event_name=event_name,
+            contract=contract,
+            client=self.client1,
+            event_date_start=make_aware(datetime.datetime(year, 2, 14, 12, 45)),
+            event_date_end=make_aware(datetime.datetime(year, 2, 15, 2, 0)),
+            support_contact=support_contact,
+            location='Springfield',
+            attendees=10,
+        )
+
+    def setUp(self):
+        """
+            Mets en place les données nécessaires pour les tests.
+        """
+        self.management_user = self.create_user(
+            email='Seymour@EpicEvents-Management.com',
+            role=User.ROLE_MANAGEMENT,
+            full_name='Seymour Skinner',
+            phone_number='+345678911',
+        )
+
+        self.sales_user = self.create_user(
+            email='Timothy@EpicEvents-Sales.com',
+            role=User.ROLE_SALES,
+            full_name='Timothy Lovejoy',
+            phone_number='+345678912',
+        )
+
+        self.support_user = self.create_user(
+            email='Homer@EpicEvents-Support.com',
+            role=User.ROLE_SUPPORT,
+            full_name='Homer Simpson',
+            phone_number='+345678913',
+        )
+
+        self.client1 = Client.objects.create(
+            email='Ned@EpicEvents.com', full_name='Ned Flanders', phone_number='+987654321', company_name='Leftorium'
+        )
+
+        current_year = timezone.now().year
+
+        # Contrat soldé dont l'événement est terminé depuis plusieurs années : archivés tous les deux
+        self.paid_contract = self.create_contract(total_amount=500.0, remaining_amount=500.0, status_contract=True)
+        self.paid_contract.record_payment(500.0)
+        self.old_event = self.create_event('Gala', self.paid_contract, self.support_user, current_year - 3)
+
+        # Contrat restant à payer et événement sans support : conservés
+        self.unpaid_contract = self.create_contract(total_amount=800.0, remaining_amount=300.0, status_contract=True)
+        self.unassigned_event = self.create_event('Kermesse', self.unpaid_contract, None, current_year - 3)
+
+        # Contrat soldé dont l'événement est à venir : conservés
+        self.upcoming_contract = self.create_contract(total_amount=200.0, remaining_amount=0.0, status_contract=True)
+        self.upcoming_event = self.create_event('Bal', self.upcoming_contract, self.support_user, current_year + 1)
+
+        # Les contrats n'ont pas été modifiés depuis plusieurs années
+        Contract.objects.update(update_date=make_aware(datetime.datetime(current_year - 3, 1, 1)))
+
+        refresh_management_user = RefreshToken.for_user(self.management_user)
+        self.access_token_management_user = str(refresh_management_user.access_token)
+
+        refresh_sales_user = RefreshToken.for_user(self.sales_user)
+        self.access_token_sales_user = str(refresh_sales_user.access_token)
+
+    def get(self, url, token):
+        """Effectue une requête GET avec le jeton indiqué."""
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_archive_events_and_contracts(self):
+        cutoff = get_archive_cutoff(12)
+        self.assertEqual(archive_events(cutoff, batch_size=1), 1)
+        self.assertEqual(archive_contracts(cutoff, batch_size=1), 1)
+
+        self.assertFalse(Event.objects.filter(pk=self.old_event.pk).exists())
+        self.assertEqual(ArchivedEvent.objects.get().event_name, 'Gala')
+        self.assertEqual(ArchivedEvent.objects.get().contract_id, self.paid_contract.pk)
+
+        # Le contrat est archivé avec son registre des paiements
+        self.assertFalse(Contract.objects.filter(pk=self.paid_contract.pk).exists())
+        archived_contract = ArchivedContract.objects.get()
+        self.assertEqual(archived_contract.pk, self.paid_contract.pk)
+        self.assertEqual(archived_contract.current_remaining_amount, 0.0)
+        self.assertEqual(ArchivedContractPayment.objects.get().contract_id, archived_contract.pk)
+
+        self.assertEqual(
+            set(Contract.objects.values_list('pk', flat=True)), {self.unpaid_contract.pk, self.upcoming_contract.pk}
+        )
+        self.assertEqual(
+            set(Event.objects.values_list('pk', flat=True)), {self.unassigned_event.pk, self.upcoming_event.pk}
+        )
+
+        # Une seconde exécution n'archive rien
+        self.assertEqual(archive_events(cutoff), 0)
+        self.assertEqual(archive_contracts(cutoff), 0)
+
+        # Les traces du flux de modifications distinguent l'archivage d'une suppression
+        self.assertEqual(
+            set(DeletionLog.objects.values_list('resource', 'object_id', 'kind')),
+            {
+                (DeletionLog.RESOURCE_EVENTS, self.old_event.pk, DeletionLog.KIND_ARCHIVED),
+                (DeletionLog.RESOURCE_CONTRACTS, self.paid_contract.pk, DeletionLog.KIND_ARCHIVED),
+            }
+        )
+        upcoming_event_id = self.upcoming_event.pk
+        self.upcoming_event.delete()
+        self.assertEqual(DeletionLog.objects.get(object_id=upcoming_event_id).kind, DeletionLog.KIND_DELETED)
+
+    def test_archived_event_keeps_contract_unique(self):
+        archive_events(get_archive_cutoff(12))
+        self.assertTrue(Contract.objects.filter(pk=self.paid_contract.pk).exists())
+
+        # Le contrat resté actif n'accepte pas de nouvel événement, au niveau du modèle
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create_event('Gala bis', self.paid_contract, self.support_user, timezone.now().year + 1)
+
+        # ni par l'API
+        Client.objects.filter(pk=self.client1.pk).update(sales_contact=self.sales_user)
+        response = self.client.post('/crm/events/', data={
+            'event_name': 'Gala bis',
+            'contract': self.paid_contract.pk,
+            'client': self.client1.full_name,
+            'event_date_start': make_aware(datetime.datetime(timezone.now().year + 1, 3, 1, 14, 30)),
+            'event_date_end': make_aware(datetime.datetime(timezone.now().year + 1, 3, 1, 16, 30)),
+            'support_contact': self.support_user.full_name,
+            'location': 'Springfield',
+            'attendees': 5,
+        }, format='json', HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user}')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn("An event already exists for this contract.", response.content.decode())
+        self.assertEqual(Event.objects.filter(contract=self.paid_contract).count(), 0)
+
+    def test_include_archived(self):
+        filtered_url = '/crm/contracts/filtered_contracts/'
+        without_support_url = '/crm/events/events_without_support/'
+        filtered = self.get(filtered_url, self.access_token_sales_user).data
+        without_support = self.get(without_support_url, self.access_token_management_user).data
+
+        call_command('archive_records', stdout=StringIO())
+
+        # Les requêtes par défaut ne lisent que les données actives
+        response = self.get('/crm/events/all_events_details/', self.access_token_management_user)
+        self.assertEqual(
+            [event['id'] for event in response.data], [self.unassigned_event.pk, self.upcoming_event.pk]
+        )
+        response = self.get('/crm/events/all_events_details/?include_archived=1', self.access_token_management_user)
+        self.assertEqual(
+            [event['id'] for event in response.data],
+            [self.unassigned_event.pk, self.upcoming_event.pk, self.old_event.pk]
+        )
+        self.assertEqual(response.data[-1]['support_contact'], 'Homer Simpson')
+
+        response = self.get('/crm/contracts/contracts_list/?include_archived=1', self.access_token_sales_user)
+        self.assertIn(self.paid_contract.pk, [contract['id'] for contract in response.data])
+
+        # filtered_contracts et events_without_support renvoient les mêmes objets qu'avant l'archivage
+        for token, url, expected in (
+            (self.access_token_sales_user, filtered_url, filtered),
+            (self.access_token_management_user, without_support_url, without_support),
+        ):
+            self.assertEqual(self.get(url, token).data, expected)
+            self.assertEqual(self.get(f'{url}?include_archived=1', token).data, expected)
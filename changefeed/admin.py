@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import DeletionLog
+
+
+class DeletionLogAdmin(admin.ModelAdmin):
+    """
+        Personnalisation de l'interface d'administration pour le modèle DeletionLog.
+        Affiche les traces de suppression consommées par le flux de modifications.
+    """
+
+    list_display = ('resource', 'object_id', 'deleted_at')
+    list_filter = ('resource',)
+    ordering = ('-id',)
+
+
+# Enregistre la classe DeletionLogAdmin avec le modèle DeletionLog
+admin.site.register(DeletionLog, DeletionLogAdmin)
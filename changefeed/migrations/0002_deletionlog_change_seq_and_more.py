@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('changefeed', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deletionlog',
+            name='change_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='deletionlog',
+            index=models.Index(fields=['change_seq', 'id'], name='deletion_change_seq_id_idx'),
+        ),
+    ]
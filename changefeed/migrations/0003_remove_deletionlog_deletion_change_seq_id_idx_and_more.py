@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('changefeed', '0002_deletionlog_change_seq_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='deletionlog',
+            name='deletion_change_seq_id_idx',
+        ),
+        migrations.RemoveField(
+            model_name='deletionlog',
+            name='change_seq',
+        ),
+        migrations.AddIndex(
+            model_name='deletionlog',
+            index=models.Index(fields=['deleted_at', 'id'], name='deletion_deleted_at_id_idx'),
+        ),
+    ]
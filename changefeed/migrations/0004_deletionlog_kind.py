@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('changefeed', '0003_remove_deletionlog_deletion_change_seq_id_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deletionlog',
+            name='kind',
+            field=models.CharField(choices=[('deleted', 'Supprimé'), ('archived', 'Archivé')], default='deleted', max_length=20),
+        ),
+    ]
@@ -0,0 +1,116 @@
+from contextvars import ContextVar
+from datetime import timedelta
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from contracts.models import Contract
+from events.models import Event
+from profiles.models import Client
+
+
+class DeletionLog(models.Model):
+    """
+        Modèle représentant la trace d'une suppression (tombstone) pour le flux de modifications.
+
+        Champs:
+            resource: Ressource concernée ('clients', 'contracts' ou 'events').
+            object_id: Identifiant de l'objet supprimé.
+            deleted_at: Date de la suppression, utilisée comme curseur par le flux de modifications.
+            kind: Nature de la suppression ('deleted', ou 'archived' si l'objet a été déplacé dans les archives).
+    """
+    RESOURCE_CLIENTS = 'clients'
+    RESOURCE_CONTRACTS = 'contracts'
+    RESOURCE_EVENTS = 'events'
+
+    RESOURCE_CHOICES = (
+        (RESOURCE_CLIENTS, 'Clients'),
+        (RESOURCE_CONTRACTS, 'Contrats'),
+        (RESOURCE_EVENTS, 'Événements'),
+    )
+
+    KIND_DELETED = 'deleted'
+    KIND_ARCHIVED = 'archived'
+
+    KIND_CHOICES = (
+        (KIND_DELETED, 'Supprimé'),
+        (KIND_ARCHIVED, 'Archivé'),
+    )
+
+    resource = models.CharField(max_length=20, choices=RESOURCE_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=KIND_DELETED)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='deletion_deleted_at_id_idx'),
+        ]
+
+    def __str__(self):
+        """Renvoie une représentation lisible de l'instance de DeletionLog."""
+        return f"Suppression ID : {self.id} {self.resource} {self.object_id} - {self.deleted_at}"
+
+
+# Nature des suppressions enregistrées dans le contexte courant (modifiée pendant l'archivage)
+_deletion_kind = ContextVar('deletion_kind', default=DeletionLog.KIND_DELETED)
+
+
+def set_deletion_kind(kind):
+    """Définit la nature des suppressions enregistrées dans le contexte courant et renvoie le jeton de restauration."""
+    return _deletion_kind.set(kind)
+
+
+def reset_deletion_kind(token):
+    """Restaure la nature précédente des suppressions enregistrées."""
+    _deletion_kind.reset(token)
+
+
+@receiver(pre_delete, sender=Client)
+@receiver(pre_delete, sender=Contract)
+@receiver(pre_delete, sender=Event)
+def log_deletion(sender, instance, using=None, **kwargs):
+    """
+        Fonction de réception appelée lors de la suppression d'un client, d'un contrat ou d'un événement,
+        dans la transaction de la suppression.
+        Enregistre une trace de suppression consommée par le flux de modifications,
+        de nature 'archived' pendant l'archivage (set_deletion_kind).
+    """
+    resources = {
+        Client: DeletionLog.RESOURCE_CLIENTS,
+        Contract: DeletionLog.RESOURCE_CONTRACTS,
+        Event: DeletionLog.RESOURCE_EVENTS,
+    }
+    DeletionLog.objects.using(using).create(
+        resource=resources[sender], object_id=instance.pk, kind=_deletion_kind.get()
+    )
+
+
+def get_settled_before(now=None):
+    """
+        Renvoie la date limite des écritures servies par le flux de modifications.
+
+        Les dates d'écriture (update_date, recorded_at, deleted_at) sont attribuées avant la validation
+        de la transaction : une écriture validée tardivement peut porter une date antérieure à celle d'une
+        écriture déjà lue. Seules les écritures plus anciennes que CHANGEFEED_SETTLE_SECONDS sont donc servies,
+        délai au-delà duquel toutes les transactions qui les ont écrites sont supposées validées.
+    """
+    now = now or timezone.now()
+    return now - timedelta(seconds=settings.CHANGEFEED_SETTLE_SECONDS)
+
+
+def changed_after(queryset, date_field, position, settled_before):
+    """
+        Renvoie les lignes du queryset écrites après la position (date, id) et au plus tard à settled_before,
+        triées par (date, id). Toutes les lignes écrites au plus tard à settled_before sont renvoyées
+        si la position est None.
+    """
+    queryset = queryset.filter(**{f'{date_field}__lte': settled_before})
+    if position is not None:
+        date, last_id = position
+        queryset = queryset.filter(Q(**{f'{date_field}__gt': date}) | Q(**{date_field: date, 'id__gt': last_id}))
+    return queryset.order_by(date_field, 'id')
@@ -0,0 +1,176 @@
+import pytest
+import time_machine
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import DeletionLog
+from .views import encode_cursor
+from contracts.models import Contract
+from profiles.models import User, Client
+
+
+@pytest.mark.django_db
+@override_settings(CHANGEFEED_SETTLE_SECONDS=0)
+class TestChangeFeedView(TestCase):
+    """
+        Classe de tests pour la vue du flux de modifications (ChangeFeedView).
+    """
+    url = '/crm/changes/'
+
+    def create_user(self, email, role, full_name, phone_number, is_staff=True):
+        """
+            Crée et retourne un utilisateur avec les paramètres spécifiés.
+        """
+        return User.objects.create_user(
+            email=email,
+            password='Pingou123',
+            role=role,
+            full_name=full_name,
+            phone_number=phone_number,
+            is_staff=is_staff,
+        )
+
+    def create_client(self, email, full_name, phone_number, company_name):
+        """
+            Crée et retourne un client avec les paramètres spécifiés.
+        """
+        return Client.objects.create(
+            email=email,
+            full_name=full_name,
+            phone_number=phone_number,
+            company_name=company_name,
+        )
+
+    def setUp(self):
+        """
+            Mets en place les données nécessaires pour les tests.
+        """
+        self.management_user = self.create_user(
+            email='Milhouse@EpicEvents-Management.com',
+            role=User.ROLE_MANAGEMENT,
+            full_name='Milhouse Van Houten',
+            phone_number='+567891234',
+        )
+
+        self.sales_user = self.create_user(
+            email='Timothy@EpicEvents-Sales.com',
+            role=User.ROLE_SALES,
+            full_name='Timothy Lovejoy',
+            phone_number='+345678912',
+        )
+
+        self.client1 = self.create_client(
+            email='Ned@EpicEvents.com',
+            full_name='Ned Flanders',
+            phone_number='+987654321',
+            company_name='Flanders & Co',
+        )
+
+        self.client2 = self.create_client(
+            email='Ralph@EpicEvents.com',
+            full_name='Ralph Wiggum',
+            phone_number='+654321987',
+            company_name='Wiggum Gum & Co',
+        )
+
+        self.contract = Contract.objects.create(client=self.client1, total_amount=1500.0, remaining_amount=1500.0)
+
+        # Crée un jeton d'accès pour management_user
+        refresh_management_user = RefreshToken.for_user(self.management_user)
+        self.access_token_management_user = str(refresh_management_user.access_token)
+
+        # Crée un jeton d'accès pour sales_user
+        refresh_sales_user = RefreshToken.for_user(self.sales_user)
+        self.access_token_sales_user = str(refresh_sales_user.access_token)
+
+    def get_changes(self, **params):
+        """Effectue une requête GET vers le flux de modifications avec le jeton de management_user."""
+        return self.client.get(self.url, params, HTTP_AUTHORIZATION=f'Bearer {self.access_token_management_user}')
+
+    def test_full_then_incremental_sync(self):
+        # Synchronisation complète sans curseur
+        response = self.get_changes()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({client['id'] for client in response.data['clients']}, {self.client1.id, self.client2.id})
+        self.assertEqual([contract['id'] for contract in response.data['contracts']], [self.contract.id])
+
+        # Aucune modification depuis le curseur renvoyé
+        cursor = response.data['next_cursor']
+        response = self.get_changes(since=cursor)
+        self.assertEqual(response.data['clients'], [])
+        self.assertEqual(response.data['contracts'], [])
+
+        # Seul le client modifié est renvoyé
+        self.client2.phone_number = '+111111111'
+        self.client2.save()
+        response = self.get_changes(since=cursor)
+        self.assertEqual([client['id'] for client in response.data['clients']], [self.client2.id])
+
+    def test_identical_update_date(self):
+        # Deux clients modifiés à la même date
+        Client.objects.filter(pk__in=[self.client1.pk, self.client2.pk]).update(update_date=timezone.now())
+
+        # La lecture page par page renvoie les deux clients, sans omission ni doublon
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 1}
+            if cursor:
+                params['since'] = cursor
+            response = self.get_changes(**params)
+            seen += [client['id'] for client in response.data['clients']]
+            cursor = response.data['next_cursor']
+            if not response.data['has_more']:
+                break
+
+        self.assertEqual(seen, sorted([self.client1.id, self.client2.id]))
+
+    @override_settings(CHANGEFEED_SETTLE_SECONDS=60)
+    def test_late_commit_is_not_skipped(self):
+        cursor = self.get_changes().data['next_cursor']
+        now = timezone.now()
+
+        # client2 est modifié, puis client1 par une transaction commencée avant mais validée après :
+        # la date de mise à jour de client1 est antérieure à celle de client2
+        Client.objects.filter(pk=self.client2.pk).update(phone_number='+111111111', update_date=now)
+        with time_machine.travel(now + timezone.timedelta(seconds=30)):
+            # Les deux écritures sont trop récentes pour être servies
+            response = self.get_changes(since=cursor)
+            self.assertEqual(response.data['clients'], [])
+            self.assertEqual(response.data['next_cursor'], cursor)
+
+            Client.objects.filter(pk=self.client1.pk).update(
+                phone_number='+222222222', update_date=now - timezone.timedelta(seconds=10)
+            )
+
+        # Une fois le délai écoulé, les deux écritures sont servies dans l'ordre des dates de mise à jour
+        with time_machine.travel(now + timezone.timedelta(seconds=61)):
+            response = self.get_changes(since=cursor)
+        self.assertEqual(
+            [client['id'] for client in response.data['clients']], [self.client1.id, self.client2.id]
+        )
+
+    def test_deletion_tombstones(self):
+        cursor = self.get_changes().data['next_cursor']
+        contract_id = self.contract.id
+        self.contract.delete()
+
+        self.assertTrue(DeletionLog.objects.filter(resource='contracts', object_id=contract_id).exists())
+
+        response = self.get_changes(since=cursor)
+        self.assertEqual(response.data['deletions'][0]['resource'], 'contracts')
+        self.assertEqual(response.data['deletions'][0]['id'], contract_id)
+
+    def test_invalid_cursor(self):
+        response = self.get_changes(since='not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Un curseur dont la position n'est pas une date (ancien format) est refusé
+        response = self.get_changes(since=encode_cursor({'clients': [12, 3]}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_changes_unauthorized_user(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user}')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,132 @@
+import base64
+import binascii
+import json
+from sentry_sdk import capture_exception
+from django.http import HttpResponseForbidden
+from django.utils.dateparse import parse_datetime
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import DeletionLog, changed_after, get_settled_before
+from contracts.models import Contract, ContractPayment
+from contracts.serializers import ContractDetailSerializer, ContractPaymentSerializer
+from events.models import Event
+from events.serializers import EventDetailSerializer
+from profiles.models import User, Client
+from profiles.serializers import ClientDetailSerializer
+
+
+def encode_cursor(position):
+    """Encode la position du flux de modifications en un curseur opaque."""
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+        Décode un curseur du flux de modifications.
+        Lève ValueError si le curseur est invalide.
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor.") from e
+
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor.")
+    return position
+
+
+class ChangeFeedView(APIView):
+    """
+        Vue renvoyant les créations, modifications et suppressions survenues depuis un curseur (CRM).
+
+        Chaque flux est parcouru dans l'ordre (date d'écriture, id) : update_date pour les clients, contrats
+        et événements, recorded_at pour les paiements et deleted_at pour les suppressions. Seules les écritures
+        plus anciennes que CHANGEFEED_SETTLE_SECONDS sont servies (get_settled_before) : une écriture validée
+        tardivement, dont la date est antérieure à une écriture déjà lue, n'est pas omise. Aucun verrou
+        n'est pris par les écritures. L'identifiant départage les objets écrits à la même date.
+
+        Paramètres :
+            - since : curseur renvoyé par l'appel précédent (absent pour une synchronisation complète).
+            - limit : nombre maximum d'éléments renvoyés par flux (100 par défaut, 1000 au maximum).
+    """
+    permission_classes = [IsAuthenticated]
+
+    default_limit = 100
+    max_limit = 1000
+
+    def get(self, request):
+        """Renvoie les modifications survenues depuis le curseur 'since'."""
+        if request.user.role != User.ROLE_MANAGEMENT:
+            # Capture l'exception et envoie une alerte à Sentry
+            capture_exception(Exception("Unauthorized access to changes"))
+
+            return HttpResponseForbidden("You are not authorized to access this view.")
+
+        try:
+            position = decode_cursor(request.query_params['since']) if 'since' in request.query_params else {}
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+            if limit < 1:
+                raise ValueError("Invalid limit.")
+
+            settled_before = get_settled_before()
+            clients, position['clients'], clients_more = self.changed_since(
+                Client.objects.select_related('sales_contact'), 'update_date',
+                position.get('clients'), settled_before, limit
+            )
+            contracts, position['contracts'], contracts_more = self.changed_since(
+                Contract.objects.with_current_balance().select_related('client', 'sales_contact'), 'update_date',
+                position.get('contracts'), settled_before, limit
+            )
+            events, position['events'], events_more = self.changed_since(
+                Event.objects.select_related('client', 'support_contact'), 'update_date',
+                position.get('events'), settled_before, limit
+            )
+            payments, position['payments'], payments_more = self.changed_since(
+                ContractPayment.objects.all(), 'recorded_at', position.get('payments'), settled_before, limit
+            )
+            deletions, position['deletions'], deletions_more = self.changed_since(
+                DeletionLog.objects.all(), 'deleted_at', position.get('deletions'), settled_before, limit
+            )
+        except (TypeError, ValueError):
+            return Response({"message": "Invalid 'since' cursor or 'limit' parameter."}, status=400)
+
+        return Response({
+            "clients": ClientDetailSerializer(clients, many=True).data,
+            "contracts": ContractDetailSerializer(contracts, many=True).data,
+            "events": EventDetailSerializer(events, many=True).data,
+            "payments": [
+                dict(data, contract=payment.contract_id)
+                for payment, data in zip(payments, ContractPaymentSerializer(payments, many=True).data)
+            ],
+            "deletions": [
+                {
+                    "resource": deletion.resource, "id": deletion.object_id,
+                    "kind": deletion.kind, "deleted_at": deletion.deleted_at,
+                }
+                for deletion in deletions
+            ],
+            "next_cursor": encode_cursor(position),
+            "has_more": any([clients_more, contracts_more, events_more, payments_more, deletions_more]),
+        })
+
+    def changed_since(self, queryset, date_field, position, settled_before, limit):
+        """
+            Renvoie les objets écrits après la position [date ISO 8601, id] et au plus tard à settled_before,
+            la nouvelle position et un indicateur précisant s'il reste des objets à lire.
+        """
+        cursor = None
+        if position:
+            date, last_id = position
+            cursor = (parse_datetime(date), int(last_id))
+            if cursor[0] is None:
+                raise ValueError("Invalid cursor.")
+
+        rows = list(changed_after(queryset, date_field, cursor, settled_before)[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if rows:
+            position = [getattr(rows[-1], date_field).isoformat(), rows[-1].id]
+        return rows, position, has_more
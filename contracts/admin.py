@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Contract
+from .models import Contract, ContractPayment
 
 
 class ContractAdmin(admin.ModelAdmin):
@@ -38,5 +38,27 @@ class ContractAdmin(admin.ModelAdmin):
         return readonly_fields
 
 
+class ContractPaymentAdmin(admin.ModelAdmin):
+    """
+        Personnalisation de l'interface d'administration pour le modèle ContractPayment.
+        Le registre des paiements est en insertion seule : les écritures ne peuvent être ni modifiées ni supprimées.
+    """
+
+    list_display = ('contract', 'amount', 'recorded_at', 'note')
+    ordering = ('-id',)
+    readonly_fields = ('recorded_at',)
+
+    def has_change_permission(self, request, obj=None):
+        # Une écriture existante du registre ne peut pas être modifiée
+        return obj is None
+
+    def has_delete_permission(self, request, obj=None):
+        # Les écritures du registre ne peuvent pas être supprimées
+        return False
+
+
 # Enregistre la classe ContractAdmin avec le modèle Contract
 admin.site.register(Contract, ContractAdmin)
+
+# Enregistre la classe ContractPaymentAdmin avec le modèle ContractPayment
+admin.site.register(ContractPayment, ContractPaymentAdmin)
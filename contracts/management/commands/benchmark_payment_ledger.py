@@ -0,0 +1,118 @@
+import io
+import threading
+import time
+from contextlib import redirect_stdout
+from django.core.management.base import BaseCommand
+from django.db import connection, OperationalError
+from rich.console import Console
+from rich.table import Table
+
+from contracts.models import ConcurrentUpdateError, Contract, ContractPayment
+
+
+class Command(BaseCommand):
+    """
+        Cette commande compare le débit d'enregistrement des paiements sous écritures concurrentes :
+        - mise à jour en place de remaining_amount (lecture puis Contract.save, UPDATE ... WHERE id=? AND version=?),
+        - insertion dans le registre des paiements (ContractPayment.save).
+
+        Les deux écrivains passent par les méthodes save des modèles, comme l'application.
+        Un contrat temporaire est créé pour la mesure puis supprimé ; les détails imprimés
+        par le message 'contract.saved' sont masqués pendant la mesure.
+        Les résultats sont représentatifs sur MySQL, SQLite sérialisant toutes les écritures.
+    """
+    help = 'Comparer le registre des paiements et la mise à jour en place sous écritures concurrentes'
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument('--writers', type=int, default=8, help="Nombre d'écrivains concurrents")
+        parser.add_argument('--payments', type=int, default=200, help='Nombre de paiements par écrivain')
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande et affiche les résultats sous forme de tableau.
+        """
+        console = Console()
+        writers = options['writers']
+        payments = options['payments']
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Mode", style="cyan")
+        table.add_column("Écrivains", style="cyan")
+        table.add_column("Paiements", style="cyan")
+        table.add_column("Durée (s)", style="cyan")
+        table.add_column("Paiements/s", style="cyan")
+        table.add_column("Conflits / verrous", style="cyan")
+
+        for mode, writer in (('Mise à jour en place', self.in_place_writer), ('Registre', self.ledger_writer)):
+            contract = Contract.objects.create(total_amount=1e12, remaining_amount=1e12)
+            try:
+                duration, conflicts = self.run_writers(writer, contract.pk, writers, payments)
+            finally:
+                Contract.objects.filter(pk=contract.pk).delete()
+
+            total = writers * payments
+            table.add_row(
+                mode, str(writers), str(total), f"{duration:.3f}", f"{total / duration:.0f}", str(conflicts)
+            )
+
+        console.print(table)
+
+    def run_writers(self, writer, contract_id, writers, payments):
+        """
+            Lance les écrivains dans des threads et renvoie la durée totale et le nombre de conflits.
+        """
+        conflicts = []
+        threads = [
+            threading.Thread(target=self.run_writer, args=(writer, contract_id, payments, conflicts))
+            for _ in range(writers)
+        ]
+
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            duration = time.perf_counter() - start
+        return duration, sum(conflicts)
+
+    def run_writer(self, writer, contract_id, payments, conflicts):
+        """Exécute un écrivain et ferme la connexion propre au thread."""
+        try:
+            conflicts.append(writer(contract_id, payments))
+        finally:
+            connection.close()
+
+    def in_place_writer(self, contract_id, payments):
+        """
+            Enregistre les paiements en modifiant remaining_amount en place (Contract.save).
+            Chaque tentative relit le contrat et recommence en cas de conflit de version.
+        """
+        conflicts = 0
+        for _ in range(payments):
+            while True:
+                try:
+                    contract = Contract.objects.get(pk=contract_id)
+                    contract.remaining_amount -= 1.0
+                    contract.save()
+                    break
+                except (ConcurrentUpdateError, OperationalError):
+                    conflicts += 1
+        return conflicts
+
+    def ledger_writer(self, contract_id, payments):
+        """Enregistre les paiements par insertion dans le registre (ContractPayment.save)."""
+        conflicts = 0
+        for _ in range(payments):
+            while True:
+                try:
+                    ContractPayment.objects.create(contract_id=contract_id, amount=1.0)
+                    break
+                except OperationalError:
+                    conflicts += 1
+        return conflicts
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from rich.console import Console
+
+from contracts.models import compact_payment_ledger
+
+
+class Command(BaseCommand):
+    """
+        Cette commande intègre périodiquement les paiements du registre dans le solde des contrats
+        (remaining_amount), afin que le calcul du solde courant ne porte que sur un petit nombre de paiements.
+        Elle est destinée à être planifiée (cron, tâche planifiée Windows, ...).
+    """
+    help = 'Compacter le registre des paiements dans le solde des contrats'
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument('--contract', type=int, action='append', help='Limiter le compactage à un contrat')
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande et affiche le nombre de contrats compactés.
+        """
+        console = Console()
+        compacted = compact_payment_ledger(contract_ids=options['contract'])
+        console.print(f"[bold green]{compacted} contrat(s) compacté(s).[/bold green]")
@@ -7,6 +7,7 @@ from rich.table import Table
 from profiles.models import Client
 from contracts.models import Contract
 from contracts.views import ContractViewSet
+from profiles.display import DisplayColumn, add_display_arguments, display_rows, get_display_queryset
 
 
 class Command(BaseCommand):
@@ -17,6 +18,18 @@ class Command(BaseCommand):
     """
     help = 'Afficher, créer, modifier, supprimer des contrats'
 
+    # Colonnes affichées par --display_contracts
+    display_columns = [
+        DisplayColumn("ID", 'id'),
+        DisplayColumn("Client", 'client__full_name'),
+        DisplayColumn("Contact commercial", 'sales_contact__full_name'),
+        DisplayColumn("Date de création", 'creation_date'),
+        # Convertit la valeur booléenne en une chaîne lisible
+        DisplayColumn("Status du contrat", 'status_contract', lambda signed: "Signé" if signed else "Non signé"),
+        DisplayColumn("Montant total du contrat", 'total_amount'),
+        DisplayColumn("Montant restant à payer sur le contrat", 'current_remaining_amount_value'),
+    ]
+
     def add_arguments(self, parser):
         """
             Ajoute les arguments spécifiques à la commande.
@@ -27,6 +40,7 @@ class Command(BaseCommand):
         parser.add_argument('--create_contract', action='store_true', help='Créer un nouveau contrat')
         parser.add_argument('--update_contract', type=int, help='Mettre à jour un contrat en spécifiant son ID')
         parser.add_argument('--delete_contract', type=int, help='Supprimer un contrat en spécifiant son ID')
+        add_display_arguments(parser)
 
     def handle(self, *args, **options):
         """
@@ -37,41 +51,9 @@ class Command(BaseCommand):
         contract_view_set = ContractViewSet()
 
         if options['display_contracts']:
-            # Appele la méthode all_clients_details pour lire les informations des clients
-            response = contract_view_set.all_contracts_details(request=None)
-
-            # Utilise la propriété data de l'objet Response pour accéder au contenu JSON
-            data = response.data
-
-            # Affiche les données sous forme de tableau avec rich
-            table = Table(show_header=True, header_style="bold magenta")
-            table.add_column("ID", style="cyan")
-            table.add_column("Client", style="cyan")
-            table.add_column("Contact commercial", style="cyan")
-            table.add_column("Date de création", style="cyan")
-            table.add_column("Status du contrat", style="cyan")
-            table.add_column("Montant total du contrat", style="cyan")
-            table.add_column("Montant restant à payer sur le contrat", style="cyan")
-
-            for contract in data:
-                # Convertit la valeur booléenne en une chaîne lisible
-                status_contract_str = "Signé" if contract.get('status_contract', False) else "Non signé"
-
-                # Convertit les valeurs de type float en chaînes de caractères
-                total_amount_str = str(contract.get('total_amount', ''))
-                remaining_amount_str = str(contract.get('remaining_amount', ''))
-
-                table.add_row(
-                    str(contract.get('id', '')),
-                    contract.get('client', ''),
-                    contract.get('sales_contact', ''),
-                    contract.get('creation_date', ''),
-                    status_contract_str,
-                    total_amount_str,
-                    remaining_amount_str
-                )
-
-            console.print(table)
+            # Lit les contrats page par page (solde courant compris) et les affiche au fur et à mesure
+            contracts = get_display_queryset(Contract.objects.with_current_balance(), options)
+            display_rows(contracts, self.display_columns, options, console, self.stdout)
 
         elif options['create_contract']:
             # Utilise Rich pour améliorer la sortie en ligne de commande
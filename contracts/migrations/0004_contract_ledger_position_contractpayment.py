@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0003_contract_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contract',
+            name='ledger_position',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='ContractPayment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.FloatField()),
+                ('recorded_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='contracts.contract', verbose_name='Contract')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0005_contract_contract_update_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contract',
+            name='change_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='contractpayment',
+            name='change_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['change_seq', 'id'], name='contract_change_seq_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contractpayment',
+            index=models.Index(fields=['change_seq', 'id'], name='payment_change_seq_id_idx'),
+        ),
+    ]
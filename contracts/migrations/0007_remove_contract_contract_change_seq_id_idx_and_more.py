@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0006_contract_change_seq_contractpayment_change_seq_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='contract',
+            name='contract_change_seq_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='contractpayment',
+            name='payment_change_seq_id_idx',
+        ),
+        migrations.RemoveField(
+            model_name='contract',
+            name='change_seq',
+        ),
+        migrations.RemoveField(
+            model_name='contractpayment',
+            name='change_seq',
+        ),
+        migrations.AddIndex(
+            model_name='contractpayment',
+            index=models.Index(fields=['recorded_at', 'id'], name='payment_recorded_at_id_idx'),
+        ),
+    ]
@@ -1,10 +1,83 @@
-from django.db import models
+from datetime import timedelta
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, Max, Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from outbox.models import publish, register_handler
 from profiles.models import User, Client
 
 
-class Contract(models.Model):
+class ConcurrentUpdateError(Exception):
+    """Exception levée lorsqu'un objet a été modifié par une autre requête depuis sa lecture."""
+
+
+class VersionedModel(models.Model):
+    """
+        Modèle abstrait ajoutant un contrôle de concurrence optimiste par numéro de version.
+
+        Chaque mise à jour est exécutée sous la forme UPDATE ... WHERE id=? AND version=?
+        et incrémente la version. Si aucune ligne n'est modifiée alors que la ligne existe, l'objet
+        a été mis à jour entre-temps par une autre requête et ConcurrentUpdateError est levée.
+        Si la ligne n'existe pas, Django reprend la main (insertion pour une clé primaire explicite,
+        DatabaseError pour une mise à jour forcée ou avec update_fields).
+    """
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        """Surcharge la mise à jour pour la conditionner à la version lue."""
+        expected_version = self.version
+        new_version = expected_version + 1
+        version_field = self._meta.get_field('version')
+
+        # Remplace (ou ajoute) la valeur de la colonne version dans la requête UPDATE
+        values = [value for value in values if value[0] is not version_field]
+        values.append((version_field, None, new_version))
+
+        filtered = base_qs.filter(pk=pk_val)
+        if self._meta.select_on_save and not forced_update and not filtered.exists():
+            return False
+
+        updated = filtered.filter(version=expected_version)._update(values) > 0
+        if not updated:
+            # Aucune ligne avec cette clé primaire : comportement standard de Django
+            if not filtered.exists():
+                return False
+            raise ConcurrentUpdateError(
+                f"{self._meta.object_name} {pk_val} was modified by another request (version {expected_version})."
+            )
+
+        self.version = new_version
+        return True
+
+
+class ContractQuerySet(models.QuerySet):
+    """QuerySet des contrats permettant de calculer le solde courant à partir du registre des paiements."""
+
+    def with_current_balance(self):
+        """
+            Annote chaque contrat avec :
+            - ledger_tail_amount: somme des paiements non encore compactés (id > ledger_position).
+            - current_remaining_amount_value: solde courant (remaining_amount - ledger_tail_amount).
+
+            Le calcul est réalisé dans une seule requête grâce à une sous-requête corrélée.
+        """
+        tail = ContractPayment.objects.filter(
+            contract=OuterRef('pk'), id__gt=OuterRef('ledger_position')
+        ).order_by().values('contract').annotate(total=Sum('amount')).values('total')
+
+        return self.annotate(
+            ledger_tail_amount=Coalesce(Subquery(tail, output_field=models.FloatField()), Value(0.0))
+        ).annotate(
+            current_remaining_amount_value=F('remaining_amount') - F('ledger_tail_amount')
+        )
+
+
+class Contract(VersionedModel):
     """
         Modèle représentant un contrat entre un vendeur et un client.
 
@@ -15,10 +88,15 @@ class Contract(models.Model):
         - update_date: Date de la dernière mise à jour du contrat (auto-générée lors de chaque sauvegarde).
         - status_contract: Statut du contrat (signé ou non signé).
         - total_amount: Montant total du contrat.
-        - remaining_amount: Montant restant à payer sur le contrat.
+        - remaining_amount: Montant restant à payer lors du dernier compactage du registre des paiements.
+        - ledger_position: ID du dernier paiement intégré dans remaining_amount.
+        - version: Numéro de version utilisé pour le contrôle de concurrence optimiste.
 
         Méthodes:
             __str__: Renvoie une représentation en chaîne du contrat.
+            current_remaining_amount: Solde courant (remaining_amount moins les paiements non compactés).
+            remaining_amount_as_of: Solde restant à payer à une date donnée.
+            record_payment: Ajoute un paiement au registre sans modifier la ligne du contrat.
             print_details: Imprime les détails du contrat.
             save: Enregistre le contrat.
     """
@@ -35,6 +113,16 @@ class Contract(models.Model):
     status_contract = models.BooleanField(default=False, verbose_name="Contract signed")
     total_amount = models.FloatField(default=0.0)
     remaining_amount = models.FloatField(default=0.0)
+    ledger_position = models.PositiveBigIntegerField(default=0, editable=False)
+
+    objects = ContractQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Index utilisé par le flux de modifications (crm/changes/)
+            # et par les filtres sur la date de mise à jour (option --since des commandes d'affichage)
+            models.Index(fields=['update_date', 'id'], name='contract_update_date_id_idx'),
+        ]
 
     def __str__(self):
         """Renvoie une représentation lisible de l'instance de Contrat."""
@@ -43,6 +131,64 @@ class Contract(models.Model):
 
         return f"Contrat ID : {self.id} {status_contract_str} - {client_name}"
 
+    @property
+    def current_remaining_amount(self):
+        """
+            Renvoie le solde courant : le solde compacté moins les paiements non encore compactés.
+
+            Utilise l'annotation de ContractQuerySet.with_current_balance ou les paiements préchargés
+            (prefetch_related('payments')) lorsqu'ils sont présents ; sinon une requête est exécutée.
+            Pour une liste de contrats, utiliser l'une de ces deux méthodes afin d'éviter une requête par contrat.
+        """
+        if hasattr(self, 'current_remaining_amount_value'):
+            return self.current_remaining_amount_value
+
+        if not self.pk:
+            return self.remaining_amount
+
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('payments')
+        if prefetched is not None:
+            tail = sum(payment.amount for payment in prefetched if payment.id > self.ledger_position)
+        else:
+            tail = self.payments.filter(id__gt=self.ledger_position).aggregate(total=Sum('amount'))['total']
+        return self.remaining_amount - (tail or 0.0)
+
+    def remaining_amount_as_of(self, date):
+        """
+            Renvoie le solde restant à payer à la date indiquée.
+
+            Le solde à une date passée est le solde courant auquel on rajoute
+            tous les paiements enregistrés après cette date. Les modifications manuelles du solde
+            sont enregistrées dans le registre (set_remaining_amount) et sont donc prises en compte.
+        """
+        later_payments = self.payments.filter(recorded_at__gt=date).aggregate(total=Sum('amount'))['total']
+        return self.current_remaining_amount + (later_payments or 0.0)
+
+    def record_payment(self, amount, note=''):
+        """Ajoute un paiement au registre (insertion seule, la ligne du contrat n'est pas modifiée)."""
+        return ContractPayment.objects.create(contract=self, amount=amount, note=note)
+
+    def set_remaining_amount(self, remaining_amount):
+        """
+            Remplace le solde courant par remaining_amount, sans enregistrer le contrat.
+
+            L'écart avec le solde courant est enregistré dans le registre sous la forme d'une écriture
+            d'ajustement, compactée ensuite comme un paiement : le solde aux dates antérieures
+            (remaining_amount_as_of) reste exact. À appeler dans la transaction qui enregistre le contrat.
+        """
+        # Verrouille la ligne du contrat contre un compactage concurrent (les paiements sont insérés sans verrou) ;
+        # le solde compacté et la position du registre sont conservés, seul l'ajustement est enregistré
+        ledger_position, compacted_amount = Contract.objects.select_for_update().filter(pk=self.pk).values_list(
+            'ledger_position', 'remaining_amount'
+        ).get()
+        tail = self.payments.filter(id__gt=ledger_position).aggregate(total=Sum('amount'))['total']
+        adjustment = compacted_amount - (tail or 0.0) - remaining_amount
+
+        self.remaining_amount = compacted_amount
+        self.ledger_position = ledger_position
+        if adjustment:
+            self.record_payment(adjustment, note="Ajustement manuel du solde")
+
     def print_details(self):
         """Affiche les détails de contrat dans la console."""
         print()
@@ -63,7 +209,8 @@ class Contract(models.Model):
             Si le contrat est nouvellement créé et le sales_contact n'est pas défini,
             attribuez-le automatiquement en utilisant le sales_contact du client associé.
             Mets à jour la date de mise à jour avant de sauvegarder.
-            Imprime les détails après la sauvegarde.
+            Publie le message 'contract.saved' dans la même transaction que la sauvegarde
+            (affichage des détails immédiat ou différé selon OUTBOX_DELIVERY).
         """
         # Si le contrat est nouvellement créé et le sales_contact n'est pas défini
         # attribution automatique en utilisant le sales_contact du client associé
@@ -72,7 +219,133 @@ class Contract(models.Model):
 
         # Mets à jour la date de mise à jour avant de sauvegarder
         self.update_date = timezone.now()
-        super(Contract, self).save(*args, **kwargs)
+        with transaction.atomic():
+            super(Contract, self).save(*args, **kwargs)
+
+            # Publie les effets secondaires de la sauvegarde
+            publish('contract.saved', {'id': self.pk}, instance=self)
+
+
+@register_handler('contract.saved')
+def handle_contract_saved(payload, instance=None):
+    """
+        Gestionnaire du message 'contract.saved'.
+        Imprime les détails du contrat ; un contrat supprimé entre-temps est ignoré.
+    """
+    contract = instance
+    if contract is None:
+        contract = Contract.objects.select_related('client', 'sales_contact').filter(pk=payload['id']).first()
+        if contract is None:
+            return
+
+    # Imprime les détails après la sauvegarde
+    contract.print_details()
+
+
+class ContractPayment(models.Model):
+    """
+        Modèle représentant une écriture du registre des paiements d'un contrat.
+
+        Le registre est en insertion seule : une écriture n'est jamais modifiée ni supprimée.
+        Une correction est enregistrée sous la forme d'une nouvelle écriture de montant négatif.
+
+        Attributs:
+        - contract: Contrat concerné par le paiement.
+        - amount: Montant payé (déduit du solde restant à payer).
+        - recorded_at: Date d'enregistrement du paiement.
+        - note: Commentaire facultatif.
+    """
+    contract = models.ForeignKey(
+        Contract, on_delete=models.CASCADE, related_name='payments', verbose_name="Contract"
+    )
+    amount = models.FloatField()
+    recorded_at = models.DateTimeField(default=timezone.now, db_index=True)
+    note = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Index utilisé par le flux de modifications (crm/changes/)
+            models.Index(fields=['recorded_at', 'id'], name='payment_recorded_at_id_idx'),
+        ]
+
+    def __str__(self):
+        """Renvoie une représentation lisible de l'instance de ContractPayment."""
+        return f"Paiement ID : {self.id} Contrat ID : {self.contract_id} - {self.amount}"
+
+    def save(self, *args, **kwargs):
+        """
+            Enregistre le paiement, uniquement lors de sa création.
+
+            L'insertion ne verrouille pas la ligne du contrat : le compactage du registre n'intègre que les
+            paiements sous le filigrane get_payment_watermark, dont les transactions d'insertion sont validées.
+        """
+        if self.pk:
+            raise ValueError("Contract payments are append-only and cannot be modified.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Refuse la suppression d'une écriture du registre."""
+        raise ValueError("Contract payments are append-only and cannot be deleted.")
+
+
+def get_payment_watermark(now=None):
+    """
+        Renvoie le filigrane du registre des paiements : l'identifiant en dessous duquel (inclus)
+        toutes les transactions d'insertion sont validées.
+
+        L'identifiant d'un paiement est attribué avant la validation de son insertion : un paiement
+        d'identifiant inférieur à un paiement déjà visible peut encore être en cours d'insertion.
+        Les paiements enregistrés depuis moins de CHANGEFEED_SETTLE_SECONDS sont considérés comme
+        non validés, comme pour le flux de modifications : le filigrane s'arrête avant le premier d'entre eux.
+    """
+    now = now or timezone.now()
+    settled_before = now - timedelta(seconds=settings.CHANGEFEED_SETTLE_SECONDS)
+    first_unsettled = ContractPayment.objects.filter(recorded_at__gt=settled_before).aggregate(
+        first_id=Min('id')
+    )['first_id']
+    if first_unsettled is not None:
+        return first_unsettled - 1
+    return ContractPayment.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+
+
+def compact_payment_ledger(contract_ids=None):
+    """
+        Intègre les paiements non compactés dans le solde des contrats (remaining_amount).
+
+        Seuls les paiements dont l'identifiant ne dépasse pas le filigrane (get_payment_watermark) sont
+        intégrés : leurs insertions sont validées, et tout paiement intégré ensuite aura un identifiant
+        supérieur à ledger_position. Aucun paiement ne peut donc être ignoré par le solde courant,
+        sans que l'insertion d'un paiement ne verrouille la ligne du contrat.
+        Chaque contrat est compacté dans une transaction courte qui verrouille la ligne du contrat
+        (contre une modification concurrente du solde, Contract.set_remaining_amount).
+
+        Retourne le nombre de contrats compactés.
+    """
+    watermark = get_payment_watermark()
+    tails = ContractPayment.objects.filter(id__gt=F('contract__ledger_position'), id__lte=watermark)
+    if contract_ids is not None:
+        tails = tails.filter(contract_id__in=contract_ids)
+    candidate_ids = list(tails.order_by().values_list('contract_id', flat=True).distinct())
+
+    compacted = 0
+    for contract_id in candidate_ids:
+        with transaction.atomic():
+            ledger_position = Contract.objects.select_for_update().filter(pk=contract_id).values_list(
+                'ledger_position', flat=True
+            ).first()
+            if ledger_position is None:
+                continue
+
+            tail = ContractPayment.objects.filter(
+                contract_id=contract_id, id__gt=ledger_position, id__lte=watermark
+            ).aggregate(total=Sum('amount'), last_id=Max('id'))
+            if tail['last_id'] is None:
+                continue
 
-        # Imprime les détails après la sauvegarde
-        self.print_details()
+            compacted += Contract.objects.filter(pk=contract_id).update(
+                remaining_amount=F('remaining_amount') - tail['total'],
+                ledger_position=tail['last_id'],
+                version=F('version') + 1,
+            )
+    return compacted
@@ -1,8 +1,12 @@
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 
-from .models import Contract
+from .models import Contract, ContractPayment
 from profiles.models import User, Client
+from EpicEvents.serializers import (
+    FuzzySlugRelatedField, SparseFieldsetMixin, ValuesListSerializer, ValuesSerializerMixin
+)
 
 
 class MultipleSerializerMixin:
@@ -28,7 +32,7 @@ class MultipleSerializerMixin:
         return super().get_serializer_class()
 
 
-class ContractListSerializer(serializers.ModelSerializer):
+class ContractListSerializer(ValuesSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """
         Serializer pour la liste des contrats.
         Ce serializer est utilisé pour représenter les données de la liste des contrats dans le CRM.
@@ -44,9 +48,10 @@ class ContractListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Contract
         fields = ['id', 'client', 'sales_contact']
+        list_serializer_class = ValuesListSerializer
 
 
-class ContractDetailSerializer(serializers.ModelSerializer):
+class ContractDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
         Serializer pour les détails d'un contrat.
         Ce serializer est utilisé pour représenter les détails d'un contrat spécifique dans le CRM.
@@ -58,20 +63,110 @@ class ContractDetailSerializer(serializers.ModelSerializer):
             - 'status_contract': Statut du contrat (signé ou non signé).
             - 'total_amount': Montant total du contrat.
             - 'remaining_amount': Montant restant à payer sur le contrat.
+                        En lecture, il s'agit du solde courant (solde compacté moins les paiements non compactés).
+                        En écriture, une valeur différente du solde courant remplace le solde
+                        et intègre les paiements déjà enregistrés.
             - 'creation_date': Date de création du contrat.
             - 'update_date': Date de mise à jour du contrat.
-            - 'client': Un SlugRelatedField représentant le client associé au contrat.
-                        Il permet de spécifier le client en utilisant son nom complet.
-            - 'sales_contact': Un SlugRelatedField représentant le contact commercial associé au contrat.
-                        Il permet de spécifier le contact commercial en utilisant son nom complet.
+            - 'version': Numéro de version du contrat (lecture seule), à renvoyer dans l'en-tête If-Match.
+            - 'client': Un FuzzySlugRelatedField représentant le client associé au contrat.
+                        Il permet de spécifier le client en utilisant son nom complet (ou un nom proche).
+            - 'sales_contact': Un FuzzySlugRelatedField représentant le contact commercial associé au contrat.
+                        Il permet de spécifier le contact commercial en utilisant son nom complet (ou un nom proche).
     """
-    # Champs utilisant SlugRelatedField pour la lecture et l'écriture
-    client = serializers.SlugRelatedField(slug_field='full_name', queryset=Client.objects.all())
-    sales_contact = serializers.SlugRelatedField(
-        slug_field='full_name', queryset=User.objects.filter(role=User.ROLE_SALES)
+    # Champs utilisant FuzzySlugRelatedField pour la lecture et l'écriture
+    client = FuzzySlugRelatedField(slug_field='full_name', queryset=Client.objects.all(), fuzzy_scope='clients')
+    sales_contact = FuzzySlugRelatedField(
+        slug_field='full_name', queryset=User.objects.filter(role=User.ROLE_SALES), fuzzy_scope='sales'
     )
 
     class Meta:
         model = Contract
         fields = ['id', 'client', 'sales_contact', 'status_contract', 'total_amount',
-                  'remaining_amount', 'creation_date', 'update_date']
+                  'remaining_amount', 'creation_date', 'update_date', 'version']
+
+    # La version est renvoyée dans l'en-tête ETag, même si le champ n'est pas demandé
+    always_loaded_fields = ['version']
+
+    @classmethod
+    def get_sparse_queryset(cls, queryset, fields=None):
+        """Ajoute le calcul du solde courant au queryset lorsque remaining_amount est demandé."""
+        queryset = super().get_sparse_queryset(queryset, fields)
+        if (fields is None or 'remaining_amount' in fields) and \
+                'current_remaining_amount_value' not in queryset.query.annotations:
+            queryset = queryset.with_current_balance()
+        return queryset
+
+    def to_representation(self, instance):
+        """Renvoie le solde courant dans le champ remaining_amount."""
+        data = super().to_representation(instance)
+        if 'remaining_amount' in data:
+            data['remaining_amount'] = instance.current_remaining_amount
+        return data
+
+    def update(self, instance, validated_data):
+        """
+            Mets à jour le contrat.
+
+            Si remaining_amount est identique au solde courant, le solde compacté n'est pas modifié.
+            Sinon, la nouvelle valeur remplace le solde et l'écart est enregistré dans le registre des paiements
+            (Contract.set_remaining_amount), dans la même transaction que l'enregistrement du contrat.
+        """
+        with transaction.atomic():
+            if 'remaining_amount' in validated_data:
+                remaining_amount = validated_data.pop('remaining_amount')
+                if remaining_amount != instance.current_remaining_amount:
+                    instance.set_remaining_amount(remaining_amount)
+
+            # Le solde annoté lors de la lecture n'est plus à jour après la modification
+            instance.__dict__.pop('current_remaining_amount_value', None)
+            return super().update(instance, validated_data)
+
+
+class ContractPaymentSerializer(serializers.ModelSerializer):
+    """
+        Serializer pour les écritures du registre des paiements d'un contrat.
+
+        Champs :
+            - 'id': Identifiant unique du paiement.
+            - 'amount': Montant payé, un montant négatif enregistre une correction.
+            - 'recorded_at': Date d'enregistrement du paiement.
+            - 'note': Commentaire facultatif.
+    """
+    class Meta:
+        model = ContractPayment
+        fields = ['id', 'amount', 'recorded_at', 'note']
+        read_only_fields = ['id', 'recorded_at']
+
+    def validate_amount(self, value):
+        # Un paiement nul n'a pas de sens dans le registre
+        if value == 0:
+            raise serializers.ValidationError("The payment amount cannot be zero.")
+        return value
+
+
+class ClientOverviewContractSerializer(serializers.ModelSerializer):
+    """
+        Serializer des contrats d'un client dans la vue d'ensemble du client (lecture seule).
+
+        Champs :
+        - 'id': Identifiant unique du contrat.
+        - 'sales_contact': Nom complet du contact commercial associé au contrat.
+        - 'status_contract': Statut du contrat (signé ou non signé).
+        - 'total_amount': Montant total du contrat.
+        - 'remaining_amount': Solde courant restant à payer sur le contrat.
+        - 'creation_date': Date de création du contrat.
+        - 'update_date': Date de mise à jour du contrat.
+    """
+    sales_contact = serializers.ReadOnlyField(source='sales_contact.full_name')
+    remaining_amount = serializers.ReadOnlyField(source='current_remaining_amount')
+
+    class Meta:
+        model = Contract
+        fields = ['id', 'sales_contact', 'status_contract', 'total_amount', 'remaining_amount',
+                  'creation_date', 'update_date']
+
+    @staticmethod
+    def get_overview_queryset():
+        """Renvoie le queryset de préchargement des contrats, avec leur solde courant et leur contact commercial."""
+        return Contract.objects.with_current_balance().select_related('sales_contact').order_by('id')
@@ -2,13 +2,17 @@ import pytest
 import json
 import sys
 from io import StringIO
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import Contract
+from .models import Contract, ContractPayment, ConcurrentUpdateError, compact_payment_ledger, get_payment_watermark
 from profiles.models import User, Client
+from search.autocomplete import autocomplete_index
 
 
 @pytest.mark.django_db
@@ -168,6 +172,97 @@ class TestContractsApp(TestCase):
             contract_to_save.update_date, contract_to_save.creation_date, delta=timezone.timedelta(seconds=1)
         )
 
+    def test_payment_ledger_balance(self):
+        """Teste le calcul du solde courant à partir du registre des paiements."""
+        self.contract_user.record_payment(500.0)
+        self.contract_user.record_payment(200.0)
+
+        # Les paiements sont insérés sans modifier la ligne du contrat
+        self.contract_user.refresh_from_db()
+        self.assertEqual(self.contract_user.remaining_amount, 1500.0)
+        self.assertEqual(self.contract_user.current_remaining_amount, 800.0)
+
+        # Le solde annoté par le QuerySet est identique
+        annotated = Contract.objects.with_current_balance().get(pk=self.contract_user.pk)
+        self.assertEqual(annotated.current_remaining_amount, 800.0)
+
+    def test_payment_ledger_compaction(self):
+        """Teste le compactage du registre des paiements dans le solde du contrat."""
+        first_payment = self.contract_user.record_payment(500.0)
+        last_payment = self.contract_user.record_payment(200.0)
+
+        # Les paiements récents (insertion possiblement non validée) ne sont pas intégrés
+        self.assertEqual(get_payment_watermark(), first_payment.id - 1)
+        self.assertEqual(compact_payment_ledger(), 0)
+
+        with override_settings(CHANGEFEED_SETTLE_SECONDS=0):
+            self.assertEqual(compact_payment_ledger(), 1)
+
+            self.contract_user.refresh_from_db()
+            self.assertEqual(self.contract_user.remaining_amount, 800.0)
+            self.assertEqual(self.contract_user.ledger_position, last_payment.id)
+            self.assertEqual(self.contract_user.current_remaining_amount, 800.0)
+
+            # Un second compactage n'a rien à intégrer
+            self.assertEqual(compact_payment_ledger(), 0)
+
+        # Le solde se lit sans requête sur les paiements préchargés
+        contracts = Contract.objects.prefetch_related('payments').filter(pk=self.contract_user.pk)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual([contract.current_remaining_amount for contract in contracts], [800.0])
+        self.assertEqual(len(queries), 2)
+
+    @override_settings(CHANGEFEED_SETTLE_SECONDS=60)
+    def test_payment_ledger_watermark(self):
+        """Teste que le compactage s'arrête avant le premier paiement récent, même suivi de paiements anciens."""
+        recent_payment = self.contract_user.record_payment(500.0)
+        settled_payment = self.contract_user.record_payment(200.0)
+        ContractPayment.objects.filter(pk=settled_payment.pk).update(
+            recorded_at=timezone.now() - timezone.timedelta(minutes=5)
+        )
+
+        # recent_payment pourrait être suivi d'un paiement d'identifiant intermédiaire non encore validé
+        self.assertEqual(get_payment_watermark(), recent_payment.id - 1)
+        self.assertEqual(compact_payment_ledger(), 0)
+
+        ContractPayment.objects.filter(pk=recent_payment.pk).update(
+            recorded_at=timezone.now() - timezone.timedelta(minutes=5)
+        )
+        self.assertEqual(get_payment_watermark(), settled_payment.id)
+        self.assertEqual(compact_payment_ledger(), 1)
+        self.contract_user.refresh_from_db()
+        self.assertEqual(self.contract_user.remaining_amount, 800.0)
+
+    def test_payment_ledger_as_of(self):
+        """Teste le calcul du solde restant à payer à une date passée."""
+        before_payments = timezone.now()
+        payment = self.contract_user.record_payment(500.0)
+
+        self.assertEqual(self.contract_user.remaining_amount_as_of(before_payments), 1500.0)
+        self.assertEqual(self.contract_user.remaining_amount_as_of(payment.recorded_at), 1000.0)
+
+        # Une modification manuelle du solde est enregistrée dans le registre : l'historique reste exact
+        before_reset = timezone.now()
+        self.contract_user.set_remaining_amount(1200.0)
+        self.contract_user.save()
+        self.contract_user.refresh_from_db()
+        self.assertEqual(self.contract_user.current_remaining_amount, 1200.0)
+        self.assertEqual(self.contract_user.remaining_amount_as_of(before_reset), 1000.0)
+        self.assertEqual(self.contract_user.remaining_amount_as_of(before_payments), 1500.0)
+
+        # L'ajustement est compacté comme un paiement
+        with override_settings(CHANGEFEED_SETTLE_SECONDS=0):
+            self.assertEqual(compact_payment_ledger(), 1)
+        self.contract_user.refresh_from_db()
+        self.assertEqual(self.contract_user.remaining_amount, 1200.0)
+        self.assertEqual(self.contract_user.current_remaining_amount, 1200.0)
+
+        # Le registre est en insertion seule
+        with self.assertRaises(ValueError):
+            payment.save()
+        with self.assertRaises(ValueError):
+            payment.delete()
+
 
 @pytest.mark.django_db
 class TestContractViewSet(TestCase):
@@ -368,6 +463,45 @@ class TestContractViewSet(TestCase):
         # Vérifie que le texte spécifié est présent dans la réponse
         self.assertIn("You do not have permission to access this contract.", response.content.decode())
 
+    def test_contract_details_not_found(self):
+        # Test de la vue contract_details pour un contrat inexistant
+        url = '/crm/contracts/9999/contract_details/'
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}')
+
+        # Vérifie que la réponse a le statut HTTP 404 (Not Found) et non 403 (Forbidden)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_contracts_batch_details(self):
+        # Le contrat 2 appartient à un autre commercial, l'id 9999 n'existe pas
+        self.contract_user2.sales_contact = self.sales_user2
+        self.contract_user2.save()
+
+        ids = [self.contract_user3.pk, self.contract_user1.pk, self.contract_user2.pk, 9999]
+        url = f"/crm/contracts/batch_details/?ids={','.join(map(str, ids))}&fields=id,total_amount"
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['found_ids'], [self.contract_user3.pk, self.contract_user1.pk])
+        self.assertEqual(response.data['forbidden_ids'], [self.contract_user2.pk])
+        self.assertEqual(response.data['not_found_ids'], [9999])
+        self.assertEqual(response.data['data'][1], {'id': self.contract_user1.pk, 'total_amount': 1500.0})
+
+        # Une requête pour l'authentification, une pour les contrats autorisés,
+        # une sur les seules clés primaires pour distinguer les contrats refusés des contrats inexistants
+        self.assertEqual(len(queries), 3)
+        self.assertNotIn('total_amount', queries[2]['sql'])
+        self.assertIn('sales_contact_id', queries[1]['sql'])
+
+    def test_contracts_batch_details_invalid_ids(self):
+        url = '/crm/contracts/batch_details/?ids=1,abc'
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        url = '/crm/contracts/batch_details/'
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_all_contracts_details(self):
         # Test la vue all_contracts_details
         url = '/crm/contracts/all_contracts_details/'
@@ -375,6 +509,30 @@ class TestContractViewSet(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(len(response.data) > 0)
 
+    def test_all_contracts_details_exclude_fields(self):
+        # Test la vue all_contracts_details en excluant des champs
+        url = '/crm/contracts/all_contracts_details/?exclude=client,remaining_amount'
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user2}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(len(response.data) > 0)
+        for contract_data in response.data:
+            self.assertNotIn('client', contract_data)
+            self.assertNotIn('remaining_amount', contract_data)
+            self.assertIn('sales_contact', contract_data)
+
+    def test_display_contracts(self):
+        # Le montant restant à payer affiché est le solde courant, paiements non compactés compris
+        self.contract_user1.record_payment(200.0)
+
+        out = StringIO()
+        call_command('management_contract', '--display_contracts', '--format', 'tsv', '--limit', '1', stdout=out)
+        lines = [line.split('\t') for line in out.getvalue().splitlines()]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1][0], str(self.contract_user1.id))
+        self.assertEqual(lines[1][4], "Signé" if self.contract_user1.status_contract else "Non signé")
+        self.assertEqual(float(lines[1][6]), 300.0)
+
     def test_filtered_contracts(self):
         # Crée un jeton d'accès pour sales_user1
         refresh_sales_user1 = RefreshToken.for_user(self.sales_user1)
@@ -514,6 +672,175 @@ class TestContractViewSet(TestCase):
         self.assertEqual(str(response.data["data"]["total_amount"]), update_contract_data["total_amount"])
         self.assertEqual(str(response.data["data"]["remaining_amount"]), update_contract_data["remaining_amount"])
 
+    def test_update_contract_fuzzy_names(self):
+        # L'index des noms est partagé par le processus : il est reconstruit à partir des données du test
+        autocomplete_index.reset()
+
+        url = f'/crm/contracts/{self.contract_user1.pk}/'
+        data = {'client': 'Ned Flandres ', 'total_amount': '1500.0', 'sales_contact': 'timothy lovejoy'}
+
+        def put(fuzzy):
+            return self.client.put(
+                f'{url}?fuzzy={fuzzy}', data=json.dumps(data),
+                content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}'
+            )
+
+        # Correspondance exacte uniquement
+        response = put('off')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data['client']), 1)
+
+        # L'index n'est jamais construit sur le chemin des écritures : correspondance exacte uniquement
+        response = put('resolve')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data['client']), 1)
+        self.assertFalse(autocomplete_index.is_built())
+
+        # Index construit (au démarrage du serveur)
+        autocomplete_index.ensure_built()
+
+        # Les noms proches sont proposés dans l'erreur
+        response = put('suggest')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['client'][1], "Did you mean: Ned Flanders?")
+        self.assertEqual(response.data['sales_contact'][1], "Did you mean: Timothy Lovejoy?")
+
+        # Les noms proches sont retenus
+        response = put('resolve')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['client'], 'Ned Flanders')
+        self.assertEqual(response.data['data']['sales_contact'], 'Timothy Lovejoy')
+
+        # Un nom trop éloigné n'est pas résolu
+        data['client'] = 'Homer Simpson'
+        self.assertEqual(put('resolve').status_code, status.HTTP_400_BAD_REQUEST)
+        autocomplete_index.reset()
+
+    def test_update_contract_version_conflict(self):
+        # Données du contrat mis à jour
+        update_contract_data = {
+            'client': 'Ned Flanders',
+            'total_amount': '2000.0',
+            'remaining_amount': '1500.99',
+            'status_contract': 'True',
+            'sales_contact': self.sales_user1.full_name
+        }
+
+        url = f'/crm/contracts/{self.contract_user1.pk}/'
+
+        # Première mise à jour avec la version courante du contrat
+        response = self.client.put(
+            url,
+            data=json.dumps(update_contract_data),
+            content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}',
+            HTTP_IF_MATCH=f'"{self.contract_user1.version}"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], f'"{self.contract_user1.version + 1}"')
+
+        # Seconde mise à jour avec la version désormais périmée
+        response = self.client.put(
+            url,
+            data=json.dumps(update_contract_data),
+            content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}',
+            HTTP_IF_MATCH=f'"{self.contract_user1.version}"'
+        )
+
+        # Vérifie que la réponse a le statut HTTP 412 (Precondition Failed)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_update_contract_weak_if_match(self):
+        update_contract_data = {
+            'client': 'Ned Flanders',
+            'total_amount': '2000.0',
+            'remaining_amount': '1500.99',
+            'status_contract': 'True',
+            'sales_contact': self.sales_user1.full_name
+        }
+
+        # If-Match exige une comparaison forte : une étiquette faible ne correspond jamais
+        response = self.client.put(
+            f'/crm/contracts/{self.contract_user1.pk}/',
+            data=json.dumps(update_contract_data),
+            content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}',
+            HTTP_IF_MATCH=f'W/"{self.contract_user1.version}"'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.contract_user1.refresh_from_db()
+        self.assertEqual(float(self.contract_user1.remaining_amount), 500.0)
+
+        # L'ETag d'une réponse compressée est accepté : le suffixe de l'encodage est retiré
+        response = self.client.put(
+            f'/crm/contracts/{self.contract_user1.pk}/',
+            data=json.dumps(update_contract_data),
+            content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}',
+            HTTP_IF_MATCH=f'"{self.contract_user1.version}-gzip"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_save_stale_contract_raises_conflict(self):
+        # Deux lectures du même contrat
+        first_copy = Contract.objects.get(pk=self.contract_user1.pk)
+        second_copy = Contract.objects.get(pk=self.contract_user1.pk)
+
+        first_copy.remaining_amount = 100.0
+        first_copy.save()
+
+        # La seconde copie est périmée, la mise à jour conditionnelle ne modifie aucune ligne
+        second_copy.remaining_amount = 200.0
+        with self.assertRaises(ConcurrentUpdateError):
+            with transaction.atomic():
+                second_copy.save()
+
+        self.assertEqual(Contract.objects.get(pk=self.contract_user1.pk).remaining_amount, 100.0)
+
+    def test_save_contract_with_explicit_pk(self):
+        # Une clé primaire explicite absente de la table donne lieu à une insertion (loaddata, fixtures)
+        contract = Contract(pk=999, client=self.client_user, total_amount=1.0)
+        contract.save()
+        self.assertEqual(Contract.objects.get(pk=999).total_amount, 1.0)
+
+        # Une seconde sauvegarde est une mise à jour conditionnée à la version
+        contract.total_amount = 2.0
+        contract.save()
+        self.assertEqual(Contract.objects.get(pk=999).version, 2)
+
+        # Une mise à jour forcée d'une ligne inexistante lève l'erreur standard de Django
+        with self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                Contract(pk=1000, total_amount=1.0).save(force_update=True)
+        with self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                Contract(pk=1000, total_amount=1.0).save(update_fields=['total_amount'])
+        self.assertFalse(Contract.objects.filter(pk=1000).exists())
+
+    def test_contract_payments(self):
+        url = f'/crm/contracts/{self.contract_user1.pk}/payments/'
+
+        # Ajoute un paiement au registre du contrat
+        response = self.client.post(
+            url,
+            data=json.dumps({'amount': 500.0, 'note': 'Acompte'}),
+            content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(ContractPayment.objects.filter(contract=self.contract_user1).count(), 1)
+
+        # Le solde courant tient compte du paiement
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['remaining_amount'], self.contract_user1.remaining_amount - 500.0)
+        self.assertEqual(len(response.data['payments']), 1)
+
+        # Un commercial non associé au contrat ne peut pas enregistrer de paiement
+        response = self.client.post(
+            url,
+            data=json.dumps({'amount': 500.0}),
+            content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user2}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_update_contract_unauthorized_user(self):
         # Assure que le contract_user1 est associé à sales_user1
         self.assertEqual(self.contract_user1.sales_contact, self.sales_user1)
@@ -1,21 +1,53 @@
 import sentry_sdk
 from sentry_sdk import capture_exception
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponseForbidden
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
 from django.db.models import Q
-from django.utils.decorators import method_decorator
-from django.views.decorators.csrf import csrf_protect
 
-from .models import Contract
+from .models import Contract, ConcurrentUpdateError
 from .permissions import ContractPermissions
-from .serializers import MultipleSerializerMixin, ContractListSerializer, ContractDetailSerializer
+from .serializers import (
+    MultipleSerializerMixin,
+    ContractListSerializer,
+    ContractDetailSerializer,
+    ContractPaymentSerializer
+)
+from EpicEvents.compression import strip_etag_encoding
+from EpicEvents.serializers import SparseFieldsetViewMixin
+from archive.models import ArchivedContract, include_archived
+from profiles.views import BatchDetailsMixin
 
 
-@method_decorator(csrf_protect, name='dispatch')
-class ContractViewSet(MultipleSerializerMixin, ModelViewSet):
+class WeakETagError(ValueError):
+    """Exception levée lorsque l'en-tête If-Match contient une étiquette faible (W/"3")."""
+
+
+def get_if_match_version(request):
+    """
+        Retourne la version attendue transmise dans l'en-tête If-Match, ou None si l'en-tête est absent.
+
+        Accepte les formes 3 et "3", ainsi que l'ETag d'une réponse compressée ("3-gzip", EpicEvents.compression).
+        La valeur '*' est ignorée.
+        If-Match utilise la comparaison forte (RFC 9110, section 13.1.1) : une étiquette faible ne correspond
+        jamais à la version et lève WeakETagError.
+        Lève ValueError si la valeur n'est pas un numéro de version.
+    """
+    if_match = request.headers.get('If-Match', '').strip()
+    if not if_match or if_match == '*':
+        return None
+
+    if if_match.startswith('W/'):
+        raise WeakETagError("If-Match requires a strong ETag.")
+    return int(strip_etag_encoding(if_match.strip('"')))
+
+
+class ContractViewSet(BatchDetailsMixin, SparseFieldsetViewMixin, MultipleSerializerMixin, ModelViewSet):
     """ViewSet pour gérer les opérations CRUD sur les objets Contract (CRM)."""
 
     def __init__(self, *args, **kwargs):
@@ -32,7 +64,7 @@ class ContractViewSet(MultipleSerializerMixin, ModelViewSet):
         super().__init__(*args, **kwargs)
         self.initialize_contract_permissions()
 
-    queryset = Contract.objects.all()
+    queryset = Contract.objects.with_current_balance()
     serializer_class = ContractListSerializer
     permission_classes = [IsAuthenticated, ContractPermissions]
 
@@ -43,6 +75,11 @@ class ContractViewSet(MultipleSerializerMixin, ModelViewSet):
         'update': ContractDetailSerializer
     }
 
+    # contract_details et batch_details : seuls les contrats de l'utilisateur sont chargés
+    details_action = 'contract_details'
+    details_serializer_class = ContractDetailSerializer
+    details_owner_field = 'sales_contact'
+
     contract_permissions = None
 
     def initialize_contract_permissions(self):
@@ -56,34 +93,48 @@ class ContractViewSet(MultipleSerializerMixin, ModelViewSet):
         """
         return self.serializers.get(self.action, self.serializer_class)
 
+    @staticmethod
+    def with_archived(request, contracts, *args, **kwargs):
+        """
+            Renvoie les données sérialisées des contrats, suivies des contrats archivés
+            répondant aux mêmes filtres lorsque la requête le demande (?include_archived=1).
+        """
+        data = ContractDetailSerializer.from_request(request, contracts).data
+        if include_archived(request):
+            archived_contracts = ArchivedContract.objects.with_current_balance().filter(*args, **kwargs)
+            data = list(data) + list(ContractDetailSerializer.from_request(request, archived_contracts).data)
+        return data
+
     @action(detail=False, methods=['GET'])
     def contracts_list(self, request):
         """Renvoie tous les contrats associé à l'utilisateur connecté."""
         contracts = Contract.objects.filter(sales_contact=request.user)
-        serializer = ContractDetailSerializer(contracts, many=True)
-        return Response(serializer.data)
+        return Response(self.with_archived(request, contracts, sales_contact=request.user))
 
     @action(detail=True, methods=['GET'])
     def contract_details(self, request, pk=None):
         """Renvoie les détails d'un contrat spécifique associé à l'utilisateur."""
-        contract = self.get_object()
+        try:
+            # Le queryset est déjà filtré sur le contrat de l'utilisateur actuellement authentifié
+            contract = self.get_object()
+        except Http404:
+            # Distingue un contrat inexistant (404) d'un contrat appartenant à un autre utilisateur (403)
+            if not Contract.objects.filter(pk=pk).exists():
+                raise
 
-        # Vérifie si le contrat appartient à l'utilisateur actuellement authentifié
-        if contract.sales_contact != request.user:
             # Capture l'exception et envoie une alerte à Sentry
             capture_exception(Exception("Unauthorized access to contract_details"))
 
             return HttpResponseForbidden("You do not have permission to access this contract.")
 
-        serializer = ContractDetailSerializer(contract)
-        return Response(serializer.data)
+        serializer = ContractDetailSerializer(contract, fields=ContractDetailSerializer.get_sparse_fields(request))
+        return Response(serializer.data, headers={'ETag': f'"{contract.version}"'})
 
     @action(detail=False, methods=['GET'])
     def all_contracts_details(self, request):
         """Renvoie les détails de tous les contrats."""
         contracts = Contract.objects.all()
-        serializer = ContractDetailSerializer(contracts, many=True)
-        return Response(serializer.data)
+        return Response(self.with_archived(request, contracts))
 
     @action(detail=False, methods=['GET'])
     def filtered_contracts(self, request):
@@ -98,23 +149,64 @@ class ContractViewSet(MultipleSerializerMixin, ModelViewSet):
             :return: Une réponse HTTP contenant les données des contrats filtrés.
         """
         if Contract.objects.filter(sales_contact=request.user).exists():
-            contracts = Contract.objects.filter(
-                Q(
-                    sales_contact=request.user,
-                    status_contract=False,
-                    remaining_amount__gt=0.0
-                ) | Q(
-                    sales_contact=request.user,
-                    status_contract=True,
-                    remaining_amount__gt=0.0
-                )
-            ).exclude(Q(status_contract=True, remaining_amount=0.0))
-
-            serializer = ContractDetailSerializer(contracts, many=True)
-            return Response(serializer.data)
+            # Le solde courant tient compte des paiements non compactés du registre
+            filters = Q(
+                sales_contact=request.user,
+                status_contract=False,
+                current_remaining_amount_value__gt=0.0
+            ) | Q(
+                sales_contact=request.user,
+                status_contract=True,
+                current_remaining_amount_value__gt=0.0
+            )
+            excluded = Q(status_contract=True, current_remaining_amount_value=0.0)
+            contracts = Contract.objects.with_current_balance().filter(filters).exclude(excluded)
+
+            # Les contrats archivés étant soldés, le filtre n'en retient aucun, même avec ?include_archived=1
+            return Response(self.with_archived(request, contracts, filters & ~excluded))
         else:
             return HttpResponseForbidden("You are not authorized to access this view.")
 
+    @action(detail=True, methods=['GET', 'POST'])
+    def payments(self, request, pk=None):
+        """
+            Gère le registre des paiements d'un contrat.
+
+            GET : renvoie les paiements et le solde restant à payer,
+                  à la date indiquée par le paramètre 'as_of' (format ISO 8601) s'il est fourni.
+            POST : ajoute un paiement au registre (insertion seule, la ligne du contrat n'est pas modifiée).
+        """
+        contract = self.get_object()
+        if not self.contract_permissions.has_update_permission(request, contract.sales_contact):
+            # Capture l'exception et envoie une alerte à Sentry
+            capture_exception(Exception("Unauthorized access to payments"))
+
+            return HttpResponseForbidden("You do not have permission to access the payments of this contract.")
+
+        if request.method == 'POST':
+            serializer = ContractPaymentSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            serializer.save(contract=contract)
+            success_message = "Payment successfully recorded."
+            return Response({"message": success_message, "data": serializer.data}, status=201)
+
+        as_of = request.query_params.get('as_of')
+        if as_of:
+            as_of_date = parse_datetime(as_of)
+            if as_of_date is None:
+                return Response({"message": "Invalid 'as_of' date."}, status=400)
+            if timezone.is_naive(as_of_date):
+                as_of_date = timezone.make_aware(as_of_date)
+
+            payments = contract.payments.filter(recorded_at__lte=as_of_date)
+            remaining_amount = contract.remaining_amount_as_of(as_of_date)
+        else:
+            payments = contract.payments.all()
+            remaining_amount = contract.current_remaining_amount
+
+        serializer = ContractPaymentSerializer(payments, many=True)
+        return Response({"remaining_amount": remaining_amount, "payments": serializer.data})
+
     def create(self, request, *args, **kwargs):
         """Crée un nouveau contrat."""
         if not self.contract_permissions.has_create_permission(request):
@@ -123,7 +215,7 @@ class ContractViewSet(MultipleSerializerMixin, ModelViewSet):
 
             return HttpResponseForbidden("You do not have permission to create a contract.")
 
-        serializer = self.serializers['create'](data=request.data)
+        serializer = self.serializers['create'](data=request.data, context=self.get_serializer_context())
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
@@ -139,11 +231,34 @@ class ContractViewSet(MultipleSerializerMixin, ModelViewSet):
 
             return HttpResponseForbidden("You do not have permission to update this contract.")
 
-        serializer = self.serializers['update'](instance, data=request.data)
+        # Vérifie la version transmise par le client dans l'en-tête If-Match
+        try:
+            expected_version = get_if_match_version(request)
+        except WeakETagError as e:
+            return Response({"message": str(e)}, status=412)
+        except ValueError:
+            return Response({"message": "Invalid If-Match header."}, status=400)
+
+        conflict_message = "This contract has been modified by another request. Reload it and try again."
+        if expected_version is not None and expected_version != instance.version:
+            return Response({"message": conflict_message}, status=412)
+
+        serializer = self.serializers['update'](
+            instance, data=request.data, context=self.get_serializer_context()
+        )
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
+
+        # La mise à jour est conditionnée à la version lue (UPDATE ... WHERE id=? AND version=?)
+        try:
+            with transaction.atomic():
+                self.perform_update(serializer)
+        except ConcurrentUpdateError:
+            return Response({"message": conflict_message}, status=412)
+
         success_message = "Contract successfully updated."
-        return Response({"message": success_message, "data": serializer.data})
+        return Response(
+            {"message": success_message, "data": serializer.data}, headers={'ETag': f'"{instance.version}"'}
+        )
 
     def destroy(self, request, *args, **kwargs):
         """Supprime un contrat existant."""
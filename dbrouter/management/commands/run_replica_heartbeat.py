@@ -0,0 +1,49 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from rich.console import Console
+
+from dbrouter.routers import write_replica_heartbeat
+
+
+class Command(BaseCommand):
+    """
+        Cette commande écrit périodiquement un battement de cœur sur la base principale.
+        Sa valeur lue sur la réplique permet de mesurer le retard de la réplication sans écrire
+        pendant le traitement des requêtes. Elle est à lancer lorsque DB_REPLICA_HOST est défini.
+    """
+    help = 'Écrire le battement de cœur utilisé pour mesurer le retard de la réplique'
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument(
+            '--interval', type=float, default=getattr(settings, 'REPLICA_HEARTBEAT_SECONDS', 1),
+            help='Attente en secondes entre deux battements'
+        )
+        parser.add_argument('--once', action='store_true', help='Écrire un seul battement puis s\'arrêter')
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande : écrit un battement toutes les 'interval' secondes
+            jusqu'à l'arrêt (Ctrl+C) ou, avec --once, après le premier battement.
+        """
+        console = Console()
+        beats = 0
+        try:
+            while True:
+                close_old_connections()
+                write_replica_heartbeat()
+                beats += 1
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+
+        except KeyboardInterrupt:
+            console.print("[bold yellow]Arrêt du battement de cœur.[/bold yellow]")
+
+        console.print(f"[bold green]{beats} battement(s) écrit(s).[/bold green]")
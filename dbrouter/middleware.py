@@ -0,0 +1,68 @@
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .routers import (
+    get_replica_alias,
+    is_user_sticky,
+    mark_user_sticky,
+    replica_is_fresh,
+    reset_replica_reads,
+    set_replica_reads
+)
+
+
+def get_request_user_key(request):
+    """
+        Renvoie l'identifiant de l'utilisateur de la requête sans interroger la base de données.
+        Le jeton JWT est utilisé pour l'API, la session pour l'administration.
+    """
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    if authorization.startswith('Bearer '):
+        try:
+            return str(AccessToken(authorization.split(' ', 1)[1])[api_settings.USER_ID_CLAIM])
+        except (TokenError, KeyError):
+            return None
+
+    session = getattr(request, 'session', None)
+    if session is not None:
+        return session.get('_auth_user_id')
+    return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+        Middleware autorisant les lectures sur la réplique pour les requêtes GET et HEAD.
+
+        Les lectures restent sur la base principale :
+            - pour les requêtes d'écriture ;
+            - pour un utilisateur ayant écrit depuis moins de REPLICA_STICKY_SECONDS ;
+            - lorsque le retard mesuré de la réplique dépasse REPLICA_MAX_LAG_SECONDS.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        alias = get_replica_alias()
+        if alias is None:
+            return self.get_response(request)
+
+        user_key = get_request_user_key(request)
+        if request.method in SAFE_METHODS:
+            use_replica = not (user_key and is_user_sticky(user_key)) and replica_is_fresh(alias)
+        else:
+            use_replica = False
+
+        token = set_replica_reads(use_replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_replica_reads(token)
+
+        # Les lectures suivant une écriture sont servies par la base principale
+        if request.method not in SAFE_METHODS and user_key:
+            mark_user_sticky(user_key)
+
+        return response
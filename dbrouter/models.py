@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class ReplicaHeartbeat(models.Model):
+    """
+        Modèle représentant le battement de cœur utilisé pour mesurer le retard de la réplique.
+
+        Une seule ligne est écrite périodiquement sur la base principale par la commande run_replica_heartbeat ;
+        sa valeur lue sur la réplique indique jusqu'où la réplication a progressé.
+
+        Champs:
+            beat_at: Date du dernier battement écrit sur la base principale.
+    """
+    beat_at = models.DateTimeField()
+
+    def __str__(self):
+        """Renvoie une représentation lisible de l'instance de ReplicaHeartbeat."""
+        return f"Battement : {self.beat_at}"
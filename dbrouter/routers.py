@@ -0,0 +1,121 @@
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils import timezone
+
+from .models import ReplicaHeartbeat
+
+
+# Indique si les lectures de la requête en cours peuvent être servies par la réplique
+_use_replica = ContextVar('use_replica', default=False)
+
+HEARTBEAT_ID = 1
+LAG_CACHE_KEY = 'dbrouter:replica_lag'
+STICKY_CACHE_KEY = 'dbrouter:sticky:{}'
+
+
+def get_replica_alias():
+    """Renvoie l'alias de la base réplique si elle est configurée, sinon None."""
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', None)
+    if alias and alias in connections.settings:
+        return alias
+    return None
+
+
+def set_replica_reads(enabled):
+    """Active ou désactive les lectures sur la réplique pour le contexte courant et renvoie le jeton de restauration."""
+    return _use_replica.set(enabled)
+
+
+def reset_replica_reads(token):
+    """Restaure l'état précédent des lectures sur la réplique."""
+    _use_replica.reset(token)
+
+
+def mark_user_sticky(user_key):
+    """
+        Dirige les lectures de l'utilisateur vers la base principale pendant REPLICA_STICKY_SECONDS
+        après une écriture, afin qu'il relise ses propres modifications.
+    """
+    cache.set(STICKY_CACHE_KEY.format(user_key), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_user_sticky(user_key):
+    """Indique si les lectures de l'utilisateur doivent encore être servies par la base principale."""
+    return bool(cache.get(STICKY_CACHE_KEY.format(user_key)))
+
+
+def write_replica_heartbeat():
+    """
+        Écrit un battement de cœur (date courante) sur la base principale.
+        Appelée toutes les REPLICA_HEARTBEAT_SECONDS par la commande run_replica_heartbeat.
+    """
+    ReplicaHeartbeat.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+        pk=HEARTBEAT_ID, defaults={'beat_at': timezone.now()}
+    )
+
+
+def measure_replica_lag(alias):
+    """
+        Mesure le retard de la réplique en secondes : écart entre la date courante et le dernier battement
+        lu sur la réplique. Les battements étant écrits toutes les REPLICA_HEARTBEAT_SECONDS,
+        la mesure majore le retard réel d'au plus cet intervalle.
+
+        La mesure est une simple lecture (aucune écriture n'est faite pendant le traitement d'une requête).
+        Renvoie None si le retard ne peut pas être mesuré (battement absent ou réplique injoignable).
+    """
+    try:
+        replica_beat = ReplicaHeartbeat.objects.using(alias).filter(
+            pk=HEARTBEAT_ID
+        ).values_list('beat_at', flat=True).first()
+    except DatabaseError:
+        return None
+
+    if replica_beat is None:
+        return None
+    return max((timezone.now() - replica_beat).total_seconds(), 0.0)
+
+
+def replica_is_fresh(alias):
+    """
+        Indique si le retard de la réplique est inférieur à REPLICA_MAX_LAG_SECONDS.
+        La mesure est conservée en cache pendant REPLICA_LAG_CHECK_SECONDS.
+    """
+    lag = cache.get(LAG_CACHE_KEY)
+    if lag is None:
+        lag = measure_replica_lag(alias)
+        # Un retard non mesurable est conservé comme infini pour retomber sur la base principale
+        lag = float('inf') if lag is None else lag
+        cache.set(LAG_CACHE_KEY, lag, settings.REPLICA_LAG_CHECK_SECONDS)
+    return lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+
+class PrimaryReplicaRouter:
+    """
+        Routeur de base de données envoyant les lectures autorisées vers la réplique.
+
+        Les écritures et les migrations vont toujours vers la base principale ;
+        les lectures ne vont vers la réplique que si le middleware ReplicaRoutingMiddleware l'a autorisé
+        pour la requête en cours.
+    """
+
+    def db_for_read(self, model, **hints):
+        """Renvoie l'alias de la réplique si les lectures y sont autorisées, sinon laisse Django choisir."""
+        if _use_replica.get():
+            return get_replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        """Les écritures vont toujours vers la base principale."""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """La réplique contient les mêmes données : les relations entre les deux bases sont autorisées."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Les migrations ne sont jamais appliquées sur la réplique, qui est alimentée par la réplication."""
+        if db == getattr(settings, 'REPLICA_DATABASE_ALIAS', None) and db != DEFAULT_DB_ALIAS:
+            return False
+        return None
@@ -0,0 +1,194 @@
+import copy
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .middleware import ReplicaRoutingMiddleware
+from .models import ReplicaHeartbeat
+from .routers import PrimaryReplicaRouter, measure_replica_lag
+from profiles.models import User, Client
+
+
+# Alias distinct de celui de la réplique configurée (DB_REPLICA_HOST), qui est un miroir pendant les tests
+REPLICA_ALIAS = 'replica_test'
+
+
+def add_replica_database():
+    """
+        Ajoute une seconde base de test, distincte de la base principale, sous l'alias de la réplique.
+        Le routeur n'y applique aucune migration : seule la table du battement de cœur y est créée.
+        La réplication est simulée par les tests, qui écrivent directement sur cette base.
+    """
+    primary = connections[DEFAULT_DB_ALIAS]
+    settings_dict = copy.deepcopy(primary.settings_dict)
+    settings_dict['TEST'] = {**settings_dict.get('TEST', {}), 'MIRROR': None, 'NAME': None}
+    if primary.vendor != 'sqlite':
+        settings_dict['TEST']['NAME'] = f"{primary.settings_dict['NAME']}_replica"
+
+    connections.settings[REPLICA_ALIAS] = settings_dict
+    connection = connections[REPLICA_ALIAS]
+    with override_settings(REPLICA_DATABASE_ALIAS=REPLICA_ALIAS):
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    with connection.schema_editor() as schema_editor:
+        schema_editor.create_model(ReplicaHeartbeat)
+
+
+def remove_replica_database():
+    """Supprime la seconde base de test ajoutée par add_replica_database."""
+    connection = connections[REPLICA_ALIAS]
+    connection.creation.destroy_test_db(connection.settings_dict['NAME'], verbosity=0)
+    del connections[REPLICA_ALIAS]
+    del connections.settings[REPLICA_ALIAS]
+
+
+@pytest.mark.django_db
+@override_settings(REPLICA_DATABASE_ALIAS=REPLICA_ALIAS)
+class TestReplicaRouting(TestCase):
+    """
+        Classe de tests pour le routeur de réplique (PrimaryReplicaRouter) et son middleware,
+        avec une réplique distincte de la base principale.
+    """
+    databases = {DEFAULT_DB_ALIAS, REPLICA_ALIAS}
+
+    @classmethod
+    def setUpClass(cls):
+        """Crée la base réplique avant l'ouverture des transactions de test."""
+        add_replica_database()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Supprime la base réplique."""
+        super().tearDownClass()
+        remove_replica_database()
+
+    def create_user(self, email, role, full_name, phone_number, is_staff=True):
+        """
+            Crée et retourne un utilisateur avec les paramètres spécifiés.
+        """
+        return User.objects.create_user(
+            email=email,
+            password='Pingou123',
+            role=role,
+            full_name=full_name,
+            phone_number=phone_number,
+            is_staff=is_staff,
+        )
+
+    def replicate_heartbeat(self, beat_at):
+        """Simule la réplication d'un battement écrit sur la base principale à la date indiquée."""
+        ReplicaHeartbeat.objects.using(REPLICA_ALIAS).update_or_create(pk=1, defaults={'beat_at': beat_at})
+
+    def setUp(self):
+        """
+            Mets en place les données nécessaires pour les tests.
+        """
+        cache.clear()
+        self.replicate_heartbeat(timezone.now())
+
+        self.user1 = self.create_user(
+            email='Timothy@EpicEvents-Sales.com',
+            role=User.ROLE_SALES,
+            full_name='Timothy Lovejoy',
+            phone_number='+345678912',
+        )
+        self.user2 = self.create_user(
+            email='Milhouse@EpicEvents-Management.com',
+            role=User.ROLE_MANAGEMENT,
+            full_name='Milhouse Van Houten',
+            phone_number='+567891234',
+        )
+
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+        self.read_databases = []
+        self.read_rows = []
+        self.middleware = ReplicaRoutingMiddleware(self.record_read_database)
+
+    def record_read_database(self, request):
+        """
+            Vue de test enregistrant la base choisie par le routeur pour une lecture
+            et la base ayant réellement servi une lecture de la table du battement de cœur.
+        """
+        self.read_databases.append(self.router.db_for_read(Client))
+        self.read_rows.append(ReplicaHeartbeat.objects.values_list('beat_at', flat=True).first())
+        return HttpResponse()
+
+    def request(self, method, user=None):
+        """
+            Exécute une requête à travers le middleware et renvoie la base utilisée pour les lectures.
+        """
+        headers = {}
+        if user:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+        self.middleware(getattr(self.factory, method)('/crm/clients/', **headers))
+        return self.read_databases[-1]
+
+    def test_get_reads_from_replica(self):
+        """
+            Vérifie que les lectures d'une requête GET sont servies par la réplique,
+            sans aucune requête sur la base principale.
+        """
+        with self.assertNumQueries(0, using=DEFAULT_DB_ALIAS):
+            self.assertEqual(self.request('get', self.user1), REPLICA_ALIAS)
+
+        # La ligne lue est celle de la réplique : la base principale ne contient aucun battement
+        self.assertIsNotNone(self.read_rows[-1])
+        self.assertFalse(ReplicaHeartbeat.objects.using(DEFAULT_DB_ALIAS).exists())
+        self.assertIsNone(self.router.db_for_read(Client))
+
+    def test_write_requests_use_primary(self):
+        """
+            Vérifie que les requêtes d'écriture lisent et écrivent sur la base principale.
+        """
+        self.assertIsNone(self.request('post', self.user1))
+        self.assertIsNone(self.read_rows[-1])
+        self.assertEqual(self.router.db_for_write(Client), DEFAULT_DB_ALIAS)
+
+    def test_reads_stick_to_primary_after_write(self):
+        """
+            Vérifie que l'utilisateur qui vient d'écrire relit la base principale, contrairement aux autres.
+        """
+        self.request('put', self.user1)
+
+        self.assertIsNone(self.request('get', self.user1))
+        self.assertEqual(self.request('get', self.user2), REPLICA_ALIAS)
+
+    def test_replica_lag_is_measured_against_current_time(self):
+        """
+            Vérifie que le retard est l'écart entre la date courante et le dernier battement répliqué,
+            et que la mesure n'écrit rien.
+        """
+        call_command('run_replica_heartbeat', '--once')
+        self.replicate_heartbeat(timezone.now() - timezone.timedelta(seconds=10))
+
+        with self.assertNumQueries(0, using=DEFAULT_DB_ALIAS):
+            self.assertAlmostEqual(measure_replica_lag(REPLICA_ALIAS), 10.0, delta=1.0)
+
+        # La réplique en retard n'est pas utilisée
+        self.assertIsNone(self.request('get', self.user1))
+
+        # Une fois le battement répliqué, la réplique est de nouveau utilisée
+        cache.clear()
+        self.replicate_heartbeat(ReplicaHeartbeat.objects.using(DEFAULT_DB_ALIAS).get().beat_at)
+        self.assertEqual(self.request('get', self.user1), REPLICA_ALIAS)
+
+    def test_unmeasured_lag_falls_back_to_primary(self):
+        """
+            Vérifie que les lectures retombent sur la base principale tant que le retard n'est pas mesurable.
+        """
+        ReplicaHeartbeat.objects.using(REPLICA_ALIAS).all().delete()
+        self.assertIsNone(measure_replica_lag(REPLICA_ALIAS))
+        self.assertIsNone(self.request('get', self.user1))
+
+    @override_settings(REPLICA_MAX_LAG_SECONDS=-1)
+    def test_lagging_replica_falls_back_to_primary(self):
+        """
+            Vérifie que les lectures retombent sur la base principale lorsque le retard dépasse le seuil.
+        """
+        self.assertIsNone(self.request('get', self.user1))
@@ -0,0 +1,166 @@
+import heapq
+from bisect import bisect_left, insort
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Event, find_support_conflicts
+from profiles.models import User
+
+
+# Poids d'un événement dans la charge d'un contact support, exprimé en nombre d'invités
+DEFAULT_EVENT_WEIGHT = 100
+
+
+class SupportSchedule:
+    """
+        Planning d'un contact support : charge actuelle et intervalles de ses événements datés.
+
+        Les intervalles sont triés par date de début. Un intervalle chevauchant [start, end[ commence
+        avant end et au plus tard max_duration avant start : seuls ces intervalles sont parcourus.
+    """
+
+    def __init__(self, user_id, full_name):
+        self.user_id = user_id
+        self.full_name = full_name
+        self.count = 0
+        self.attendees = 0
+        self.intervals = []
+        self.max_duration = None
+
+    def load(self, event_weight):
+        """Renvoie la charge du contact : nombre d'événements pondéré et nombre total d'invités."""
+        return self.count * event_weight + self.attendees
+
+    def is_available(self, start, end):
+        """Indique si le contact n'a aucun événement sur l'intervalle [start, end[."""
+        if start is None or end is None or not self.intervals:
+            return True
+        position = bisect_left(self.intervals, (end,)) - 1
+        earliest_start = start - self.max_duration
+        while position >= 0 and self.intervals[position][0] > earliest_start:
+            if self.intervals[position][1] > start:
+                return False
+            position -= 1
+        return True
+
+    def add(self, start, end, attendees):
+        """Ajoute un événement au planning du contact."""
+        self.count += 1
+        self.attendees += attendees
+        if start is not None and end is not None and end > start:
+            insort(self.intervals, (start, end))
+            duration = end - start
+            self.max_duration = duration if self.max_duration is None else max(self.max_duration, duration)
+
+
+def plan_support_assignments(events=None, event_weight=DEFAULT_EVENT_WEIGHT):
+    """
+        Calcule l'affectation de contacts support aux événements qui n'en ont pas.
+
+        Args:
+            events: Queryset des événements à affecter (tous les événements sans support par défaut).
+            event_weight: Poids d'un événement dans la charge, en nombre d'invités.
+
+        Renvoie un couple (affectations, événements non affectés) : les affectations sont des dictionnaires
+        {'event_id', 'event_name', 'support_contact_id', 'support_contact'} et les événements non affectés
+        ceux pour lesquels aucun contact support n'est disponible sur la période.
+
+        Algorithme glouton : les événements sont traités du plus grand au plus petit nombre d'invités,
+        et chacun est confié au contact disponible le moins chargé, extrait d'un tas trié par charge.
+        Le calcul utilise deux requêtes (contacts support et leurs événements, événements à affecter).
+    """
+    if events is None:
+        events = Event.objects.filter(support_contact__isnull=True)
+
+    schedules = {
+        user_id: SupportSchedule(user_id, full_name)
+        for user_id, full_name in User.objects.filter(role=User.ROLE_SUPPORT, is_active=True).values_list(
+            'id', 'full_name'
+        )
+    }
+    assigned_events = Event.objects.filter(support_contact_id__in=schedules).values_list(
+        'support_contact_id', 'event_date_start', 'event_date_end', 'attendees'
+    )
+    for user_id, start, end, attendees in assigned_events.iterator():
+        schedules[user_id].add(start, end, attendees)
+
+    heap = [(schedule.load(event_weight), user_id) for user_id, schedule in schedules.items()]
+    heapq.heapify(heap)
+
+    to_assign = sorted(
+        events.filter(support_contact__isnull=True).values_list(
+            'id', 'event_name', 'event_date_start', 'event_date_end', 'attendees'
+        ),
+        key=lambda event: (-event[4], event[0])
+    )
+
+    assignments, unassigned = [], []
+    for event_id, event_name, start, end, attendees in to_assign:
+        # Extrait les contacts par charge croissante jusqu'au premier disponible sur la période
+        skipped, chosen = [], None
+        while heap:
+            load, user_id = heapq.heappop(heap)
+            if schedules[user_id].is_available(start, end):
+                chosen = schedules[user_id]
+                break
+            skipped.append((load, user_id))
+
+        if chosen is None:
+            unassigned.append({'event_id': event_id, 'event_name': event_name})
+        else:
+            chosen.add(start, end, attendees)
+            skipped.append((chosen.load(event_weight), chosen.user_id))
+            assignments.append({
+                'event_id': event_id,
+                'event_name': event_name,
+                'support_contact_id': chosen.user_id,
+                'support_contact': chosen.full_name,
+            })
+
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+
+    return assignments, unassigned
+
+
+def apply_support_assignments(assignments):
+    """
+        Enregistre les affectations calculées par plan_support_assignments, en une requête par contact support.
+
+        Le plan est calculé sans verrou : les contacts support concernés sont verrouillés (comme lors de la
+        création ou de la mise à jour d'un événement, EventViewSet.get_support_conflicts), puis chaque événement
+        est vérifié de nouveau. Seuls les événements toujours sans support et ne chevauchant aucun événement
+        du contact (find_support_conflicts) sont modifiés ; les autres sont ignorés.
+        La version et la date de mise à jour sont mises à jour comme lors d'une sauvegarde.
+        Renvoie le nombre d'événements affectés.
+    """
+    by_support_contact = {}
+    for assignment in assignments:
+        by_support_contact.setdefault(assignment['support_contact_id'], []).append(assignment['event_id'])
+
+    updated = 0
+    now = timezone.now()
+    with transaction.atomic():
+        list(User.objects.select_for_update().filter(pk__in=by_support_contact).order_by('pk').values_list(
+            'pk', flat=True
+        ))
+        events = {
+            event_id: (start, end)
+            for event_id, start, end in Event.objects.select_for_update().filter(
+                pk__in=[event_id for event_ids in by_support_contact.values() for event_id in event_ids],
+                support_contact__isnull=True
+            ).values_list('id', 'event_date_start', 'event_date_end')
+        }
+        for support_contact_id, event_ids in sorted(by_support_contact.items()):
+            available_ids = [
+                event_id for event_id in event_ids
+                if event_id in events and not find_support_conflicts(
+                    support_contact_id, *events[event_id], exclude_pk=event_id
+                ).exists()
+            ]
+            if available_ids:
+                updated += Event.objects.filter(pk__in=available_ids).update(
+                    support_contact_id=support_contact_id, version=F('version') + 1, update_date=now
+                )
+    return updated
@@ -0,0 +1,59 @@
+import time
+from django.core.management.base import BaseCommand
+from rich.console import Console
+from rich.table import Table
+
+from events.assignment import DEFAULT_EVENT_WEIGHT, apply_support_assignments, plan_support_assignments
+
+
+class Command(BaseCommand):
+    """
+        Cette commande affecte automatiquement des contacts support aux événements qui n'en ont pas.
+        La charge des contacts support est équilibrée (nombre d'événements et nombre d'invités)
+        sans leur confier deux événements sur la même période.
+    """
+    help = 'Affecter des contacts support aux événements sans support'
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument(
+            '--dry_run', action='store_true', help='Affiche les affectations sans les enregistrer'
+        )
+        parser.add_argument(
+            '--event_weight', type=int, default=DEFAULT_EVENT_WEIGHT,
+            help='Poids d\'un événement dans la charge d\'un contact, en nombre d\'invités'
+        )
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande et affiche les affectations calculées.
+        """
+        console = Console()
+
+        started = time.perf_counter()
+        assignments, unassigned = plan_support_assignments(event_weight=options['event_weight'])
+        updated = 0 if options['dry_run'] else apply_support_assignments(assignments)
+        elapsed = time.perf_counter() - started
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("ID de l'événement", style="cyan")
+        table.add_column("Nom de l'événement", style="cyan")
+        table.add_column("Contact de support", style="cyan")
+
+        for assignment in assignments:
+            table.add_row(str(assignment['event_id']), assignment['event_name'], assignment['support_contact'])
+        for event in unassigned:
+            table.add_row(str(event['event_id']), event['event_name'], "[red]Aucun contact disponible[/red]")
+
+        console.print(table)
+        if options['dry_run']:
+            console.print(
+                f"[bold magenta]{len(assignments)} affectation(s) calculée(s), non enregistrée(s)[/bold magenta]"
+            )
+        else:
+            console.print(f"[bold magenta]{updated} événement(s) affecté(s)[/bold magenta]")
+        console.print(f"{len(unassigned)} événement(s) sans contact disponible, calculé en {elapsed:.2f} s")
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from rich.console import Console
+from rich.table import Table
+
+from events.models import find_stale_client_copies, propagate_client_contacts
+
+
+class Command(BaseCommand):
+    """
+        Cette commande vérifie que le nom et les coordonnées du client recopiés dans les événements
+        (client_name, client_contact) correspondent aux valeurs actuelles des clients.
+        Avec --fix, les copies obsolètes sont mises à jour par lots.
+    """
+    help = 'Vérifier (et corriger) les copies des informations client dans les événements'
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument('--fix', action='store_true', help='Met à jour les événements dont la copie est obsolète')
+        parser.add_argument('--batch_size', type=int, default=500, help='Nombre de clients traités par lot')
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande et affiche les événements dont la copie est obsolète.
+        """
+        console = Console()
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("ID de l'événement", style="cyan")
+        table.add_column("ID du client", style="cyan")
+        table.add_column("Nom enregistré", style="cyan")
+        table.add_column("Nom du client", style="cyan")
+        table.add_column("Contact enregistré", style="cyan")
+        table.add_column("Contact du client", style="cyan")
+
+        client_ids, count = set(), 0
+        stale_events = find_stale_client_copies().values_list(
+            'id', 'client_id', 'client_name', 'expected_client_name', 'client_contact', 'expected_client_contact'
+        )
+        for event_id, client_id, *values in stale_events.iterator():
+            client_ids.add(client_id)
+            count += 1
+            table.add_row(str(event_id), str(client_id), *values)
+
+        if not count:
+            console.print("[bold green]Toutes les copies des informations client sont à jour.[/bold green]")
+            return
+
+        console.print(table)
+        console.print(
+            f"[bold red]{count} événement(s) avec une copie obsolète ({len(client_ids)} client(s))[/bold red]"
+        )
+
+        if options['fix']:
+            updated = propagate_client_contacts(client_ids, batch_size=options['batch_size'])
+            console.print(f"[bold magenta]{updated} événement(s) mis à jour[/bold magenta]")
@@ -10,6 +10,7 @@ from contracts.models import Contract
 from profiles.models import User, Client
 from events.models import Event
 from events.views import EventViewSet
+from profiles.display import DisplayColumn, add_display_arguments, display_rows, get_display_queryset
 
 
 class Command(BaseCommand):
@@ -20,6 +21,21 @@ class Command(BaseCommand):
     """
     help = 'Afficher, créer, modifier, supprimer des événements'
 
+    # Colonnes affichées par --display_events
+    display_columns = [
+        DisplayColumn("ID", 'id'),
+        DisplayColumn("Nom de l'événement", 'event_name'),
+        DisplayColumn("ID du contrat", 'contract_id'),
+        DisplayColumn("Nom du client", 'client__full_name'),
+        DisplayColumn("Contact du client", 'client_contact'),
+        DisplayColumn("Date de début de l'événement", 'event_date_start'),
+        DisplayColumn("Date de fin de l'événement", 'event_date_end'),
+        DisplayColumn("Contact de support", 'support_contact__full_name'),
+        DisplayColumn("Lieu", 'location'),
+        DisplayColumn("Nombre d'invités", 'attendees'),
+        DisplayColumn("Notes", 'notes'),
+    ]
+
     def add_arguments(self, parser):
         """
             Ajoute les arguments spécifiques à la commande.
@@ -30,6 +46,7 @@ class Command(BaseCommand):
         parser.add_argument('--create_event', action='store_true', help='Créer un nouvel événement')
         parser.add_argument('--update_event', type=int, help='Mettre à jour un événement en spécifiant son ID')
         parser.add_argument('--delete_event', type=int, help='Supprimer un événement en spécifiant son ID')
+        add_display_arguments(parser)
 
     def handle(self, *args, **options):
         """
@@ -40,51 +57,9 @@ class Command(BaseCommand):
         event_view_set = EventViewSet()
 
         if options['display_events']:
-            # Appele la méthode all_events_details pour lire les informations des événements
-            response = event_view_set.all_events_details(request=None)
-
-            # Utilise la propriété data de l'objet Response pour accéder au contenu JSON
-            data = response.data
-
-            # Affiche les données sous forme de tableau avec rich
-            table = Table(show_header=True, header_style="bold magenta")
-            table.add_column("ID", style="cyan")
-            table.add_column("Nom de l'événement", style="cyan")
-            table.add_column("ID du contrat", style="cyan")
-            table.add_column("Nom du client", style="cyan")
-            table.add_column("Contact du client", style="cyan")
-            table.add_column("Date de début de l'événement", style="cyan")
-            table.add_column("Date de fin de l'événement", style="cyan")
-            table.add_column("Contact de support", style="cyan")
-            table.add_column("Lieu", style="cyan")
-            table.add_column("Nombre d'invités", style="cyan")
-            table.add_column("Notes", style="cyan")
-
-            for event in data:
-                # Assure que 'client' et 'contract' sont présents dans le dictionnaire de l'événement
-                if 'client' in event and isinstance(
-                    event['client'], dict
-                ) and 'contract' in event and isinstance(event['contract'], dict):
-                    # Mets à jour client_name, client_contact et contract_id avant l'affichage
-                    event['client_name'] = event['client']['full_name']
-                    event['client_contact'] = f"{event['client']['email']} {event['client']['phone_number']}"
-                    event['contract'] = event['contract']['id']
-
-                table.add_row(
-                    str(event['id']),
-                    str(event['event_name']),
-                    str(event.get('contract', '')),
-                    str(event['client']),
-                    str(event.get('client_contact', '')),
-                    str(event.get('event_date_start', '')),
-                    str(event.get('event_date_end', '')),
-                    str(event.get('support_contact', '')),
-                    str(event.get('location', '')),
-                    str(event.get('attendees', '')),
-                    str(event.get('notes', ''))
-                )
-
-            console.print(table)
+            # Lit les événements page par page et les affiche au fur et à mesure
+            events = get_display_queryset(Event.objects.all(), options)
+            display_rows(events, self.display_columns, options, console, self.stdout)
 
         elif options['create_event']:
             # Utilise Rich pour améliorer la sortie en ligne de commande
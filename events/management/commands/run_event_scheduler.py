@@ -0,0 +1,78 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+from rich.console import Console
+
+from events.reminders import REMINDER_SINKS, ReminderScheduler, get_reminder_sink
+
+
+class Command(BaseCommand):
+    """
+        Cette commande envoie des rappels aux contacts support avant le début de leurs événements.
+        Les événements à venir sont chargés en mémoire une seule fois, puis chaque itération ne lit
+        que les modifications et suppressions survenues depuis la précédente.
+        Les rappels envoyés sont enregistrés en base de données : un redémarrage ne les renvoie pas.
+    """
+    help = 'Envoyer les rappels des événements à venir'
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument(
+            '--sink', choices=list(REMINDER_SINKS), default=getattr(settings, 'EVENT_REMINDER_SINK', 'log'),
+            help='Destination des rappels'
+        )
+        parser.add_argument('--file', help='Fichier de destination des rappels (avec --sink file)')
+        parser.add_argument(
+            '--lead_minutes', type=int, default=getattr(settings, 'EVENT_REMINDER_LEAD_MINUTES', 1440),
+            help='Délai en minutes entre le rappel et le début de l\'événement'
+        )
+        parser.add_argument(
+            '--poll_interval', type=float, default=30.0,
+            help='Attente maximale en secondes entre deux lectures des modifications'
+        )
+        parser.add_argument('--once', action='store_true', help='Envoyer les rappels échus puis s\'arrêter')
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande : lit les modifications, envoie les rappels échus
+            puis attend le prochain rappel (au plus poll_interval secondes), jusqu'à l'arrêt (Ctrl+C).
+        """
+        console = Console()
+
+        if options['sink'] == 'file':
+            if not options['file']:
+                raise CommandError("L'option --file est requise avec --sink file.")
+            sink = get_reminder_sink('file', path=options['file'])
+        else:
+            sink = get_reminder_sink(options['sink'])
+
+        scheduler = ReminderScheduler(sink, lead_time=timedelta(minutes=options['lead_minutes']))
+        scheduler.load()
+        console.print(f"[bold magenta]{len(scheduler.scheduled)} rappel(s) planifié(s)[/bold magenta]")
+
+        sent = 0
+        try:
+            while True:
+                close_old_connections()
+                scheduler.refresh()
+                sent += scheduler.fire_due()
+                if options['once']:
+                    break
+
+                next_reminder_at = scheduler.next_reminder_at()
+                delay = options['poll_interval']
+                if next_reminder_at is not None:
+                    delay = min(delay, max((next_reminder_at - timezone.now()).total_seconds(), 0))
+                time.sleep(delay)
+
+        except KeyboardInterrupt:
+            console.print("[bold yellow]Arrêt du planificateur.[/bold yellow]")
+
+        console.print(f"[bold green]{sent} rappel(s) envoyé(s).[/bold green]")
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_sentreminder'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='event',
+            name='event_change_seq_id_idx',
+        ),
+        migrations.RemoveField(
+            model_name='event',
+            name='change_seq',
+        ),
+    ]
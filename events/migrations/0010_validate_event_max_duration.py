@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import F
+
+
+def validate_event_max_duration(apps, schema_editor):
+    """
+        Vérifie qu'aucun événement existant ne dépasse la durée maximale (EVENT_MAX_DURATION_DAYS) :
+        un tel événement serait ignoré par le calendrier et la détection des chevauchements.
+    """
+    Event = apps.get_model('events', 'Event')
+    max_duration = timedelta(days=getattr(settings, 'EVENT_MAX_DURATION_DAYS', 366))
+    too_long = list(
+        Event.objects.using(schema_editor.connection.alias).filter(
+            event_date_start__isnull=False, event_date_end__gt=F('event_date_start') + max_duration
+        ).order_by('id').values_list('id', flat=True)[:100]
+    )
+    if too_long:
+        raise RuntimeError(
+            f"Events {too_long} last more than {max_duration.days} days: shorten them "
+            f"or raise EVENT_MAX_DURATION_DAYS before migrating."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_remove_event_event_change_seq_id_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(validate_event_max_duration, migrations.RunPython.noop),
+    ]
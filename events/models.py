@@ -1,9 +1,19 @@
-from django.db import models
-from contracts.models import Contract
+import heapq
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import CharField, F, Q, Value
+from django.db.models.functions import Concat
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from contracts.models import Contract, VersionedModel
+from outbox.models import publish, register_handler
 from profiles.models import User, Client
 
 
-class Event(models.Model):
+class Event(VersionedModel):
     """
         Modèle représentant un événement lié à un contrat et à un client.
 
@@ -19,6 +29,8 @@ class Event(models.Model):
             location (str): L'emplacement de l'événement.
             attendees (int): Le nombre d'invités prévu.
             notes (str): Des notes ou des détails supplémentaires sur l'événement.
+            update_date (datetime): La date de la dernière mise à jour de l'événement.
+            version (int): Numéro de version utilisé pour le contrôle de concurrence optimiste.
 
         Methods:
             __str__: Renvoie une représentation sous forme de chaîne de l'événement.
@@ -52,6 +64,21 @@ class Event(models.Model):
     location = models.TextField(blank=True)
     attendees = models.PositiveIntegerField(default=0)
     notes = models.TextField(blank=True)
+    update_date = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Un seul événement par contrat, garanti par la base de données
+            models.UniqueConstraint(fields=['contract'], name='unique_event_per_contract'),
+        ]
+        indexes = [
+            # Index utilisé par le flux de modifications (crm/changes/)
+            # et par les filtres sur la date de mise à jour (option --since des commandes d'affichage)
+            models.Index(fields=['update_date', 'id'], name='event_update_date_id_idx'),
+            # Index utilisés par le calendrier (crm/events/calendar/) et la détection des chevauchements
+            models.Index(fields=['event_date_start', 'event_date_end'], name='event_date_range_idx'),
+            models.Index(fields=['support_contact', 'event_date_start'], name='event_support_start_idx'),
+        ]
 
     def __str__(self):
         """Renvoie une représentation lisible de l'instance de Event."""
@@ -83,18 +110,201 @@ class Event(models.Model):
             print(f"{attribute} : {value}" if value is not None else f"Aucun {attribute} défini.")
         print()
 
+    def clean(self):
+        """
+            Vérifie que la durée de l'événement ne dépasse pas la durée maximale (EVENT_MAX_DURATION_DAYS),
+            sur laquelle reposent le calendrier et la détection des chevauchements.
+        """
+        max_duration = get_event_max_duration()
+        if self.event_date_start and self.event_date_end and self.event_date_end - self.event_date_start > max_duration:
+            raise ValidationError(
+                {'event_date_end': f"An event cannot last more than {max_duration.days} days."}
+            )
+
     def save(self, *args, **kwargs):
         """
-            Surcharge la méthode save pour mettre à jour client_name et client_contact avant la sauvegarde,
-            puis imprime les détails de l'événement.
+            Surcharge la méthode save pour vérifier la durée de l'événement (clean, quel que soit le point d'entrée :
+            API, administration ou commandes), mettre à jour client_name et client_contact avant la sauvegarde,
+            puis publie le message 'event.saved' dans la même transaction que la sauvegarde
+            (affichage des détails immédiat ou différé selon OUTBOX_DELIVERY).
         """
+        self.clean()
+
         # Mets à jour client_name et client_contact avant la sauvegarde si le client est défini
         if self.client:
             self.client_name = self.client.full_name
             # Concatène l'e-mail et le numéro de téléphone pour le champ client_contact
-            self.client_contact = f"{self.client.email} {self.client.phone_number}"
+            self.client_contact = get_client_contact(self.client.email, self.client.phone_number)
+
+        with transaction.atomic():
+            super(Event, self).save(*args, **kwargs)
+
+            # Publie les effets secondaires de la sauvegarde
+            publish('event.saved', {'id': self.pk}, instance=self)
+
+
+class SentReminder(models.Model):
+    """
+        Modèle représentant le rappel envoyé pour un événement (run_event_scheduler).
+
+        Un rappel est identifié par l'événement et sa date de début : un événement reporté donne lieu
+        à un nouveau rappel. Les rappels envoyés survivent ainsi au redémarrage du planificateur
+        et ne sont envoyés qu'une fois, même par plusieurs planificateurs.
+
+        Champs:
+            event_id: Identifiant de l'événement (sans clé étrangère, la trace survit à sa suppression).
+            event_date_start: Date de début de l'événement au moment du rappel.
+            sent_at: Date de l'envoi.
+    """
+    event_id = models.BigIntegerField()
+    event_date_start = models.DateTimeField()
+    sent_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event_id', 'event_date_start'], name='unique_reminder_per_event_start'),
+        ]
+        indexes = [
+            # Index utilisé par le chargement des rappels déjà envoyés et la purge des rappels passés
+            models.Index(fields=['event_date_start'], name='sent_reminder_start_idx'),
+        ]
+
+
+@register_handler('event.saved')
+def handle_event_saved(payload, instance=None):
+    """
+        Gestionnaire du message 'event.saved'.
+        Imprime les détails de l'événement ; un événement supprimé entre-temps est ignoré.
+    """
+    event = instance
+    if event is None:
+        event = Event.objects.select_related(
+            'contract', 'client', 'support_contact'
+        ).filter(pk=payload['id']).first()
+        if event is None:
+            return
+
+    # Imprime les détails après la sauvegarde
+    event.print_details()
+
+
+def get_event_max_duration():
+    """Renvoie la durée maximale d'un événement (réglage EVENT_MAX_DURATION_DAYS)."""
+    return timedelta(days=getattr(settings, 'EVENT_MAX_DURATION_DAYS', 366))
 
-        super(Event, self).save(*args, **kwargs)
 
-        # Imprime les détails après la sauvegarde
-        self.print_details()
+def find_support_conflicts(support_contact_id, start, end, exclude_pk=None):
+    """
+        Renvoie les événements du contact support qui chevauchent l'intervalle [start, end[.
+
+        La recherche est une requête d'intervalle bornée sur l'index (support_contact, event_date_start) :
+        un événement chevauchant l'intervalle commence avant end et au plus tard la durée maximale
+        d'un événement avant start, seuls ces événements du contact sont parcourus.
+        Aucun conflit n'est recherché si le contact ou l'une des dates n'est pas défini.
+    """
+    if support_contact_id is None or start is None or end is None:
+        return Event.objects.none()
+
+    conflicts = Event.objects.filter(
+        support_contact_id=support_contact_id,
+        event_date_start__gt=start - get_event_max_duration(), event_date_start__lt=end,
+        event_date_end__gt=start
+    )
+    if exclude_pk is not None:
+        conflicts = conflicts.exclude(pk=exclude_pk)
+    return conflicts.order_by('event_date_start', 'id')
+
+
+def find_overlaps(intervals):
+    """
+        Renvoie les couples d'identifiants dont les intervalles se chevauchent, par balayage trié.
+
+        Args:
+            intervals: Itérable de (id, groupe, début, fin) ; seuls les intervalles d'un même groupe
+                       (par exemple le même contact support) sont comparés.
+
+        Les intervalles sont parcourus par date de début ; un tas des intervalles en cours (triés par fin)
+        permet de retirer ceux qui sont terminés. Le coût est O(n log n + k) pour k chevauchements,
+        au lieu de O(n²) pour une comparaison deux à deux.
+    """
+    overlaps = []
+    active = {}
+    for object_id, group, start, end in sorted(intervals, key=lambda interval: (interval[2], interval[0])):
+        group_active = active.setdefault(group, [])
+        while group_active and group_active[0][0] <= start:
+            heapq.heappop(group_active)
+        overlaps.extend((other_id, object_id) for other_end, other_id in group_active)
+        heapq.heappush(group_active, (end, object_id))
+    return overlaps
+
+
+def get_client_contact(email, phone_number):
+    """Renvoie les coordonnées d'un client telles que recopiées dans client_contact (e-mail et téléphone)."""
+    return f"{email} {phone_number}"
+
+
+def propagate_client_contacts(client_ids, batch_size=500):
+    """
+        Recopie le nom et les coordonnées des clients dans les événements qui leur sont associés.
+
+        Les clients sont lus par lots de batch_size (une requête par lot) ; chaque client donne lieu à un
+        seul UPDATE ensembliste (UPDATE ... WHERE client_id=?) limité aux événements dont la copie diffère.
+        La version et la date de mise à jour des événements modifiés sont mises à jour comme lors d'une sauvegarde.
+        Renvoie le nombre d'événements mis à jour.
+    """
+    client_ids = sorted(set(client_ids))
+    updated = 0
+    for position in range(0, len(client_ids), batch_size):
+        clients = Client.objects.filter(pk__in=client_ids[position:position + batch_size]).values_list(
+            'id', 'full_name', 'email', 'phone_number'
+        )
+        now = timezone.now()
+        with transaction.atomic():
+            for client_id, full_name, email, phone_number in clients:
+                client_contact = get_client_contact(email, phone_number)
+                updated += Event.objects.filter(client_id=client_id).exclude(
+                    client_name=full_name, client_contact=client_contact
+                ).update(
+                    client_name=full_name, client_contact=client_contact,
+                    version=F('version') + 1, update_date=now
+                )
+    return updated
+
+
+def find_stale_client_copies():
+    """
+        Renvoie les événements dont le nom ou les coordonnées du client (client_name, client_contact)
+        diffèrent des valeurs actuelles du client, annotés des valeurs attendues.
+    """
+    return Event.objects.filter(client__isnull=False).annotate(
+        expected_client_name=F('client__full_name'),
+        expected_client_contact=Concat(
+            'client__email', Value(' '), 'client__phone_number', output_field=CharField()
+        ),
+    ).filter(
+        ~Q(client_name=F('expected_client_name')) | ~Q(client_contact=F('expected_client_contact'))
+    ).order_by('client_id', 'id')
+
+
+@register_handler('client.contact_changed')
+def handle_client_contact_changed(payload, instance=None):
+    """
+        Gestionnaire du message 'client.contact_changed'.
+        Recopie le nom et les coordonnées des clients dans leurs événements ; idempotent.
+    """
+    propagate_client_contacts(payload['ids'])
+
+
+@receiver(post_save, sender=Client)
+def publish_client_contact_changed(sender, instance, created=False, update_fields=None, **kwargs):
+    """
+        Fonction de réception appelée après la sauvegarde d'un client.
+        Publie le message 'client.contact_changed' si le nom, l'e-mail ou le téléphone du client a été modifié :
+        la mise à jour des événements est immédiate ou exécutée par le worker selon OUTBOX_DELIVERY.
+    """
+    if created:
+        return
+    if update_fields is not None and not set(update_fields) & set(Client.CONTACT_FIELDS):
+        return
+    if instance.has_contact_changed():
+        publish('client.contact_changed', {'ids': [instance.pk]})
@@ -1,7 +1,8 @@
 from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
 from django.http import Http404
 
-from profiles.models import User, Client
+from profiles.models import User
 
 
 class EventPermissions(permissions.BasePermission):
@@ -17,6 +18,7 @@ class EventPermissions(permissions.BasePermission):
         Méthode has_create_permission:
             Autorise la création d'un nouvel événement uniquement
             pour les membres de l'équipe commerciale associés au client concerné.
+            Le client est résolu comme par le sérialiseur de création (nom exact, ou nom proche).
 
         Méthode has_update_permission:
             Autorise les menbres de l'équipe gestion pour la mise à jour d'un événement spécifique.
@@ -41,17 +43,28 @@ class EventPermissions(permissions.BasePermission):
         Notez que le rôle de l'utilisateur est utilisé pour déterminer les permissions,
         avec des autorisations spécifiques pour l'équipe de gestion, l'équipe commerciale et l'équipe support.
     """
-    def has_create_permission(self, request):
+    def has_create_permission(self, request, client_field):
         # Vérifie si l'utilisateur connecté a la permission de créer un nouvel événement.
         # Autorise uniquement si le membres de l'équipe commerciale est associés au client concerné.
         if request.user.role == User.ROLE_SALES:
             client_name = request.data.get('client')
             if client_name:
-                client = Client.objects.filter(full_name=client_name).first()
-                if client and client.sales_contact == request.user:
+                client = self.resolve_client(client_field, client_name)
+                if client and client.sales_contact_id == request.user.id:
                     return True
         return False
 
+    @staticmethod
+    def resolve_client(client_field, client_name):
+        """
+            Résout le nom du client avec le champ 'client' du sérialiseur de création, comme lors de la validation
+            (nom exact, ou nom proche selon le mode de résolution). Renvoie None si le nom n'est pas résolu.
+        """
+        try:
+            return client_field.run_validation(client_name)
+        except ValidationError:
+            return None
+
     def has_update_permission(self, request, user):
         # Vérifie si l'utilisateur connecté a la permission de mettre à jour un événement spécifique.
         # Autorise les membres de l'équipe gestion et les membres de l'équipe support associés aux événements.
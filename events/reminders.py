@@ -0,0 +1,225 @@
+import heapq
+import json
+import logging
+from datetime import timedelta
+from django.core.mail import get_connection, send_mail
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Event, SentReminder
+from changefeed.models import DeletionLog, changed_after, get_settled_before
+
+
+logger = logging.getLogger(__name__)
+
+# Champs des événements lus par le planificateur de rappels
+REMINDER_FIELDS = (
+    'id', 'event_name', 'event_date_start', 'location', 'update_date',
+    'support_contact__full_name', 'support_contact__email',
+)
+
+
+class LogReminderSink:
+    """Destination des rappels écrivant chaque rappel dans le journal (logging)."""
+
+    def send(self, reminder):
+        logger.info(
+            "Rappel : l'événement %s (%s) commence le %s, contact support : %s",
+            reminder['event_id'], reminder['event_name'], reminder['event_date_start'], reminder['support_contact']
+        )
+
+
+class FileReminderSink:
+    """Destination des rappels ajoutant chaque rappel à un fichier, une ligne JSON par rappel."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, reminder):
+        with open(self.path, 'a', encoding='utf-8') as reminder_file:
+            reminder_file.write(json.dumps(reminder, default=str) + '\n')
+
+
+class EmailReminderSink:
+    """
+        Destination des rappels envoyant un e-mail au contact support de l'événement.
+        Le backend e-mail console de Django est utilisé par défaut, en lieu et place d'un serveur SMTP.
+    """
+
+    def __init__(self, backend='django.core.mail.backends.console.EmailBackend'):
+        self.connection = get_connection(backend=backend)
+
+    def send(self, reminder):
+        if not reminder['support_contact_email']:
+            logger.warning("Rappel non envoyé : l'événement %s n'a pas de contact support.", reminder['event_id'])
+            return
+        send_mail(
+            subject=f"Rappel : {reminder['event_name']}",
+            message=(
+                f"L'événement {reminder['event_name']} commence le {reminder['event_date_start']} "
+                f"({reminder['location'] or 'lieu non défini'})."
+            ),
+            from_email=None,
+            recipient_list=[reminder['support_contact_email']],
+            connection=self.connection,
+        )
+
+
+# Destinations des rappels disponibles, par nom
+REMINDER_SINKS = {
+    'log': LogReminderSink,
+    'file': FileReminderSink,
+    'email': EmailReminderSink,
+}
+
+
+def get_reminder_sink(name, **options):
+    """Renvoie la destination des rappels nommée, initialisée avec les options données."""
+    return REMINDER_SINKS[name](**options)
+
+
+class ReminderScheduler:
+    """
+        Planificateur des rappels envoyés avant le début des événements (event_date_start - lead_time).
+
+        Les rappels sont conservés en mémoire dans un tas trié par date de rappel. Un événement modifié
+        est replanifié sans retirer son ancienne entrée du tas : elle est ignorée à sa sortie si elle ne
+        correspond plus à la planification courante (suppression paresseuse).
+
+        Après le chargement initial (requête d'intervalle sur event_date_start), les modifications sont lues
+        à partir du flux de modifications : événements et traces de suppression (DeletionLog) dont
+        (date d'écriture, id) dépasse le curseur. Comme pour le flux crm/changes/, seules les écritures
+        plus anciennes que CHANGEFEED_SETTLE_SECONDS sont lues : une écriture validée tardivement
+        n'est pas omise. Aucune itération ne parcourt la table.
+
+        Les rappels envoyés sont enregistrés (SentReminder) avant l'envoi : un redémarrage ne renvoie pas
+        les rappels déjà envoyés, et un rappel enregistré par un autre planificateur n'est pas envoyé.
+    """
+
+    def __init__(self, sink, lead_time=timedelta(days=1), batch_size=500):
+        self.sink = sink
+        self.lead_time = lead_time
+        self.batch_size = batch_size
+        self.heap = []
+        self.scheduled = {}
+        self.fired = set()
+        self.event_cursor = None
+        self.deletion_cursor = None
+
+    def load(self, now=None):
+        """
+            Charge les événements à venir et les rappels déjà envoyés,
+            puis place les curseurs du flux de modifications à la position actuelle.
+        """
+        now = now or timezone.now()
+        self.heap, self.scheduled = [], {}
+
+        # Les curseurs sont placés à la date limite du flux de modifications, avant la lecture des événements :
+        # les écritures postérieures, même validées tardivement, seront relues (replanification idempotente)
+        settled_before = get_settled_before()
+        self.event_cursor = (settled_before, 0)
+        self.deletion_cursor = (settled_before, 0)
+
+        # Les rappels des événements commencés ne servent plus : ils sont purgés, les autres sont conservés
+        SentReminder.objects.filter(event_date_start__lte=now).delete()
+        self.fired = set(
+            SentReminder.objects.filter(event_date_start__gt=now).values_list('event_id', 'event_date_start')
+        )
+
+        upcoming = Event.objects.filter(event_date_start__gt=now).values(*REMINDER_FIELDS)
+        for event in upcoming.iterator(chunk_size=self.batch_size):
+            self.schedule(event, now)
+
+    def schedule(self, event, now):
+        """Planifie (ou replanifie) le rappel d'un événement, ou l'annule si l'événement a déjà commencé."""
+        start = event['event_date_start']
+        if start is None or start <= now or (event['id'], start) in self.fired:
+            self.scheduled.pop(event['id'], None)
+            return
+
+        remind_at = start - self.lead_time
+        self.scheduled[event['id']] = (remind_at, {
+            'event_id': event['id'],
+            'event_name': event['event_name'],
+            'event_date_start': start,
+            'location': event['location'],
+            'support_contact': event['support_contact__full_name'],
+            'support_contact_email': event['support_contact__email'],
+        })
+        heapq.heappush(self.heap, (remind_at, event['id']))
+
+    def refresh(self, now=None):
+        """
+            Applique les modifications survenues depuis la dernière lecture (par lots de batch_size).
+            Renvoie le nombre d'événements modifiés ou supprimés pris en compte.
+        """
+        now = now or timezone.now()
+        settled_before = get_settled_before()
+        changes = 0
+
+        while True:
+            events = changed_after(Event.objects.all(), 'update_date', self.event_cursor, settled_before)
+            rows = list(events.values(*REMINDER_FIELDS)[:self.batch_size])
+            for event in rows:
+                self.schedule(event, now)
+            changes += len(rows)
+            if rows:
+                self.event_cursor = (rows[-1]['update_date'], rows[-1]['id'])
+            if len(rows) < self.batch_size:
+                break
+
+        deletions = changed_after(
+            DeletionLog.objects.filter(resource=DeletionLog.RESOURCE_EVENTS), 'deleted_at',
+            self.deletion_cursor, settled_before
+        ).values_list('deleted_at', 'id', 'object_id')
+        for deleted_at, deletion_id, event_id in deletions:
+            self.scheduled.pop(event_id, None)
+            self.deletion_cursor = (deleted_at, deletion_id)
+            changes += 1
+
+        # Les rappels des événements commencés ne peuvent plus être replanifiés
+        self.fired = {(event_id, start) for event_id, start in self.fired if start > now}
+        return changes
+
+    def record_sent(self, event_id, event_date_start):
+        """
+            Enregistre le rappel d'un événement avant son envoi.
+            Renvoie False si le rappel a déjà été enregistré (par exemple par un autre planificateur).
+        """
+        try:
+            with transaction.atomic():
+                SentReminder.objects.create(event_id=event_id, event_date_start=event_date_start)
+        except IntegrityError:
+            return False
+        return True
+
+    def next_reminder_at(self):
+        """Renvoie la date du prochain rappel planifié, ou None."""
+        while self.heap and self.heap[0][1] not in self.scheduled:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def fire_due(self, now=None):
+        """Envoie les rappels dont la date est atteinte et renvoie le nombre de rappels envoyés."""
+        now = now or timezone.now()
+        fired = 0
+        while self.heap and self.heap[0][0] <= now:
+            remind_at, event_id = heapq.heappop(self.heap)
+            entry = self.scheduled.get(event_id)
+            # Entrée obsolète : événement supprimé, replanifié ou déjà rappelé
+            if entry is None or entry[0] != remind_at:
+                continue
+
+            reminder = entry[1]
+            del self.scheduled[event_id]
+            self.fired.add((event_id, reminder['event_date_start']))
+            if not self.record_sent(event_id, reminder['event_date_start']):
+                continue
+            try:
+                self.sink.send(reminder)
+            except Exception:
+                # L'erreur est journalisée (et transmise à Sentry) sans interrompre les autres rappels
+                logger.exception("Échec de l'envoi du rappel de l'événement %s", event_id)
+                continue
+            fired += 1
+        return fired
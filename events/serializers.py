@@ -1,8 +1,11 @@
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 
-from .models import Event
+from .models import Event, get_event_max_duration
 from profiles.models import User, Client
+from EpicEvents.serializers import (
+    FuzzySlugRelatedField, SparseFieldsetMixin, ValuesListSerializer, ValuesSerializerMixin
+)
 
 
 class MultipleSerializerMixin:
@@ -28,7 +31,7 @@ class MultipleSerializerMixin:
         return super().get_serializer_class()
 
 
-class EventListSerializer(serializers.ModelSerializer):
+class EventListSerializer(ValuesSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """
         Serializer pour la liste des événements.
         Ce serializer est utilisé pour représenter les données de la liste des événements dans le CRM.
@@ -44,9 +47,10 @@ class EventListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
         fields = ['id', 'client', 'support_contact']
+        list_serializer_class = ValuesListSerializer
 
 
-class EventDetailSerializer(serializers.ModelSerializer):
+class EventDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
         Serializer pour les détails d'un événement.
         Ce serializer est utilisé pour représenter les détails d'un événement spécifique dans le CRM.
@@ -62,14 +66,57 @@ class EventDetailSerializer(serializers.ModelSerializer):
         - 'location': Lieu de l'événement.
         - 'attendees': Nombre d'invités prévu.
         - 'notes': Notes ou détails supplémentaires sur l'événement.
+        - 'version': Numéro de version de l'événement (lecture seule), à renvoyer dans l'en-tête If-Match.
     """
-    # Champs utilisant SlugRelatedField pour la lecture et l'écriture
-    client = serializers.SlugRelatedField(slug_field='full_name', queryset=Client.objects.all())
-    support_contact = serializers.SlugRelatedField(
-        slug_field='full_name', queryset=User.objects.filter(role=User.ROLE_SUPPORT)
+    # Champs utilisant FuzzySlugRelatedField pour la lecture et l'écriture (nom exact, ou nom proche)
+    client = FuzzySlugRelatedField(slug_field='full_name', queryset=Client.objects.all(), fuzzy_scope='clients')
+    support_contact = FuzzySlugRelatedField(
+        slug_field='full_name', queryset=User.objects.filter(role=User.ROLE_SUPPORT), fuzzy_scope='support'
     )
 
     class Meta:
         model = Event
         fields = ['id', 'event_name', 'client', 'client_contact', 'contract', 'event_date_start',
-                  'event_date_end', 'support_contact', 'location', 'attendees', 'notes']
+                  'event_date_end', 'support_contact', 'location', 'attendees', 'notes', 'version']
+
+    # La version est renvoyée dans l'en-tête ETag, même si le champ n'est pas demandé
+    always_loaded_fields = ['version']
+
+    def validate(self, attrs):
+        """Vérifie que la durée de l'événement ne dépasse pas la durée maximale (EVENT_MAX_DURATION_DAYS)."""
+        start = attrs.get('event_date_start', getattr(self.instance, 'event_date_start', None))
+        end = attrs.get('event_date_end', getattr(self.instance, 'event_date_end', None))
+        max_duration = get_event_max_duration()
+        if start is not None and end is not None and end - start > max_duration:
+            raise serializers.ValidationError(
+                {'event_date_end': f"An event cannot last more than {max_duration.days} days."}
+            )
+        return attrs
+
+
+class ClientOverviewEventSerializer(serializers.ModelSerializer):
+    """
+        Serializer des événements d'un client dans la vue d'ensemble du client (lecture seule).
+
+        Champs :
+        - 'id': Identifiant unique de l'événement.
+        - 'event_name': Nom de l'événement.
+        - 'contract': ID du contrat associé à l'événement.
+        - 'event_date_start': Date de début de l'événement.
+        - 'event_date_end': Date de fin de l'événement.
+        - 'support_contact': Nom complet du membre de l'équipe support associé à l'événement.
+        - 'location': Lieu de l'événement.
+        - 'attendees': Nombre d'invités prévu.
+        - 'notes': Notes ou détails supplémentaires sur l'événement.
+    """
+    support_contact = serializers.ReadOnlyField(source='support_contact.full_name')
+
+    class Meta:
+        model = Event
+        fields = ['id', 'event_name', 'contract', 'event_date_start', 'event_date_end',
+                  'support_contact', 'location', 'attendees', 'notes']
+
+    @staticmethod
+    def get_overview_queryset():
+        """Renvoie le queryset de préchargement des événements, avec leur contact support."""
+        return Event.objects.select_related('support_contact').order_by('event_date_start', 'id')
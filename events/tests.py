@@ -1,17 +1,36 @@
 import pytest
 import json
 import datetime
+import decimal
+import gzip
+import os
 import pendulum
 import sys
-from io import StringIO
-from django.test import TestCase
+import tempfile
+import uuid
+from io import BytesIO, StringIO
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import make_aware
-from rest_framework import status
+from rest_framework import serializers, status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import Event
+from .assignment import apply_support_assignments, plan_support_assignments
+from .models import Event, SentReminder, find_overlaps, find_stale_client_copies
+from .reminders import FileReminderSink, ReminderScheduler
+from .serializers import EventListSerializer
+from EpicEvents.compression import APICompressionMiddleware, select_encoding
+from EpicEvents.renderers import FastJSONParser, FastJSONRenderer
 from contracts.models import Contract
+from outbox.models import OutboxMessage
 from profiles.models import User, Client
+from search.autocomplete import autocomplete_index
 
 
 @pytest.mark.django_db
@@ -231,10 +250,19 @@ class TestEventsApp(TestCase):
         self.assertEqual(self.event_user1.notes, 'Event notes')
 
     def test_save_method(self):
+        # Crée un nouveau contrat, un seul événement étant autorisé par contrat
+        new_contract = self.create_contract(
+            client=self.client_user1,
+            total_amount=1200.0,
+            remaining_amount=0.0,
+            status_contract=True,
+            sales_contact=self.sales_user1
+        )
+
         # Crée un nouvel événement
         new_event = self.create_event(
             event_name="Event Flanders",
-            contract=self.contract_user1,
+            contract=new_contract,
             client=self.client_user1,
             client_name="Ned Flanders",
             client_contact="Ned@EpicEvents.com +987654321",
@@ -247,7 +275,7 @@ class TestEventsApp(TestCase):
         )
 
         # Associe le contrat et le client à l'événement
-        new_event.contract = self.contract_user1
+        new_event.contract = new_contract
         new_event.client = self.client_user1
 
         # Appelle la méthode save
@@ -515,6 +543,18 @@ class TestEventViewSet(TestCase):
         print("Response Data:", response.data)
         # print(json.dumps(response.data, indent=2))
 
+    def test_events_list_values_path_matches_model_serializer(self):
+        # Le chemin rapide (.values_list()) produit la même sortie que le chemin ModelSerializer,
+        # y compris l'omission de support_contact pour un événement sans contact support
+        queryset = Event.objects.order_by('id')
+        expected = serializers.ListSerializer(list(queryset), child=EventListSerializer()).data
+
+        with self.assertNumQueries(1):
+            data = EventListSerializer(queryset, many=True).data
+
+        self.assertEqual([dict(item) for item in data], [dict(item) for item in expected])
+        self.assertTrue(any('support_contact' not in item for item in data))
+
     def test_event_details(self):
         # Assure que event_user1 est associé à support_user1
         self.assertEqual(self.event_user1.support_contact, self.support_user1)
@@ -577,6 +617,32 @@ class TestEventViewSet(TestCase):
         # Vérifie que le texte spécifié est présent dans la réponse
         self.assertIn("You do not have permission to access this event.", response.content.decode())
 
+    def test_event_details_not_found(self):
+        # Test de la vue event_details pour un événement inexistant
+        url = '/crm/events/9999/event_details/'
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_support_user1}')
+
+        # Vérifie que la réponse a le statut HTTP 404 (Not Found) et non 403 (Forbidden)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_events_batch_details(self):
+        # event_user2 n'est pas associé à support_user1, l'id 9999 n'existe pas
+        ids = [9999, self.event_user2.pk, self.event_user1.pk]
+        url = f"/crm/events/batch_details/?ids={','.join(map(str, ids))}&fields=id,event_name"
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_support_user1}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['data'], [{'id': self.event_user1.pk, 'event_name': self.event_user1.event_name}]
+        )
+        self.assertEqual(response.data['found_ids'], [self.event_user1.pk])
+        self.assertEqual(response.data['forbidden_ids'], [self.event_user2.pk])
+        self.assertEqual(response.data['not_found_ids'], [9999])
+
+        # L'événement refusé n'est jamais chargé : la requête des événements filtre sur support_contact
+        self.assertIn('support_contact_id', queries[1]['sql'])
+
     def test_all_events_details(self):
         # Test la vue all_events_details
         url = '/crm/events/all_events_details/'
@@ -589,6 +655,29 @@ class TestEventViewSet(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(len(response.data) > 0)
 
+    def test_all_events_details_sparse_fields(self):
+        # Test la vue all_events_details en ne demandant que quelques champs
+        url = '/crm/events/all_events_details/?fields=id,event_name,event_date_start'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_support_user1}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(len(response.data) > 0)
+        for event_data in response.data:
+            self.assertEqual(list(event_data), ['id', 'event_name', 'event_date_start'])
+
+        # Les colonnes et jointures inutiles ne sont pas chargées
+        event_query = [query['sql'] for query in queries.captured_queries if 'event_name' in query['sql']][-1]
+        self.assertNotIn('JOIN', event_query)
+        self.assertNotIn('notes', event_query)
+
+    def test_all_events_details_unknown_field(self):
+        # Un champ inconnu dans ?fields= renvoie une erreur 400
+        url = '/crm/events/all_events_details/?fields=id,unknown'
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_support_user1}')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_events_without_support(self):
         # Crée un jeton d'accès pour management_user1
         refresh_management_user1 = RefreshToken.for_user(self.management_user1)
@@ -637,6 +726,218 @@ class TestEventViewSet(TestCase):
         self.assertEqual(response_start_date, expected_start_date)
         self.assertEqual(response_end_date, expected_end_date)
 
+    def test_assign_support(self):
+        # Événement sans support chevauchant event_user1 (support_user1) et event_user2
+        event_user3 = self.create_event(
+            event_name="Event Simpson",
+            contract=self.contract_user3,
+            client=self.client_user3,
+            client_name=self.client_user3.full_name,
+            client_contact=f"{self.client_user3.email} {self.client_user3.phone_number}",
+            event_date_start=make_aware(datetime.datetime(2025, 3, 20, 18, 0)),
+            event_date_end=make_aware(datetime.datetime(2025, 3, 21, 2, 0)),
+            support_contact=None,
+            location="Springfield",
+            attendees=10,
+            notes="Event notes"
+        )
+        url = '/crm/events/assign_support/'
+
+        response = self.client.post(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        # Simulation : les affectations sont calculées sans être enregistrées
+        response = self.client.post(
+            url, data={'dry_run': True}, format='json',
+            HTTP_AUTHORIZATION=f'Bearer {self.access_token_management_user1}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['assigned'], 0)
+        self.event_user2.refresh_from_db()
+        self.assertIsNone(self.event_user2.support_contact)
+
+        # event_user2 (le plus d'invités) est confié à support_user2, support_user1 étant occupé ;
+        # event_user3 chevauche alors les événements des deux contacts
+        response = self.client.post(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_management_user1}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['assigned'], 1)
+        self.assertEqual(
+            [(assignment['event_id'], assignment['support_contact_id'])
+             for assignment in response.data['data']['assignments']],
+            [(self.event_user2.id, self.support_user2.id)]
+        )
+        self.assertEqual(
+            [event['event_id'] for event in response.data['data']['unassigned']], [event_user3.id]
+        )
+
+        version = self.event_user2.version
+        self.event_user2.refresh_from_db()
+        self.assertEqual(self.event_user2.support_contact, self.support_user2)
+        self.assertEqual(self.event_user2.version, version + 1)
+
+    def test_plan_support_assignments_balances_load(self):
+        Event.objects.update(support_contact=None)
+        for index, attendees in enumerate([300, 200, 100, 50]):
+            contract = self.create_contract(
+                client=self.client_user3,
+                total_amount=100.0,
+                remaining_amount=0.0,
+                status_contract=True,
+                sales_contact=self.sales_user1
+            )
+            # Événements sans dates : seule la charge est prise en compte
+            self.create_event(
+                event_name=f"Batch {index}", contract=contract, client=self.client_user3,
+                client_name=self.client_user3.full_name, client_contact='', event_date_start=None,
+                event_date_end=None, support_contact=None, location='', attendees=attendees, notes=''
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            assignments, unassigned = plan_support_assignments(
+                events=Event.objects.filter(event_name__startswith='Batch'), event_weight=0
+            )
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(unassigned, [])
+
+        loads = {}
+        for assignment in assignments:
+            event = Event.objects.get(pk=assignment['event_id'])
+            loads[assignment['support_contact_id']] = loads.get(assignment['support_contact_id'], 0) + event.attendees
+        # 300 et 50 pour le premier contact, 200 et 100 pour le second
+        self.assertEqual(loads, {self.support_user1.id: 350, self.support_user2.id: 300})
+
+    def test_apply_support_assignments_rechecks_conflicts(self):
+        assignments, unassigned = plan_support_assignments(events=Event.objects.filter(pk=self.event_user2.pk))
+        self.assertEqual(
+            [(assignment['event_id'], assignment['support_contact_id']) for assignment in assignments],
+            [(self.event_user2.id, self.support_user2.id)]
+        )
+
+        # Entre le calcul et l'enregistrement, support_user2 reçoit un événement sur la même période
+        contract = self.create_contract(
+            client=self.client_user3, total_amount=100.0, remaining_amount=0.0, status_contract=True,
+            sales_contact=self.sales_user1
+        )
+        self.create_event(
+            event_name="Event Simpson", contract=contract, client=self.client_user3,
+            client_name=self.client_user3.full_name, client_contact='',
+            event_date_start=make_aware(datetime.datetime(2025, 4, 1, 10, 0)),
+            event_date_end=make_aware(datetime.datetime(2025, 4, 1, 18, 0)),
+            support_contact=self.support_user2, location='', attendees=0, notes=''
+        )
+
+        # L'affectation devenue conflictuelle est ignorée
+        self.assertEqual(apply_support_assignments(assignments), 0)
+        self.event_user2.refresh_from_db()
+        self.assertIsNone(self.event_user2.support_contact)
+
+    def test_client_changes_propagate_to_events(self):
+        version = self.event_user1.version
+        client = Client.objects.get(pk=self.client_user1.pk)
+        client.full_name = 'Rod Flanders'
+        client.phone_number = '+111111111'
+        client.save()
+
+        self.event_user1.refresh_from_db()
+        self.assertEqual(self.event_user1.client_name, 'Rod Flanders')
+        self.assertEqual(self.event_user1.client_contact, f"{client.email} +111111111")
+        self.assertEqual(self.event_user1.version, version + 1)
+
+        # Une sauvegarde sans modification du nom ni des coordonnées ne met pas à jour les événements
+        client.company_name = 'Leftorium'
+        with CaptureQueriesContext(connection) as queries:
+            client.save()
+        self.assertFalse([
+            query for query in queries if query['sql'].startswith('UPDATE') and 'events_event' in query['sql']
+        ])
+
+        # En livraison différée, la mise à jour des événements est confiée au worker
+        with override_settings(OUTBOX_DELIVERY='worker'):
+            client.full_name = 'Todd Flanders'
+            client.save()
+        self.assertTrue(OutboxMessage.objects.filter(topic='client.contact_changed').exists())
+        self.event_user1.refresh_from_db()
+        self.assertEqual(self.event_user1.client_name, 'Rod Flanders')
+
+    def test_check_event_client_copies(self):
+        # Une mise à jour groupée des clients ne déclenche pas les signaux : les copies deviennent obsolètes
+        Client.objects.filter(pk=self.client_user1.pk).update(full_name='Rod Flanders')
+        self.assertEqual(list(find_stale_client_copies().values_list('id', flat=True)), [self.event_user1.id])
+
+        call_command('check_event_client_copies', stdout=StringIO())
+        self.assertTrue(find_stale_client_copies().exists())
+
+        call_command('check_event_client_copies', '--fix', stdout=StringIO())
+        self.assertFalse(find_stale_client_copies().exists())
+        self.event_user1.refresh_from_db()
+        self.assertEqual(self.event_user1.client_name, 'Rod Flanders')
+
+    @override_settings(CHANGEFEED_SETTLE_SECONDS=0)
+    def test_event_reminder_scheduler(self):
+        class ListSink:
+            def __init__(self):
+                self.reminders = []
+
+            def send(self, reminder):
+                self.reminders.append(reminder)
+
+        sink = ListSink()
+        scheduler = ReminderScheduler(sink, lead_time=datetime.timedelta(days=1))
+        scheduler.load(now=make_aware(datetime.datetime(2025, 2, 1)))
+        self.assertEqual(set(scheduler.scheduled), {self.event_user1.id, self.event_user2.id})
+
+        # Le rappel de event_user1 est envoyé la veille de son début
+        self.assertEqual(scheduler.fire_due(now=make_aware(datetime.datetime(2025, 2, 13, 12, 0))), 0)
+        self.assertEqual(scheduler.fire_due(now=make_aware(datetime.datetime(2025, 2, 13, 12, 45))), 1)
+        self.assertEqual(sink.reminders[0]['event_id'], self.event_user1.id)
+        self.assertEqual(sink.reminders[0]['support_contact'], self.support_user1.full_name)
+
+        # Un planificateur redémarré ne renvoie pas les rappels déjà envoyés
+        restarted = ReminderScheduler(sink, lead_time=datetime.timedelta(days=1))
+        restarted.load(now=make_aware(datetime.datetime(2025, 2, 13, 13, 0)))
+        self.assertEqual(set(restarted.scheduled), {self.event_user2.id})
+        self.assertEqual(restarted.fire_due(now=make_aware(datetime.datetime(2025, 2, 13, 13, 0))), 0)
+        self.assertEqual(SentReminder.objects.count(), 1)
+
+        # Un rappel enregistré par un autre planificateur n'est pas envoyé une seconde fois
+        self.assertFalse(scheduler.record_sent(self.event_user1.id, self.event_user1.event_date_start))
+
+        # Les modifications et suppressions sont lues à partir du flux de modifications
+        now = make_aware(datetime.datetime(2025, 2, 14))
+        self.event_user2.event_date_start = make_aware(datetime.datetime(2025, 2, 20, 10, 0))
+        self.event_user2.save()
+        event_user3 = self.create_event(
+            event_name="Event Simpson", contract=self.contract_user3, client=self.client_user3,
+            client_name=self.client_user3.full_name, client_contact='',
+            event_date_start=make_aware(datetime.datetime(2025, 2, 21)), event_date_end=None,
+            support_contact=None, location='', attendees=0, notes=''
+        )
+        event_user3_id = event_user3.id
+        event_user3.delete()
+        self.assertEqual(scheduler.refresh(now=now), 2)
+        self.assertEqual(set(scheduler.scheduled), {self.event_user2.id})
+        self.assertEqual(scheduler.next_reminder_at(), make_aware(datetime.datetime(2025, 2, 19, 10, 0)))
+
+        # Sans modification, une lecture ne parcourt pas la table
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(scheduler.refresh(now=now), 0)
+        self.assertEqual(len(queries), 2)
+
+        self.assertEqual(scheduler.fire_due(now=make_aware(datetime.datetime(2025, 3, 1))), 1)
+        self.assertEqual(
+            [reminder['event_id'] for reminder in sink.reminders], [self.event_user1.id, self.event_user2.id]
+        )
+        self.assertNotIn(event_user3_id, [reminder['event_id'] for reminder in sink.reminders])
+
+    def test_file_reminder_sink(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'reminders.jsonl')
+            sink = FileReminderSink(path)
+            sink.send({'event_id': 1, 'event_date_start': make_aware(datetime.datetime(2025, 2, 14))})
+            sink.send({'event_id': 2, 'event_date_start': make_aware(datetime.datetime(2025, 2, 15))})
+            with open(path, encoding='utf-8') as reminder_file:
+                self.assertEqual([json.loads(line)['event_id'] for line in reminder_file], [1, 2])
+
     def test_create_event(self):
         # Assure que client_user1 est associé à sales_user1
         self.assertEqual(self.client_user3.sales_contact, self.sales_user1)
@@ -702,6 +1003,171 @@ class TestEventViewSet(TestCase):
         self.assertEqual(response_start_date, expected_start_date)
         self.assertEqual(response_end_date, expected_end_date)
 
+    def test_events_calendar(self):
+        # Événement de support_user1 chevauchant event_user1
+        event_user3 = self.create_event(
+            event_name="Event Simpson",
+            contract=self.contract_user3,
+            client=self.client_user3,
+            client_name=self.client_user3.full_name,
+            client_contact=f"{self.client_user3.email} {self.client_user3.phone_number}",
+            event_date_start=make_aware(datetime.datetime(2025, 3, 20, 18, 0)),
+            event_date_end=make_aware(datetime.datetime(2025, 3, 21, 2, 0)),
+            support_contact=self.support_user1,
+            location="Springfield",
+            attendees=10,
+            notes="Event notes"
+        )
+
+        url = '/crm/events/calendar/?from=2025-03-01&to=2025-04-01'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_management_user1}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Les événements sont triés par date de début, les chevauchements sont signalés par contact support
+        self.assertEqual(
+            [event['id'] for event in response.data['events']],
+            [self.event_user1.id, self.event_user2.id, event_user3.id]
+        )
+        self.assertEqual(response.data['conflicts'], [{'events': [self.event_user1.id, event_user3.id]}])
+        self.assertLessEqual(len(queries), 4)
+
+        # Un intervalle ne contenant aucun événement
+        url = '/crm/events/calendar/?from=2025-12-01T00:00:00Z&to=2025-12-31T00:00:00Z'
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_management_user1}')
+        self.assertEqual(response.data['events'], [])
+
+        # Un membre de l'équipe support ne voit que ses événements
+        url = '/crm/events/calendar/?from=2025-03-01&to=2025-04-01'
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_support_user2}')
+        self.assertEqual(response.data['events'], [])
+
+        for url in (
+            '/crm/events/calendar/?from=2025-03-01',
+            '/crm/events/calendar/?from=2025-04-01&to=2025-03-01',
+            '/crm/events/calendar/?from=2025-03-01&to=2027-03-01',
+            '/crm/events/calendar/?from=mars&to=2025-04-01',
+        ):
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_management_user1}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_event_max_duration(self):
+        new_event_data = {
+            'event_name': 'Event Simpson',
+            'contract': self.contract_user3.id,
+            'client': self.client_user3.full_name,
+            'client_contact': f"{self.client_user3.email} {self.client_user3.phone_number}",
+            'event_date_start': make_aware(datetime.datetime(2025, 3, 1, 10, 0)),
+            'event_date_end': make_aware(datetime.datetime(2025, 3, 9, 10, 0)),
+            'support_contact': self.support_user2.full_name,
+            'location': 'Springfield',
+            'attendees': 10,
+            'notes': 'Event notes'
+        }
+
+        # La durée d'un événement est bornée par EVENT_MAX_DURATION_DAYS
+        with override_settings(EVENT_MAX_DURATION_DAYS=7):
+            response = self.client.post(
+                '/crm/events/', data=new_event_data, format='json',
+                HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}'
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('event_date_end', response.data)
+
+            # La durée est aussi vérifiée par le modèle (administration, commandes)
+            with self.assertRaises(ValidationError):
+                self.event_user2.event_date_end = new_event_data['event_date_end'] + datetime.timedelta(days=30)
+                self.event_user2.save()
+            self.event_user2.refresh_from_db()
+
+            # Le calendrier ne parcourt que les événements commençant au plus tard la durée maximale avant from
+            url = '/crm/events/calendar/?from=2025-03-01&to=2025-04-01'
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_management_user1}')
+            self.assertEqual([event['id'] for event in response.data['events']], [self.event_user2.id])
+
+        response = self.client.post(
+            '/crm/events/', data=new_event_data, format='json',
+            HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_find_overlaps(self):
+        start = make_aware(datetime.datetime(2025, 1, 1))
+        hours = datetime.timedelta(hours=1)
+        intervals = [
+            (1, 'a', start, start + 3 * hours),
+            (2, 'a', start + hours, start + 2 * hours),
+            # Un intervalle commençant à la fin d'un autre ne le chevauche pas
+            (3, 'a', start + 3 * hours, start + 4 * hours),
+            (4, 'b', start, start + 4 * hours),
+        ]
+        self.assertEqual(find_overlaps(intervals), [(1, 2)])
+
+    def test_create_event_fuzzy_client_name(self):
+        # L'index des noms est partagé par le processus : il est construit à partir des données du test
+        autocomplete_index.reset()
+        autocomplete_index.ensure_built()
+
+        new_event_data = {
+            'event_name': 'Event Simpson',
+            'contract': self.contract_user3.id,
+            'client': 'lisa simpsons',
+            'client_contact': f"{self.client_user3.email} {self.client_user3.phone_number}",
+            'event_date_start': make_aware(datetime.datetime(2025, 1, 24, 10, 30)),
+            'event_date_end': make_aware(datetime.datetime(2025, 2, 15, 12, 45)),
+            'support_contact': self.support_user1.full_name,
+            'location': 'Australie',
+            'attendees': 50,
+            'notes': 'Event notes'
+        }
+
+        # La permission résout le client comme le sérialiseur : le nom proche retenu appartient à sales_user1
+        response = self.client.post(
+            '/crm/events/?fuzzy=resolve', data=new_event_data, format='json',
+            HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['client'], self.client_user3.full_name)
+
+        # Un nom exact seulement (?fuzzy=off) ne résout pas le client : l'accès est refusé
+        response = self.client.post(
+            '/crm/events/?fuzzy=off', data=new_event_data, format='json',
+            HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        autocomplete_index.reset()
+
+    def test_create_event_overlapping_support_contact(self):
+        new_event_data = {
+            'event_name': 'Event Simpson',
+            'contract': self.contract_user3.id,
+            'client': self.client_user3.full_name,
+            'client_contact': f"{self.client_user3.email} {self.client_user3.phone_number}",
+            'event_date_start': make_aware(datetime.datetime(2025, 3, 20, 18, 0)),
+            'event_date_end': make_aware(datetime.datetime(2025, 3, 21, 2, 0)),
+            'support_contact': self.support_user1.full_name,
+            'location': 'Springfield',
+            'attendees': 10,
+            'notes': 'Event notes'
+        }
+        url = '/crm/events/'
+
+        # Politique 'reject' : l'événement n'est pas créé
+        with override_settings(EVENT_OVERLAP_POLICY='reject'):
+            response = self.client.post(
+                url, data=new_event_data, format='json', HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}'
+            )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual([conflict['id'] for conflict in response.data['conflicts']], [self.event_user1.id])
+        self.assertFalse(Event.objects.filter(contract=self.contract_user3).exists())
+
+        # Politique 'warn' (par défaut) : l'événement est créé et les conflits sont signalés
+        response = self.client.post(
+            url, data=new_event_data, format='json', HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([conflict['id'] for conflict in response.data['conflicts']], [self.event_user1.id])
+
     def test_create_event_unauthorized_user(self):
         # Assure que client_user1 est associé à sales_user1
         self.assertEqual(self.client_user3.sales_contact, self.sales_user1)
@@ -784,19 +1250,8 @@ class TestEventViewSet(TestCase):
         self.assertTrue(self.contract_user1.status_contract)
 
         # Assure qu'un événement existe déjà pour ce contrat
-        existing_event = self.create_event(
-            event_name="Event Flanders",
-            contract=self.contract_user1,
-            client=self.client_user1,
-            client_name=self.client_user1.full_name,
-            client_contact=f"{self.client_user1.email} {self.client_user1.phone_number}",
-            event_date_start=make_aware(datetime.datetime(2025, 2, 14, 12, 45)),
-            event_date_end=make_aware(datetime.datetime(2025, 11, 25, 12, 55)),
-            support_contact=self.support_user1,
-            location="Rome",
-            attendees=1,
-            notes="Event notes"
-        )
+        existing_event = self.event_user1
+        self.assertEqual(existing_event.contract, self.contract_user1)
 
         # Crée un jeton d'accès pour sales_user1
         refresh_sales_user1 = RefreshToken.for_user(self.sales_user1)
@@ -837,6 +1292,26 @@ class TestEventViewSet(TestCase):
             response.content.decode()
         )
 
+    def test_event_unique_per_contract_constraint(self):
+        # Vérifie que la base de données refuse un second événement pour le même contrat
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                self.create_event(
+                    event_name="Event Flanders bis",
+                    contract=self.contract_user1,
+                    client=self.client_user1,
+                    client_name=self.client_user1.full_name,
+                    client_contact=f"{self.client_user1.email} {self.client_user1.phone_number}",
+                    event_date_start=make_aware(datetime.datetime(2025, 3, 1, 14, 30)),
+                    event_date_end=make_aware(datetime.datetime(2025, 3, 1, 16, 30)),
+                    support_contact=None,
+                    location="Paris",
+                    attendees=5,
+                    notes="Event notes"
+                )
+
+        self.assertEqual(Event.objects.filter(contract=self.contract_user1).count(), 1)
+
     def test_update_event(self):
         # Assure que event_user1 est associé à support_user1
         self.assertEqual(self.event_user1.support_contact, self.support_user1)
@@ -1021,3 +1496,91 @@ class TestEventViewSet(TestCase):
 
         # Vérifie que le message de succès est présent dans la réponse
         self.assertIn("You do not have permission to delete this event.", response.content.decode())
+
+
+class TestFastJSONRenderer(TestCase):
+    """
+        Classe de tests pour le renderer et le parser JSON rapides (FastJSONRenderer, FastJSONParser).
+    """
+
+    def test_render_matches_drf_renderer(self):
+        # Les datetimes, Decimal et UUID sont rendus comme par le JSONRenderer de DRF
+        data = {
+            'date': make_aware(datetime.datetime(2025, 2, 14, 12, 45, 30, 123456), datetime.timezone.utc),
+            'naive_date': datetime.datetime(2025, 2, 14, 12, 45),
+            'day': datetime.date(2025, 2, 14),
+            'amount': decimal.Decimal('1250.50'),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'duration': datetime.timedelta(hours=2),
+            'name': 'Événement Flanders',
+            'rows': [1, 2.5, None, True],
+        }
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_parse_request_body(self):
+        # Le parser lit le JSON et signale les contenus invalides
+        parser = FastJSONParser()
+        self.assertEqual(parser.parse(BytesIO('{"event_name": "Fête"}'.encode())), {'event_name': 'Fête'})
+
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b'{"event_name": NaN}'))
+
+
+class TestAPICompressionMiddleware(TestCase):
+    """
+        Classe de tests pour la compression des réponses de l'API (APICompressionMiddleware).
+    """
+
+    def setUp(self):
+        """
+            Mets en place un middleware renvoyant un contenu JSON répétitif.
+        """
+        self.factory = RequestFactory()
+        self.content = json.dumps([{'client': 'Ned Flanders', 'location': 'Springfield'}] * 200).encode()
+
+    def test_select_encoding(self):
+        # Les encodages refusés (q=0) ou inconnus ne sont pas retenus
+        self.assertEqual(select_encoding('gzip'), 'gzip')
+        self.assertEqual(select_encoding('deflate, gzip;q=0.5'), 'gzip')
+        self.assertIsNone(select_encoding('gzip;q=0'))
+        self.assertIsNone(select_encoding('identity'))
+        self.assertIsNone(select_encoding(''))
+
+    def test_compress_api_response(self):
+        # Une réponse de l'API dépassant le seuil est compressée, son ETag (version) reste fort et dépend de l'encodage
+        def get_response(request):
+            return HttpResponse(self.content, content_type='application/json', headers={'ETag': '"3"'})
+
+        request = self.factory.get('/crm/events/all_events_details/', HTTP_ACCEPT_ENCODING='gzip')
+        response = APICompressionMiddleware(get_response)(request)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], '"3-gzip"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertLess(len(response.content), len(self.content))
+        self.assertEqual(gzip.decompress(response.content), self.content)
+
+    def test_small_and_non_api_responses_are_not_compressed(self):
+        # Les réponses sous le seuil et hors de /crm/ ne sont pas compressées
+        middleware = APICompressionMiddleware(lambda request: HttpResponse(self.content))
+
+        with override_settings(COMPRESSION_MIN_SIZE=len(self.content) + 1):
+            response = middleware(self.factory.get('/crm/events/', HTTP_ACCEPT_ENCODING='gzip'))
+            self.assertFalse(response.has_header('Content-Encoding'))
+
+        response = middleware(self.factory.get('/admin/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_compress_streaming_response(self):
+        # Une réponse en flux est compressée morceau par morceau
+        chunks = [self.content[i:i + 500] for i in range(0, len(self.content), 500)]
+
+        def get_response(request):
+            return StreamingHttpResponse(iter(chunks), content_type='application/json')
+
+        request = self.factory.get('/crm/events/export/', HTTP_ACCEPT_ENCODING='gzip')
+        response = APICompressionMiddleware(get_response)(request)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.content)
@@ -1,23 +1,31 @@
 import sentry_sdk
+from datetime import datetime, time, timedelta
 from sentry_sdk import capture_exception
-from django.http import HttpResponseForbidden
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404, HttpResponseForbidden
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
-from rest_framework.generics import get_object_or_404
-from django.utils.decorators import method_decorator
-from django.views.decorators.csrf import csrf_protect
+from django.db import IntegrityError, transaction
 
-from .models import Event
+from .assignment import apply_support_assignments, plan_support_assignments
+from .models import Event, find_overlaps, find_support_conflicts, get_event_max_duration
 from .permissions import EventPermissions
 from .serializers import MultipleSerializerMixin, EventListSerializer, EventDetailSerializer
-from contracts.models import Contract
+from archive.models import ArchivedEvent, include_archived
+from contracts.models import Contract, ConcurrentUpdateError
+from contracts.views import WeakETagError, get_if_match_version
+from EpicEvents.serializers import SparseFieldsetViewMixin
+from profiles.views import BatchDetailsMixin
 from profiles.models import User
 
 
-@method_decorator(csrf_protect, name='dispatch')
-class EventViewSet(MultipleSerializerMixin, ModelViewSet):
+class EventViewSet(BatchDetailsMixin, SparseFieldsetViewMixin, MultipleSerializerMixin, ModelViewSet):
     """ViewSet pour gérer les opérations CRUD sur les objets Event (CRM)."""
 
     def __init__(self, *args, **kwargs):
@@ -45,6 +53,11 @@ class EventViewSet(MultipleSerializerMixin, ModelViewSet):
         'update': EventDetailSerializer
     }
 
+    # event_details et batch_details : seuls les événements de l'utilisateur sont chargés
+    details_action = 'event_details'
+    details_serializer_class = EventDetailSerializer
+    details_owner_field = 'support_contact'
+
     event_permissions = None
 
     def initialize_event_permissions(self):
@@ -58,60 +71,203 @@ class EventViewSet(MultipleSerializerMixin, ModelViewSet):
         """
         return self.serializers.get(self.action, self.serializer_class)
 
+    @staticmethod
+    def with_archived(request, serializer_class, events, filters=None):
+        """
+            Renvoie les données sérialisées des événements, suivies des événements archivés
+            répondant aux mêmes filtres lorsque la requête le demande (?include_archived=1).
+        """
+        data = serializer_class.from_request(request, events).data
+        if include_archived(request):
+            archived_events = ArchivedEvent.objects.filter(**(filters or {}))
+            data = list(data) + list(serializer_class.from_request(request, archived_events).data)
+        return data
+
     @action(detail=False, methods=['GET'])
     def events_list(self, request):
         """Renvoie tous les événements associé à l'utilisateur connecté."""
         if request.user.role == User.ROLE_SUPPORT:
             # Si l'utilisateur appartient à l'équipe de support, filtre par support_contact
-            events = Event.objects.filter(support_contact=request.user)
+            filters = {'support_contact': request.user}
         else:
             # Pour les autres utilisateurs, renvoie tous les événements
-            events = Event.objects.all()
+            filters = {}
 
-        serializer = EventListSerializer(events, many=True)
-        return Response(serializer.data)
+        events = Event.objects.filter(**filters)
+        return Response(self.with_archived(request, EventListSerializer, events, filters))
 
     @action(detail=True, methods=['GET'])
     def event_details(self, request, pk=None):
         """Renvoie les détails d'un événement spécifique associé à l'utilisateur."""
-        event = self.get_object()
+        try:
+            # Le queryset est déjà filtré sur l'événement de l'utilisateur actuellement authentifié
+            event = self.get_object()
+        except Http404:
+            # Distingue un événement inexistant (404) d'un événement appartenant à un autre utilisateur (403)
+            if not Event.objects.filter(pk=pk).exists():
+                raise
 
-        # Vérifie si l'événement appartient à l'utilisateur actuellement authentifié
-        if event.support_contact != request.user:
             # Capture l'exception et envoie une alerte à Sentry
             capture_exception(Exception("Unauthorized access to event_details"))
 
             return HttpResponseForbidden("You do not have permission to access this event.")
 
-        serializer = EventDetailSerializer(event)
-        return Response(serializer.data)
+        serializer = EventDetailSerializer(event, fields=EventDetailSerializer.get_sparse_fields(request))
+        return Response(serializer.data, headers={'ETag': f'"{event.version}"'})
 
     @action(detail=False, methods=['GET'])
     def all_events_details(self, request):
         """Renvoie les détails de tous les événements."""
         if request and request.user and request.user.role == User.ROLE_SUPPORT:
             # Si l'utilisateur appartient à l'équipe de support, filtre par support_contact
-            events = Event.objects.filter(support_contact=request.user)
+            filters = {'support_contact': request.user}
         else:
             # Pour les autres utilisateurs, renvoie tous les événements
-            events = Event.objects.all()
+            filters = {}
 
-        serializer = EventDetailSerializer(events, many=True)
-        return Response(serializer.data)
+        events = Event.objects.filter(**filters)
+        return Response(self.with_archived(request, EventDetailSerializer, events, filters))
 
     @action(detail=False, methods=['GET'])
     def events_without_support(self, request):
         """Renvoie tous les événements qui n'ont pas de support associé."""
         if request.user.role == User.ROLE_MANAGEMENT:
-            events_without_support = Event.objects.filter(support_contact=None)
-            serializer = EventDetailSerializer(events_without_support, many=True)
-            return Response(serializer.data)
+            filters = {'support_contact': None}
+            events_without_support = Event.objects.filter(**filters)
+            return Response(self.with_archived(request, EventDetailSerializer, events_without_support, filters))
         else:
             return HttpResponseForbidden("You are not authorized to access this view.")
 
+    @action(detail=False, methods=['POST'])
+    def assign_support(self, request):
+        """
+            Affecte automatiquement des contacts support aux événements qui n'en ont pas (équipe gestion).
+
+            La charge des contacts est équilibrée (nombre d'événements et nombre d'invités) sans
+            leur confier deux événements sur la même période. Avec "dry_run": true, les affectations
+            sont calculées et renvoyées sans être enregistrées.
+        """
+        if request.user.role != User.ROLE_MANAGEMENT:
+            # Capture l'exception et envoie une alerte à Sentry
+            capture_exception(Exception("Unauthorized access to assign_support"))
+
+            return HttpResponseForbidden("You are not authorized to access this view.")
+
+        dry_run = str(request.data.get('dry_run', False)).lower() in ('1', 'true')
+        assignments, unassigned = plan_support_assignments()
+        updated = 0 if dry_run else apply_support_assignments(assignments)
+
+        success_message = "Support contacts planned." if dry_run else "Support contacts assigned."
+        return Response({
+            "message": success_message,
+            "data": {"assigned": updated, "assignments": assignments, "unassigned": unassigned},
+        })
+
+    @staticmethod
+    def parse_calendar_date(request, name):
+        """
+            Renvoie la date du paramètre name (date ou date et heure ISO 8601) sous forme de datetime avec fuseau.
+            Une date seule correspond au début de la journée.
+        """
+        value = request.query_params.get(name, '').strip()
+        if not value:
+            raise ValidationError({name: f"The {name} parameter is required."})
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                parsed_date = parse_date(value)
+                parsed = datetime.combine(parsed_date, time.min) if parsed_date is not None else None
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: "Invalid date, expected YYYY-MM-DD or an ISO 8601 datetime."})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    @action(detail=False, methods=['GET'])
+    def calendar(self, request):
+        """
+            Renvoie les événements ayant lieu entre les dates from (incluse) et to (exclue), triés par date de début,
+            ainsi que les couples d'événements d'un même contact support qui se chevauchent.
+
+            Un événement sans date de fin est considéré comme ponctuel. Un membre de l'équipe support
+            ne voit que ses événements ; les autres utilisateurs peuvent filtrer par support_contact (id).
+        """
+        date_from = self.parse_calendar_date(request, 'from')
+        date_to = self.parse_calendar_date(request, 'to')
+        if date_to <= date_from:
+            raise ValidationError({'to': "The to date must be after the from date."})
+        max_days = getattr(settings, 'EVENT_CALENDAR_MAX_DAYS', 366)
+        if date_to - date_from > timedelta(days=max_days):
+            raise ValidationError({'to': f"The calendar range cannot exceed {max_days} days."})
+
+        # Prédicats d'intervalle sur les colonnes indexées (event_date_start, event_date_end) :
+        # un événement de la période commence au plus tard la durée maximale d'un événement avant date_from
+        events = Event.objects.filter(
+            event_date_start__gt=date_from - get_event_max_duration(), event_date_start__lt=date_to
+        ).filter(
+            Q(event_date_end__gt=date_from) | Q(event_date_end__isnull=True, event_date_start__gte=date_from)
+        )
+        if request.user.role == User.ROLE_SUPPORT:
+            events = events.filter(support_contact=request.user)
+        elif request.query_params.get('support_contact'):
+            try:
+                events = events.filter(support_contact_id=int(request.query_params['support_contact']))
+            except ValueError:
+                raise ValidationError({'support_contact': "Invalid support_contact id."})
+        events = events.order_by('event_date_start', 'id')
+
+        # Les chevauchements sont calculés par balayage trié sur les seules dates des événements
+        intervals = [
+            (event_id, support_contact_id, start, end)
+            for event_id, support_contact_id, start, end in events.filter(
+                support_contact__isnull=False, event_date_end__isnull=False
+            ).values_list('id', 'support_contact_id', 'event_date_start', 'event_date_end')
+        ]
+        conflicts = [{'events': list(pair)} for pair in find_overlaps(intervals)]
+
+        serializer = EventDetailSerializer.from_request(request, events)
+        return Response({"from": date_from, "to": date_to, "events": serializer.data, "conflicts": conflicts})
+
+    @staticmethod
+    def get_support_conflicts(serializer, instance=None):
+        """
+            Renvoie les événements du contact support qui chevauchent l'événement validé par le sérialiseur.
+            Les champs absents des données validées (mise à jour partielle) sont lus sur l'instance.
+
+            Doit être appelée dans la transaction de la sauvegarde : la ligne du contact support est verrouillée
+            jusqu'à sa validation, afin que deux requêtes concurrentes sur le même contact ne puissent pas
+            toutes deux ne trouver aucun conflit puis enregistrer des événements qui se chevauchent.
+        """
+        def get_value(field):
+            if field in serializer.validated_data:
+                return serializer.validated_data[field]
+            return getattr(instance, field, None)
+
+        support_contact = get_value('support_contact')
+        if support_contact is not None:
+            list(User.objects.select_for_update().filter(pk=support_contact.pk).values_list('pk', flat=True))
+        return list(find_support_conflicts(
+            getattr(support_contact, 'pk', None), get_value('event_date_start'), get_value('event_date_end'),
+            exclude_pk=getattr(instance, 'pk', None)
+        ).values('id', 'event_name', 'event_date_start', 'event_date_end'))
+
+    @staticmethod
+    def get_overlap_response(conflicts):
+        """Renvoie la réponse 409 si la politique EVENT_OVERLAP_POLICY refuse les chevauchements, sinon None."""
+        if conflicts and getattr(settings, 'EVENT_OVERLAP_POLICY', 'warn') == 'reject':
+            return Response(
+                {"message": "The support contact is already assigned to an overlapping event.", "conflicts": conflicts},
+                status=409
+            )
+        return None
+
     def create(self, request, *args, **kwargs):
         """Crée un nouvel événement."""
-        if not self.event_permissions.has_create_permission(request):
+        # Le client est résolu par le champ du sérialiseur, comme lors de la validation
+        client_field = self.serializers['create'](context=self.get_serializer_context()).fields['client']
+        if not self.event_permissions.has_create_permission(request, client_field):
             # Capture l'exception et envoie une alerte à Sentry
             capture_exception(Exception("Unauthorized access to create method"))
 
@@ -120,24 +276,42 @@ class EventViewSet(MultipleSerializerMixin, ModelViewSet):
         # Récupére les données de la requête
         data = request.data
 
-        # Vérifie si le contrat associé est signé
+        # Vérifie si le contrat associé existe et est signé en une seule requête
         contract_id = data.get('contract')
-        contract = get_object_or_404(Contract, id=contract_id)
-        if not contract.status_contract:
+        try:
+            status_contract = Contract.objects.filter(id=contract_id).values_list(
+                'status_contract', flat=True
+            ).first()
+        except (TypeError, ValueError):
+            raise Http404
+
+        if status_contract is None:
+            raise Http404
+        if not status_contract:
             return HttpResponseForbidden("The associated contract is not signed. Cannot create the event.")
 
-        # Vérifie si un événement existe déjà pour ce contrat
-        existing_event = Event.objects.filter(contract=contract).first()
-        if existing_event:
-            return HttpResponseForbidden("An event already exists for this contract. Cannot create another event.")
-
         # Crée l'événement uniquement si le contrat est signé
-        serializer = self.serializers['create'](data=data)
+        serializer = self.serializers['create'](data=data, context=self.get_serializer_context())
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
+
+        # L'unicité d'un événement par contrat est garantie par la contrainte unique_event_per_contract
+        try:
+            with transaction.atomic():
+                # Vérifie que le contact support n'est pas déjà associé à un événement sur la même période
+                conflicts = self.get_support_conflicts(serializer)
+                overlap_response = self.get_overlap_response(conflicts)
+                if overlap_response is not None:
+                    return overlap_response
+                self.perform_create(serializer)
+        except IntegrityError:
+            return HttpResponseForbidden("An event already exists for this contract. Cannot create another event.")
+
         headers = self.get_success_headers(serializer.data)
         success_message = "Event successfully created."
-        return Response({"message": success_message, "data": serializer.data}, status=201, headers=headers)
+        response_data = {"message": success_message, "data": serializer.data}
+        if conflicts:
+            response_data["conflicts"] = conflicts
+        return Response(response_data, status=201, headers=headers)
 
     def update(self, request, *args, **kwargs):
         """Mets à jour un événement existant."""
@@ -148,11 +322,42 @@ class EventViewSet(MultipleSerializerMixin, ModelViewSet):
 
             return HttpResponseForbidden("You do not have permission to update this event.")
 
-        serializer = self.serializers['update'](instance, data=request.data)
+        # Vérifie la version transmise par le client dans l'en-tête If-Match
+        try:
+            expected_version = get_if_match_version(request)
+        except WeakETagError as e:
+            return Response({"message": str(e)}, status=412)
+        except ValueError:
+            return Response({"message": "Invalid If-Match header."}, status=400)
+
+        conflict_message = "This event has been modified by another request. Reload it and try again."
+        if expected_version is not None and expected_version != instance.version:
+            return Response({"message": conflict_message}, status=412)
+
+        serializer = self.serializers['update'](
+            instance, data=request.data, context=self.get_serializer_context()
+        )
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
+
+        # Le nouveau contrat peut déjà être associé à un autre événement
+        # et la mise à jour est conditionnée à la version lue (UPDATE ... WHERE id=? AND version=?)
+        try:
+            with transaction.atomic():
+                conflicts = self.get_support_conflicts(serializer, instance)
+                overlap_response = self.get_overlap_response(conflicts)
+                if overlap_response is not None:
+                    return overlap_response
+                self.perform_update(serializer)
+        except IntegrityError:
+            return HttpResponseForbidden("An event already exists for this contract. Cannot update the event.")
+        except ConcurrentUpdateError:
+            return Response({"message": conflict_message}, status=412)
+
         success_message = "Event successfully updated."
-        return Response({"message": success_message, "data": serializer.data})
+        response_data = {"message": success_message, "data": serializer.data}
+        if conflicts:
+            response_data["conflicts"] = conflicts
+        return Response(response_data, headers={'ETag': f'"{instance.version}"'})
 
     def destroy(self, request, *args, **kwargs):
         """Supprime un événement existant."""
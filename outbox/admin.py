@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import OutboxMessage
+
+
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """
+        Personnalisation de l'interface d'administration pour le modèle OutboxMessage.
+        Permet de suivre les messages en attente, traités ou en erreur.
+    """
+
+    list_display = ('topic', 'created_at', 'attempts', 'processed_at', 'last_error')
+    list_filter = ('topic',)
+    ordering = ('-id',)
+
+
+# Enregistre la classe OutboxMessageAdmin avec le modèle OutboxMessage
+admin.site.register(OutboxMessage, OutboxMessageAdmin)
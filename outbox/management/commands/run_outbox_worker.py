@@ -0,0 +1,79 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from rich.console import Console
+
+from outbox.models import claim_outbox_messages, deliver_outbox_message
+
+
+class Command(BaseCommand):
+    """
+        Cette commande traite en arrière-plan les messages de la boîte d'envoi transactionnelle
+        (affichage des détails, attribution des contacts commerciaux, groupes, ...).
+        Elle est à lancer lorsque OUTBOX_DELIVERY vaut 'worker'.
+    """
+    help = 'Traiter les messages de la boîte d\'envoi (outbox)'
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument('--batch_size', type=int, default=100, help='Nombre de messages réservés par lot')
+        parser.add_argument('--workers', type=int, default=4, help='Nombre de threads de traitement')
+        parser.add_argument(
+            '--lease_seconds', type=int, default=60,
+            help='Durée de réservation d\'un message avant qu\'il ne redevienne disponible'
+        )
+        parser.add_argument('--max_attempts', type=int, default=10, help='Nombre maximal de tentatives par message')
+        parser.add_argument(
+            '--poll_interval', type=float, default=1.0,
+            help='Attente en secondes lorsque la boîte d\'envoi est vide'
+        )
+        parser.add_argument('--once', action='store_true', help='Vider la boîte d\'envoi puis s\'arrêter')
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande : réserve les messages par lots
+            et les traite en parallèle jusqu'à l'arrêt (Ctrl+C) ou, avec --once, jusqu'à ce que la boîte soit vide.
+        """
+        console = Console()
+        processed = failed = 0
+
+        with ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='outbox') as executor:
+            try:
+                while True:
+                    messages = claim_outbox_messages(
+                        batch_size=options['batch_size'],
+                        lease_seconds=options['lease_seconds'],
+                        max_attempts=options['max_attempts']
+                    )
+                    if not messages:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+
+                    for delivered in executor.map(self.deliver, messages):
+                        if delivered:
+                            processed += 1
+                        else:
+                            failed += 1
+
+            except KeyboardInterrupt:
+                console.print("[bold yellow]Arrêt du worker.[/bold yellow]")
+
+        console.print(f"[bold green]{processed} message(s) traité(s), {failed} échec(s).[/bold green]")
+
+    def deliver(self, message):
+        """
+            Traite un message dans un thread du pool.
+            Les connexions à la base de données obsolètes du thread sont fermées avant et après le traitement.
+        """
+        close_old_connections()
+        try:
+            return deliver_outbox_message(message)
+        finally:
+            close_old_connections()
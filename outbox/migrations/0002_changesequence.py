@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:49
+
+from django.db import migrations, models
+
+
+def create_change_sequence(apps, schema_editor):
+    """Crée la ligne unique du compteur de la séquence des modifications."""
+    ChangeSequence = apps.get_model('outbox', 'ChangeSequence')
+    ChangeSequence.objects.using(schema_editor.connection.alias).get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outbox', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_change_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outbox', '0002_changesequence'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='ChangeSequence',
+        ),
+    ]
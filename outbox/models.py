@@ -0,0 +1,130 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+
+# Registre des gestionnaires par sujet de message
+HANDLERS = {}
+
+DELIVERY_INLINE = 'inline'
+DELIVERY_WORKER = 'worker'
+
+
+class OutboxMessage(models.Model):
+    """
+        Modèle représentant un message de la boîte d'envoi transactionnelle (outbox).
+
+        Le message est écrit dans la même transaction que l'écriture principale,
+        puis traité en arrière-plan par la commande run_outbox_worker.
+        La livraison est « au moins une fois » : les gestionnaires doivent être idempotents.
+
+        Champs:
+            topic: Sujet du message, associé à un gestionnaire (ex. 'client.saved').
+            payload: Données du message (identifiants des objets concernés).
+            created_at: Date de création du message.
+            available_at: Date à partir de laquelle le message peut être (re)traité.
+            attempts: Nombre de tentatives de traitement.
+            processed_at: Date du traitement réussi, vide tant que le message est en attente.
+            last_error: Dernière erreur rencontrée lors du traitement.
+    """
+    topic = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['processed_at', 'available_at'], name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        """Renvoie une représentation lisible de l'instance de OutboxMessage."""
+        status = "traité" if self.processed_at else "en attente"
+        return f"Message ID : {self.id} {self.topic} - {status}"
+
+    def mark_processed(self):
+        """Marque le message comme traité."""
+        OutboxMessage.objects.filter(pk=self.pk).update(processed_at=timezone.now(), last_error='')
+
+    def mark_failed(self, error, retry_delay):
+        """Enregistre l'erreur et reporte la prochaine tentative de retry_delay secondes."""
+        OutboxMessage.objects.filter(pk=self.pk).update(
+            last_error=str(error), available_at=timezone.now() + timedelta(seconds=retry_delay)
+        )
+
+
+def register_handler(topic):
+    """
+        Décorateur enregistrant un gestionnaire pour un sujet de message.
+
+        Le gestionnaire reçoit le payload du message et, en livraison immédiate,
+        l'instance concernée (instance=None lorsqu'il est appelé par le worker).
+    """
+    def decorator(handler):
+        HANDLERS[topic] = handler
+        return handler
+    return decorator
+
+
+def get_delivery_mode():
+    """Renvoie le mode de livraison configuré ('inline' par défaut, ou 'worker')."""
+    return getattr(settings, 'OUTBOX_DELIVERY', DELIVERY_INLINE) or DELIVERY_INLINE
+
+
+def publish(topic, payload, instance=None):
+    """
+        Publie un message pour le sujet donné.
+
+        En mode 'worker', le message est inséré dans la boîte d'envoi : la fonction doit être appelée
+        dans la transaction de l'écriture principale afin que les deux soient validées ensemble.
+        En mode 'inline', le gestionnaire est exécuté immédiatement avec l'instance concernée.
+    """
+    if get_delivery_mode() == DELIVERY_WORKER:
+        return OutboxMessage.objects.create(topic=topic, payload=payload)
+
+    HANDLERS[topic](payload, instance=instance)
+    return None
+
+
+def claim_outbox_messages(batch_size=100, lease_seconds=60, max_attempts=10):
+    """
+        Réserve un lot de messages en attente et renvoie la liste des messages réservés.
+
+        La réservation repousse available_at de lease_seconds et incrémente attempts :
+        un message réservé par un worker interrompu redevient disponible à l'expiration du bail
+        (livraison « au moins une fois »). Les lignes déjà verrouillées par un autre worker sont ignorées.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True).filter(
+                processed_at__isnull=True, available_at__lte=now, attempts__lt=max_attempts
+            ).order_by('id')[:batch_size]
+        )
+        if messages:
+            OutboxMessage.objects.filter(pk__in=[message.pk for message in messages]).update(
+                available_at=now + timedelta(seconds=lease_seconds), attempts=models.F('attempts') + 1
+            )
+    return messages
+
+
+def deliver_outbox_message(message, retry_delay=30):
+    """
+        Exécute le gestionnaire d'un message et enregistre le résultat.
+        Renvoie True si le message a été traité, False en cas d'erreur (le message sera retenté).
+    """
+    try:
+        handler = HANDLERS[message.topic]
+        handler(message.payload, instance=None)
+    except Exception as e:
+        # Le délai avant la prochaine tentative croît avec le nombre de tentatives
+        message.mark_failed(e, retry_delay * (message.attempts + 1))
+        return False
+
+    message.mark_processed()
+    return True
@@ -0,0 +1,146 @@
+import pytest
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import (
+    HANDLERS,
+    OutboxMessage,
+    claim_outbox_messages,
+    deliver_outbox_message,
+    publish,
+    register_handler
+)
+from profiles.models import User, Client
+
+
+@pytest.mark.django_db
+@override_settings(OUTBOX_DELIVERY='worker')
+class TestOutbox(TestCase):
+    """
+        Classe de tests pour la boîte d'envoi transactionnelle (OutboxMessage).
+    """
+
+    def create_user(self, email, role, full_name, phone_number, is_staff=True):
+        """
+            Crée et retourne un utilisateur avec les paramètres spécifiés.
+        """
+        return User.objects.create_user(
+            email=email,
+            password='Pingou123',
+            role=role,
+            full_name=full_name,
+            phone_number=phone_number,
+            is_staff=is_staff,
+        )
+
+    def create_client(self, email, full_name, phone_number, company_name):
+        """
+            Crée et retourne un client avec les paramètres spécifiés.
+        """
+        return Client.objects.create(
+            email=email,
+            full_name=full_name,
+            phone_number=phone_number,
+            company_name=company_name,
+        )
+
+    def setUp(self):
+        """
+            Mets en place les données nécessaires pour les tests.
+        """
+        self.sales_user = self.create_user(
+            email='Timothy@EpicEvents-Sales.com',
+            role=User.ROLE_SALES,
+            full_name='Timothy Lovejoy',
+            phone_number='+345678912',
+        )
+
+    def tearDown(self):
+        """
+            Retire le gestionnaire de test du registre.
+        """
+        HANDLERS.pop('test.failure', None)
+
+    def test_client_save_is_deferred_to_worker(self):
+        """
+            Vérifie que l'attribution du contact commercial est différée puis exécutée par le worker.
+        """
+        client = self.create_client(
+            email='Moe@Szyslak.com',
+            full_name='Moe Szyslak',
+            phone_number='+123456789',
+            company_name='Moe\'s Tavern',
+        )
+
+        # La sauvegarde n'écrit que le client et le message
+        client.refresh_from_db()
+        self.assertIsNone(client.user_contact)
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.topic, 'client.saved')
+        self.assertEqual(message.payload, {'id': client.id})
+
+        messages = claim_outbox_messages()
+        self.assertEqual([m.id for m in messages], [message.id])
+        self.assertTrue(deliver_outbox_message(messages[0]))
+
+        client.refresh_from_db()
+        self.assertEqual(client.user_contact, self.sales_user)
+        message.refresh_from_db()
+        self.assertIsNotNone(message.processed_at)
+        self.assertEqual(message.attempts, 1)
+
+        # Un message réservé n'est pas réservé une seconde fois
+        self.assertFalse(any(m.id == message.id for m in claim_outbox_messages()))
+
+    def test_message_is_rolled_back_with_the_write(self):
+        """
+            Vérifie que le message n'est pas écrit si la transaction de l'écriture principale est annulée.
+        """
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.create_client(
+                    email='Barney@Gumble.com',
+                    full_name='Barney Gumble',
+                    phone_number='+987654321',
+                    company_name='Duff',
+                )
+                raise RuntimeError("Annulation")
+
+        self.assertFalse(Client.objects.filter(email='Barney@Gumble.com').exists())
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_failed_message_is_retried_later(self):
+        """
+            Vérifie qu'un message en erreur est conservé, puis reporté.
+        """
+        @register_handler('test.failure')
+        def failing_handler(payload, instance=None):
+            raise ValueError("Échec du gestionnaire")
+
+        publish('test.failure', {'id': 1})
+        message = claim_outbox_messages()[0]
+
+        self.assertFalse(deliver_outbox_message(message, retry_delay=30))
+
+        message.refresh_from_db()
+        self.assertIsNone(message.processed_at)
+        self.assertEqual(message.attempts, 1)
+        self.assertEqual(message.last_error, "Échec du gestionnaire")
+        self.assertGreater(message.available_at, timezone.now())
+        self.assertEqual(claim_outbox_messages(), [])
+
+    def test_handler_ignores_deleted_object(self):
+        """
+            Vérifie que le gestionnaire ignore un client supprimé avant le traitement du message.
+        """
+        client = self.create_client(
+            email='Apu@Nahasapeemapetilon.com',
+            full_name='Apu Nahasapeemapetilon',
+            phone_number='+192837465',
+            company_name='Kwik-E-Mart',
+        )
+        client.delete()
+
+        message = claim_outbox_messages()[0]
+        self.assertTrue(deliver_outbox_message(message))
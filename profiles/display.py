@@ -0,0 +1,157 @@
+import json
+from datetime import datetime, time
+from django.core.management.base import CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rich.table import Table
+
+
+# Formats de sortie des commandes d'affichage (management_*)
+DISPLAY_FORMATS = ('table', 'tsv', 'json')
+
+
+class DisplayColumn:
+    """
+        Colonne affichée par une commande d'affichage.
+
+        Attributs:
+            header: Titre de la colonne (tableau et en-tête TSV).
+            lookup: Colonne lue par la requête .values() (ex. 'client__full_name'), utilisée comme clé JSON.
+            formatter: Fonction convertissant la valeur lue en texte (str par défaut, '' pour une valeur vide).
+    """
+
+    def __init__(self, header, lookup, formatter=None):
+        self.header = header
+        self.lookup = lookup
+        self.formatter = formatter
+
+    def format(self, value):
+        """Renvoie la valeur sous forme de texte."""
+        if self.formatter is not None:
+            return self.formatter(value)
+        if value is None:
+            return ''
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value)
+
+
+def add_display_arguments(parser):
+    """Ajoute au parseur les options communes des commandes d'affichage."""
+    parser.add_argument(
+        '--format', choices=DISPLAY_FORMATS, default='table',
+        help='Format de sortie : tableau rich (par défaut), TSV ou JSON'
+    )
+    parser.add_argument('--limit', type=int, help='Nombre maximal de lignes affichées')
+    parser.add_argument('--offset', type=int, default=0, help='Nombre de lignes ignorées (tri par ID)')
+    parser.add_argument(
+        '--since', help='N\'affiche que les objets modifiés depuis cette date (AAAA-MM-JJ ou date et heure ISO 8601)'
+    )
+    parser.add_argument('--page_size', type=int, default=500, help='Nombre de lignes lues et affichées par page')
+
+
+def parse_since(value):
+    """
+        Renvoie la date de l'option --since sous forme de datetime avec fuseau (début de journée pour une date seule).
+        Lève CommandError si la date est invalide.
+    """
+    try:
+        since = parse_datetime(value)
+        if since is None:
+            since_date = parse_date(value)
+            since = datetime.combine(since_date, time.min) if since_date is not None else None
+    except ValueError:
+        since = None
+    if since is None:
+        raise CommandError(f"Date --since invalide : {value}")
+    return timezone.make_aware(since) if timezone.is_naive(since) else since
+
+
+def get_display_queryset(queryset, options, since_field='update_date'):
+    """
+        Applique au queryset l'option --since et vérifie les options --offset et --limit,
+        appliquées page par page par display_rows.
+        Les objets sont triés par identifiant afin que les pages successives soient stables.
+    """
+    if (options.get('offset') or 0) < 0 or (options.get('limit') is not None and options['limit'] < 0):
+        raise CommandError("Les options --offset et --limit doivent être positives.")
+
+    if options.get('since'):
+        queryset = queryset.filter(**{f'{since_field}__gte': parse_since(options['since'])})
+    return queryset.order_by('id')
+
+
+def display_rows(queryset, columns, options, console, stdout):
+    """
+        Affiche les lignes du queryset (trié par identifiant) page par page, sans charger toutes les lignes
+        en mémoire, en appliquant les options --offset et --limit.
+
+        Chaque page est lue par une requête .values() bornée (LIMIT page_size) : les modèles ne sont pas
+        instanciés et seules les colonnes affichées sont lues. Les pages suivant la première sont lues
+        par clé (id > dernier identifiant affiché), sans OFFSET ni curseur serveur conservant le résultat.
+        Chaque page est affichée dès sa lecture : un tableau rich par page (format table), des lignes
+        séparées par des tabulations (tsv) ou un tableau JSON écrit au fil de l'eau (json).
+        Renvoie le nombre de lignes affichées.
+    """
+    page_size = max(options.get('page_size') or 500, 1)
+    output_format = options.get('format') or 'table'
+    offset = options.get('offset') or 0
+    limit = options.get('limit')
+
+    # L'identifiant sert de clé de pagination, même s'il n'est pas affiché
+    lookups = [column.lookup for column in columns]
+    hidden_id = 'id' not in lookups
+    rows = queryset.values(*lookups, *(['id'] if hidden_id else []))
+
+    count = 0
+    last_id = None
+    if output_format == 'tsv':
+        stdout.write('\t'.join(column.header for column in columns))
+    elif output_format == 'json':
+        stdout.write('[', ending='')
+
+    while limit is None or count < limit:
+        size = page_size if limit is None else min(page_size, limit - count)
+        if last_id is None:
+            page = list(rows[offset:offset + size])
+        else:
+            page = list(rows.filter(id__gt=last_id)[:size])
+        if not page:
+            break
+
+        last_id = page[-1]['id']
+        if hidden_id:
+            for row in page:
+                del row['id']
+        write_page(page, columns, output_format, console, stdout, first=count == 0)
+        count += len(page)
+        if len(page) < size:
+            break
+
+    if count == 0 and output_format == 'table':
+        write_page([], columns, output_format, console, stdout, first=True)
+
+    if output_format == 'json':
+        stdout.write('\n]')
+    return count
+
+
+def write_page(page, columns, output_format, console, stdout, first):
+    """Affiche une page de lignes dans le format demandé."""
+    if output_format == 'tsv':
+        for row in page:
+            stdout.write('\t'.join(
+                column.format(row[column.lookup]).replace('\t', ' ').replace('\n', ' ') for column in columns
+            ))
+    elif output_format == 'json':
+        for index, row in enumerate(page):
+            separator = '\n' if first and index == 0 else ',\n'
+            stdout.write(separator + json.dumps(row, default=str, ensure_ascii=False), ending='')
+    else:
+        # L'en-tête n'est affiché qu'avec la première page
+        table = Table(show_header=first, header_style="bold magenta")
+        for column in columns:
+            table.add_column(column.header, style="cyan")
+        for row in page:
+            table.add_row(*[column.format(row[column.lookup]) for column in columns])
+        console.print(table)
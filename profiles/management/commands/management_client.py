@@ -6,6 +6,7 @@ from colorama import Fore, Style
 from rich.table import Table
 
 from profiles.models import Client
+from profiles.display import DisplayColumn, add_display_arguments, display_rows, get_display_queryset
 from profiles.views import ClientViewSet
 
 
@@ -17,6 +18,15 @@ class Command(BaseCommand):
     """
     help = 'Afficher, créer, modifier, supprimer des clients.'
 
+    # Colonnes affichées par --display_clients
+    display_columns = [
+        DisplayColumn("ID", 'id'),
+        DisplayColumn("Nom complet", 'full_name'),
+        DisplayColumn("Email", 'email'),
+        DisplayColumn("Entreprise", 'company_name'),
+        DisplayColumn("Contact commercial", 'sales_contact__full_name'),
+    ]
+
     def add_arguments(self, parser):
         """
             Ajoute les arguments spécifiques à la commande.
@@ -27,6 +37,7 @@ class Command(BaseCommand):
         parser.add_argument('--create_client', action='store_true', help='Créer un nouveau client')
         parser.add_argument('--update_client', type=int, help='Mettre à jour un client en spécifiant son ID')
         parser.add_argument('--delete_client', type=int, help='Supprimer un client en spécifiant son ID')
+        add_display_arguments(parser)
 
     def handle(self, *args, **options):
         """
@@ -37,30 +48,9 @@ class Command(BaseCommand):
         client_view_set = ClientViewSet()
 
         if options['display_clients']:
-            # Appele la méthode all_clients_details pour lire les informations des clients
-            response = client_view_set.all_clients_details(request=None)
-
-            # Utilise la propriété data de l'objet Response pour accéder au contenu JSON
-            data = response.data
-
-            # Affiche les données sous forme de tableau avec rich
-            table = Table(show_header=True, header_style="bold magenta")
-            table.add_column("ID", style="cyan")
-            table.add_column("Nom complet", style="cyan")
-            table.add_column("Email", style="cyan")
-            table.add_column("Entreprise", style="cyan")
-            table.add_column("Contact commercial", style="cyan")
-
-            for client in data:
-                table.add_row(
-                    str(client['id']),
-                    client['full_name'],
-                    client['email'],
-                    client['company_name'],
-                    client['sales_contact']
-                )
-
-            console.print(table)
+            # Lit les clients page par page et les affiche au fur et à mesure
+            clients = get_display_queryset(Client.objects.all(), options)
+            display_rows(clients, self.display_columns, options, console, self.stdout)
 
         elif options['create_client']:
             # Utilise Rich pour améliorer la sortie en ligne de commande
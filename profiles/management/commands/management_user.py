@@ -5,6 +5,7 @@ from colorama import Fore, Style
 from rich.table import Table
 
 from profiles.models import User
+from profiles.display import DisplayColumn, add_display_arguments, display_rows, get_display_queryset
 from profiles.views import UserViewSet
 
 
@@ -16,6 +17,14 @@ class Command(BaseCommand):
     """
     help = 'Afficher, créer, modifier, supprimer des utilisateurs.'
 
+    # Colonnes affichées par --display_users
+    display_columns = [
+        DisplayColumn("ID", 'id'),
+        DisplayColumn("Nom complet", 'full_name'),
+        DisplayColumn("Email", 'email'),
+        DisplayColumn("Rôle", 'role'),
+    ]
+
     def add_arguments(self, parser):
         """
             Ajoute les arguments spécifiques à la commande.
@@ -27,6 +36,7 @@ class Command(BaseCommand):
         parser.add_argument('--create_superuser', action='store_true', help='Créer un nouvel administrateur')
         parser.add_argument('--update_user', type=int, help='Mettre à jour un utilisateur en spécifiant son ID')
         parser.add_argument('--delete_user', type=int, help='Supprimer un utilisateur en spécifiant son ID')
+        add_display_arguments(parser)
 
     def handle(self, *args, **options):
         """
@@ -41,23 +51,10 @@ class Command(BaseCommand):
         user_view_set = UserViewSet()
 
         if options['display_users']:
-            # Appele la méthode all_users_details pour lire les informations des utilisateurs
-            response = user_view_set.all_users_details(request=None)
-
-            # Utilise la propriété data de l'objet Response pour accéder au contenu JSON
-            data = response.data
-
-            # Affiche les données sous forme de tableau avec rich
-            table = Table(show_header=True, header_style="bold magenta")
-            table.add_column("ID", style="cyan")
-            table.add_column("Nom complet", style="cyan")
-            table.add_column("Email", style="cyan")
-            table.add_column("Rôle", style="cyan")
-
-            for user in data:
-                table.add_row(str(user['id']), user['full_name'], user['email'], user['role'])
-
-            console.print(table)
+            # Lit les utilisateurs page par page et les affiche au fur et à mesure
+            # (--since porte sur la date d'inscription, les utilisateurs n'ayant pas de date de mise à jour)
+            users = get_display_queryset(User.objects.all(), options, since_field='date_joined')
+            display_rows(users, self.display_columns, options, console, self.stdout)
 
         elif options['create_user']:
             # Utilise Rich pour améliorer la sortie en ligne de commande
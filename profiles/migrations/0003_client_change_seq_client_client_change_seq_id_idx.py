@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_client_client_update_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='change_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['change_seq', 'id'], name='client_change_seq_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_client_change_seq_client_client_change_seq_id_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='client',
+            name='client_change_seq_id_idx',
+        ),
+        migrations.RemoveField(
+            model_name='client',
+            name='change_seq',
+        ),
+    ]
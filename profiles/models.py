@@ -1,12 +1,14 @@
-from django.db import models, IntegrityError
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin, Group
 from django.core.exceptions import ValidationError
-from django.db.models.signals import pre_save, post_save, pre_delete
+from django.db.models.signals import pre_save, pre_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from django.db.models import Count
 from itertools import cycle
 
+from outbox.models import publish, register_handler
+
 
 class UserManager(BaseUserManager):
     """
@@ -120,12 +122,17 @@ class User(AbstractBaseUser, PermissionsMixin):
         return True
 
     def save(self, *args, **kwargs):
-        # Vérifie si un utilisateur avec cette adresse e-mail existe déjà
-        if User.objects.filter(email=self.email).exclude(id=self.id).exists():
-            raise ValidationError("This user already exists in the database.")
-
         # Appel la méthode save de la classe parent
-        super().save(*args, **kwargs)
+        # L'unicité de l'e-mail est garantie par l'index unique, le point de sauvegarde
+        # permet de poursuivre la transaction en cours si l'insertion échoue
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError:
+            # Vérifie si un utilisateur avec cette adresse e-mail existe déjà
+            if User.objects.filter(email=self.email).exclude(id=self.id).exists():
+                raise ValidationError("This user already exists in the database.")
+            raise
 
         # Ajoute l'utilisateur au groupe "Staff" s'il n'y est pas déjà
         staff_group, created = Group.objects.get_or_create(name='Staff')
@@ -152,8 +159,12 @@ class Client(models.Model):
             __str__: Renvoie une représentation en chaîne du client.
             print_details: Imprime les détails du client.
             assign_sales_contact: Affecte un contact commercial à un client non associé.
+            has_contact_changed: Indique si un champ recopié dans les événements a été modifié.
             save: Enregistre le client avec gestion des erreurs d'intégrité.
     """
+    # Champs recopiés dans les événements du client (client_name et client_contact)
+    CONTACT_FIELDS = ('full_name', 'email', 'phone_number')
+
     email = models.EmailField(unique=True, editable=True)
     full_name = models.CharField(max_length=255, help_text="Full name of the client.")
     user_contact = models.ForeignKey(
@@ -184,6 +195,30 @@ class Client(models.Model):
 
     class Meta:
         ordering = ['update_date']
+        indexes = [
+            # Index utilisé par le flux de modifications (crm/changes/)
+            # et par les filtres sur la date de mise à jour (option --since des commandes d'affichage)
+            models.Index(fields=['update_date', 'id'], name='client_update_date_id_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Crée l'instance lue en base en conservant les valeurs lues des champs recopiés dans les événements."""
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_contact = {
+            name: value for name, value in zip(field_names, values) if name in cls.CONTACT_FIELDS
+        }
+        return instance
+
+    def has_contact_changed(self):
+        """
+            Indique si un champ recopié dans les événements (CONTACT_FIELDS) a été modifié depuis sa lecture en base.
+            Une instance qui n'a pas été lue en base est considérée comme modifiée.
+        """
+        loaded = getattr(self, 'loaded_contact', None)
+        if loaded is None:
+            return True
+        return any(name in loaded and loaded[name] != getattr(self, name) for name in self.CONTACT_FIELDS)
 
     def __str__(self):
         """Renvoie une représentation lisible de l'instance de Client."""
@@ -244,36 +279,39 @@ class Client(models.Model):
 
     def save(self, *args, **kwargs):
         """
-            Sauvegarde l'instance après vérification de la non-existence d'un client avec le même e-mail.
+            Sauvegarde l'instance en s'appuyant sur l'index unique de l'e-mail.
             Mets à jour les colonnes email_id et sales_contact_id.
-            Appelle la méthode save de la classe parent pour effectuer la sauvegarde réelle.
-            Imprime les détails avant et après la sauvegarde.
-            Exécute automatiquement la méthode assign_sales_contact après la sauvegarde.
+            Appelle la méthode save de la classe parent dans un point de sauvegarde pour effectuer la sauvegarde réelle.
+            Si un client avec le même e-mail existe déjà, imprime un message d'erreur et n'enregistre rien.
+            Publie le message 'client.saved' dans la même transaction que la sauvegarde :
+            l'affichage des détails, l'attribution du contact commercial et l'ajout au groupe "Client"
+            sont exécutés immédiatement ou par le worker de la boîte d'envoi selon OUTBOX_DELIVERY.
         """
-        try:
-            # Vérifie si un client avec le même e-mail existe déjà
-            existing_user = Client.objects.filter(email=self.email).exclude(id=self.id).first()
-
-            if existing_user:
-                raise IntegrityError("This client already exists in the database.")
-        except IntegrityError as e:
-            # Gère l'IntegrityError en imprimant le message d'erreur personnalisé
-            print(f"Erreur d'intégrité : {e}")
-            return
-        else:
-            # Mets à jour la colonne email_contact avec l'e-mail de l'utilisateur associé
-            self.email_contact = self.user_contact.email if self.user_contact else None
-            self.sales_contact = self.user_contact if self.user_contact else None
-            self.update_date = timezone.now()
+        # Mets à jour la colonne email_contact avec l'e-mail de l'utilisateur associé
+        self.email_contact = self.user_contact.email if self.user_contact else None
+        self.sales_contact = self.user_contact if self.user_contact else None
+        self.update_date = timezone.now()
 
-            # Appelle la méthode save de la classe parent pour effectuer la sauvegarde réelle
-            super().save(*args, **kwargs)
+        with transaction.atomic():
+            try:
+                # Appelle la méthode save de la classe parent pour effectuer la sauvegarde réelle
+                # Le point de sauvegarde permet de poursuivre la transaction en cours si l'insertion échoue
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+            except IntegrityError:
+                # Vérifie si un client avec le même e-mail existe déjà
+                if not Client.objects.filter(email=self.email).exclude(id=self.id).exists():
+                    raise
 
-            # Imprime les détails après la sauvegarde
-            self.print_details()
+                # Gère l'IntegrityError en imprimant le message d'erreur personnalisé
+                print("Erreur d'intégrité : This client already exists in the database.")
+                return
 
-            # Exécute automatiquement la méthode assign_sales_contact après la sauvegarde
-            self.assign_sales_contact()
+            # Publie les effets secondaires de la sauvegarde
+            publish('client.saved', {'id': self.pk}, instance=self)
+
+        # Les valeurs sauvegardées servent de référence pour la prochaine sauvegarde
+        self.loaded_contact = {name: getattr(self, name) for name in self.CONTACT_FIELDS}
 
 
 class UserGroup(models.Model):
@@ -286,12 +324,11 @@ class UserGroup(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
 
 
-@receiver(post_save, sender=Client)
 def add_client_to_group(sender, instance, **kwargs):
     """
-        Fonction de réception appelée après la sauvegarde d'une instance de Client.
         Ajoute l'instance de Client au groupe "Client"
         si elle est associée à un contact utilisateur ou un utilisateur commercial.
+        Appelée par le gestionnaire du message 'client.saved'.
     """
     # Vérifie si le groupe "Client" existe
     client_group, created = Group.objects.get_or_create(name='Client')
@@ -303,6 +340,30 @@ def add_client_to_group(sender, instance, **kwargs):
         instance.sales_contact.groups.add(client_group)
 
 
+@register_handler('client.saved')
+def handle_client_saved(payload, instance=None):
+    """
+        Gestionnaire du message 'client.saved'.
+        Imprime les détails du client, l'ajoute au groupe "Client"
+        et attribue un contact commercial aux clients non associés.
+        Idempotent : le client est relu en base lorsqu'il est traité par le worker,
+        et un client supprimé entre-temps est ignoré.
+    """
+    client = instance
+    if client is None:
+        client = Client.objects.select_related('user_contact', 'sales_contact').filter(pk=payload['id']).first()
+        if client is None:
+            return
+
+    add_client_to_group(sender=Client, instance=client)
+
+    # Imprime les détails après la sauvegarde
+    client.print_details()
+
+    # Attribue automatiquement un contact commercial aux clients non associés
+    client.assign_sales_contact()
+
+
 @receiver(pre_delete, sender=User)
 def delete_user_groups(sender, instance, **kwargs):
     """
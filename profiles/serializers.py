@@ -3,8 +3,12 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.serializers import ModelSerializer, SerializerMethodField, ValidationError
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.password_validation import validate_password
+from django.db.models import Prefetch
 
 from .models import User, Client
+from contracts.serializers import ClientOverviewContractSerializer
+from events.serializers import ClientOverviewEventSerializer
+from EpicEvents.serializers import SparseFieldsetMixin, ValuesListSerializer, ValuesSerializerMixin
 
 
 class MultipleSerializerMixin:
@@ -75,7 +79,7 @@ class UserLoginSerializer(serializers.ModelSerializer):
         return user
 
 
-class ClientListSerializer(serializers.ModelSerializer):
+class ClientListSerializer(ValuesSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """
         Serializer pour la liste des clients.
         Ce serializer est utilisé pour représenter les données de la liste des clients dans le CRM.
@@ -90,9 +94,10 @@ class ClientListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Client
         fields = ['id', 'full_name', 'email', 'phone_number', 'company_name']
+        list_serializer_class = ValuesListSerializer
 
 
-class ClientDetailSerializer(serializers.ModelSerializer):
+class ClientDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
         Serializer pour les détails d'un client.
         Ce serializer est utilisé pour représenter les détails d'un client spécifique dans le CRM.
@@ -117,7 +122,30 @@ class ClientDetailSerializer(serializers.ModelSerializer):
                   'update_date', 'last_contact', 'sales_contact', 'email_contact']
 
 
-class UserListSerializer(serializers.ModelSerializer):
+class ClientOverviewSerializer(ClientDetailSerializer):
+    """
+        Serializer de la vue d'ensemble d'un client : détails du client, ses contrats et ses événements.
+
+        Le queryset doit être préparé par get_overview_queryset, qui précharge les contrats (avec leur
+        solde courant) et les événements (avec leur contact support) : la réponse est construite en
+        trois requêtes, quel que soit le nombre de contrats et d'événements du client.
+    """
+    contracts = ClientOverviewContractSerializer(source='client_contracts', many=True, read_only=True)
+    events = ClientOverviewEventSerializer(source='client_events', many=True, read_only=True)
+
+    class Meta(ClientDetailSerializer.Meta):
+        fields = ClientDetailSerializer.Meta.fields + ['contracts', 'events']
+
+    @staticmethod
+    def get_overview_queryset(queryset):
+        """Précharge les contrats et les événements des clients du queryset."""
+        return queryset.select_related('sales_contact').prefetch_related(
+            Prefetch('client_contracts', queryset=ClientOverviewContractSerializer.get_overview_queryset()),
+            Prefetch('client_events', queryset=ClientOverviewEventSerializer.get_overview_queryset()),
+        )
+
+
+class UserListSerializer(ValuesSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """
         Serializer pour la liste des utilisateurs.
         Ce serializer est utilisé pour représenter les données de la liste des utilisateurs dans le CRM.
@@ -130,9 +158,10 @@ class UserListSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'full_name', 'email']
+        list_serializer_class = ValuesListSerializer
 
 
-class UserDetailSerializer(serializers.ModelSerializer):
+class UserDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
         Sérialiseur pour les détails d'un utilisateur.
         Ce sérialiseur est utilisé pour représenter les détails d'un utilisateur spécifique dans le CRM.
@@ -1,6 +1,12 @@
 import pytest
 import json
-from django.test import TestCase
+from contextlib import redirect_stdout
+from io import StringIO
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import Client as DjangoTestClient, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse, resolve
 from rest_framework import status
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
@@ -9,6 +15,8 @@ from rest_framework.status import HTTP_401_UNAUTHORIZED
 from rest_framework.response import Response
 
 from .models import User, Client, Group, add_client_to_group
+from contracts.models import Contract
+from events.models import Event
 
 
 @pytest.mark.django_db
@@ -279,6 +287,37 @@ class TestProfilesApp(TestCase):
         with pytest.raises(ValueError, match='Superuser must have is_superuser=True.'):
             User.objects.create_superuser('admin@example.com', 'adminpass', is_superuser=False)
 
+    def test_create_user_with_existing_email(self):
+        """
+            Vérifie que la création d'un utilisateur avec un e-mail déjà utilisé déclenche une ValidationError,
+            sans interrompre la transaction en cours.
+        """
+        with pytest.raises(ValidationError, match='This user already exists in the database.'):
+            self.create_user(
+                email='Martin@EpicEvents-Management.com',
+                role=User.ROLE_SALES,
+                full_name='Martin Prince Bis',
+                phone_number='+234567892',
+            )
+
+        # La transaction reste utilisable après l'échec de l'insertion
+        self.assertEqual(User.objects.filter(email='Martin@epicevents-management.com').count(), 1)
+
+    def test_create_client_with_existing_email(self):
+        """
+            Vérifie que la création d'un client avec un e-mail déjà utilisé n'enregistre aucun nouveau client.
+        """
+        duplicate_client = Client(
+            email='Jeff@EpicEvents.com',
+            full_name='Jeff Albertson Bis',
+            phone_number='+123456780',
+            company_name='Albertson & Co',
+        )
+        duplicate_client.save()
+
+        self.assertIsNone(duplicate_client.pk)
+        self.assertEqual(Client.objects.filter(email='Jeff@EpicEvents.com').count(), 1)
+
     def test_has_perm(self):
         # Teste la méthode has_perm
         perm = 'some_permission'
@@ -597,6 +636,103 @@ class TestClientViewSet(TestCase):
         # Vérifie que le texte spécifié est présent dans la réponse
         self.assertIn("You do not have permission to access this client.", response.content.decode())
 
+    def test_client_details_not_found(self):
+        # Test de la vue client_details pour un client inexistant
+        url = '/crm/clients/9999/client_details/'
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}')
+
+        # Vérifie que la réponse a le statut HTTP 404 (Not Found) et non 403 (Forbidden)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_clients_batch_details(self):
+        # Le client2 appartient à sales_user2, l'id 9999 n'existe pas
+        ids = [self.client2.pk, self.client1.pk, 9999]
+        url = f"/crm/clients/batch_details/?ids={','.join(map(str, ids))}&fields=id,full_name"
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data'], [{'id': self.client1.pk, 'full_name': 'Jeff Albertson'}])
+        self.assertEqual(response.data['found_ids'], [self.client1.pk])
+        self.assertEqual(response.data['forbidden_ids'], [self.client2.pk])
+        self.assertEqual(response.data['not_found_ids'], [9999])
+
+        # Le client refusé n'est jamais chargé : la requête des clients filtre sur user_contact
+        self.assertIn('user_contact_id', queries[1]['sql'])
+
+    def test_display_clients(self):
+        # Sortie JSON : une requête bornée par page (id > dernier identifiant), sans instancier les modèles
+        out = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('management_client', '--display_clients', '--format', 'json', '--page_size', '1', stdout=out)
+        self.assertEqual(len(queries), 3)
+        self.assertTrue(all('LIMIT 1' in query['sql'] for query in queries))
+        self.assertIn(f'> {self.client1.id}', queries[1]['sql'])
+        clients = json.loads(out.getvalue())
+        self.assertEqual([client['id'] for client in clients], [self.client1.id, self.client2.id])
+        self.assertEqual(clients[0]['full_name'], 'Jeff Albertson')
+
+        # Sortie TSV paginée par --offset et --limit
+        out = StringIO()
+        call_command('management_client', '--display_clients', '--format', 'tsv', '--offset', '1', '--limit', '1',
+                     stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], 'ID\tNom complet\tEmail\tEntreprise\tContact commercial')
+        self.assertEqual([line.split('\t')[0] for line in lines[1:]], [str(self.client2.id)])
+
+        out = StringIO()
+        call_command('management_client', '--display_clients', '--format', 'json', '--since', '2999-01-01',
+                     stdout=out)
+        self.assertEqual(json.loads(out.getvalue()), [])
+
+        # Tableau rich, affiché page par page
+        with redirect_stdout(StringIO()) as console_out:
+            call_command('management_client', '--display_clients', '--page_size', '1', stdout=StringIO())
+        self.assertIn('Jeff Albertson', console_out.getvalue())
+        self.assertIn('Troy McClure', console_out.getvalue())
+
+    def test_client_overview(self):
+        # Un contrat avec un paiement et un événement avec un contact support
+        contract = Contract.objects.create(client=self.client1, total_amount=1000.0, remaining_amount=1000.0)
+        contract.record_payment(250.0)
+        Event.objects.create(
+            event_name='Gala', contract=contract, client=self.client1, support_contact=self.support_user1
+        )
+
+        url = f'/crm/clients/{self.client1.pk}/overview/'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], self.client1.pk)
+        self.assertEqual(response.data['sales_contact'], self.sales_user1.full_name)
+        self.assertEqual(response.data['contracts'][0]['id'], contract.pk)
+        self.assertEqual(response.data['contracts'][0]['remaining_amount'], 750.0)
+        self.assertEqual(response.data['events'][0]['event_name'], 'Gala')
+        self.assertEqual(response.data['events'][0]['support_contact'], self.support_user1.full_name)
+
+        # Le nombre de requêtes ne dépend pas du nombre de contrats et d'événements du client
+        for index in range(3):
+            other_contract = Contract.objects.create(client=self.client1, total_amount=100.0)
+            Event.objects.create(contract=other_contract, client=self.client1, support_contact=self.support_user1)
+
+        with CaptureQueriesContext(connection) as more_queries:
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}')
+
+        self.assertEqual(len(response.data['contracts']), 4)
+        self.assertEqual(len(response.data['events']), 4)
+        self.assertEqual(len(more_queries), len(queries))
+
+    def test_client_overview_unauthorized_user(self):
+        # Le client2 est associé à sales_user2
+        url = f'/crm/clients/{self.client2.pk}/overview/'
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        url = '/crm/clients/9999/overview/'
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user1}')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_all_clients_details(self):
         # Test la vue all_clients_details
         url = '/crm/clients/all_clients_details/'
@@ -914,6 +1050,21 @@ class TestUserViewSet(TestCase):
         print("Response Data:", response.data)
         # print(json.dumps(response.data, indent=2))
 
+    def test_users_batch_details(self):
+        # Tous les utilisateurs sont accessibles, l'id 9999 n'existe pas
+        ids = [self.support_user.pk, 9999, self.sales_user.pk]
+        url = f"/crm/users/batch_details/?ids={','.join(map(str, ids))}&fields=id,full_name"
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access_token_support}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data'], [
+            {'id': self.support_user.pk, 'full_name': 'Homer Simpson'},
+            {'id': self.sales_user.pk, 'full_name': 'Joe Quimby'},
+        ])
+        self.assertEqual(response.data['found_ids'], [self.support_user.pk, self.sales_user.pk])
+        self.assertEqual(response.data['forbidden_ids'], [])
+        self.assertEqual(response.data['not_found_ids'], [9999])
+
     def test_user_details(self):
         # Crée un jeton d'accès pour support_user
         refresh_support = RefreshToken.for_user(self.support_user)
@@ -1150,3 +1301,57 @@ class TestUserViewSet(TestCase):
 
         # Vérifie que le texte spécifié est présent dans la réponse
         self.assertIn("You do not have permission to delete this user.", response.content.decode())
+
+
+@pytest.mark.django_db
+class TestMiddlewareStack(TestCase):
+    """
+        Classe de tests pour l'aiguillage des middlewares selon le chemin (PathDispatchMiddleware).
+    """
+
+    def setUp(self):
+        """
+            Mets en place les données nécessaires pour les tests.
+        """
+        self.sales_user = User.objects.create_user(
+            email='Joe@EpicEvents-Sales.com',
+            password='Pingou123',
+            role=User.ROLE_SALES,
+            full_name='Joe Quimby',
+            phone_number='+456789123',
+            is_staff=True,
+        )
+        self.access_token_sales = str(RefreshToken.for_user(self.sales_user).access_token)
+
+        # Client de test appliquant les vérifications CSRF comme un navigateur
+        self.csrf_client = DjangoTestClient(enforce_csrf_checks=True)
+
+    def test_api_request_uses_lean_stack(self):
+        # Une écriture sur l'API avec un jeton JWT n'est soumise ni au CSRF, ni aux sessions
+        response = self.csrf_client.post(
+            '/crm/clients/',
+            data={
+                'email': 'Ned@EpicEvents.com',
+                'full_name': 'Ned Flanders',
+                'phone_number': '+987654321',
+                'company_name': 'Flanders & Co'
+            },
+            HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales}'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(response.has_header('X-Frame-Options'))
+        self.assertNotIn('sessionid', response.cookies)
+
+    def test_admin_request_uses_browser_stack(self):
+        # L'administration conserve sessions, CSRF et protection contre l'intégration dans un cadre
+        response = self.csrf_client.get('/admin/login/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+        self.assertIn('csrftoken', response.cookies)
+
+        # Une connexion sans jeton CSRF est refusée
+        response = self.csrf_client.post(
+            '/admin/login/', data={'username': 'Joe@EpicEvents-Sales.com', 'password': 'Pingou123'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,8 +1,9 @@
 import sentry_sdk
 from sentry_sdk import capture_exception
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponseForbidden
 from django.contrib.auth import authenticate, login
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
@@ -18,9 +19,79 @@ from .serializers import (
     UserLoginSerializer,
     ClientListSerializer,
     ClientDetailSerializer,
+    ClientOverviewSerializer,
     UserListSerializer,
     UserDetailSerializer
 )
+from EpicEvents.serializers import SparseFieldsetViewMixin
+
+
+class BatchDetailsMixin:
+    """
+        Mixin de ViewSet ajoutant l'action 'batch_details' : récupération de plusieurs objets
+        par leurs identifiants (?ids=1,2,3) en une seule requête id__in.
+
+        Réutilise le sérialiseur (details_serializer_class) et la règle de propriété (details_owner_field)
+        de l'action '<ressource>_details' de SparseFieldsetViewMixin. Le filtre de propriété est appliqué
+        dans la requête : seuls les objets autorisés sont chargés. Les identifiants non renvoyés sont
+        ensuite répartis entre forbidden_ids et not_found_ids par une requête sur les seules clés primaires.
+
+        Attributs:
+            batch_max_ids: Nombre maximal d'identifiants par requête.
+    """
+    batch_max_ids = 100
+
+    def get_batch_ids(self, request):
+        """
+            Renvoie la liste (sans doublon, dans l'ordre de la requête) des identifiants du paramètre ?ids=.
+            Lève une ValidationError si la liste est vide, invalide ou trop longue.
+        """
+        raw_ids = [value.strip() for value in request.query_params.get('ids', '').split(',') if value.strip()]
+        if not raw_ids:
+            raise ValidationError({'ids': "The ids parameter is required (e.g. ?ids=1,2,3)."})
+
+        try:
+            ids = list(dict.fromkeys(int(value) for value in raw_ids))
+        except ValueError:
+            raise ValidationError({'ids': "Ids must be integers."})
+
+        if len(ids) > self.batch_max_ids:
+            raise ValidationError({'ids': f"At most {self.batch_max_ids} ids can be requested at once."})
+        return ids
+
+    @action(detail=False, methods=['GET'])
+    def batch_details(self, request):
+        """Renvoie les détails des objets demandés (?ids=1,2,3) et les identifiants refusés ou introuvables."""
+        ids = self.get_batch_ids(request)
+        serializer_class = self.details_serializer_class
+        fields = serializer_class.get_sparse_fields(request)
+
+        queryset = self.get_queryset().filter(pk__in=ids)
+        owned_queryset = queryset
+        if self.details_owner_field:
+            # Les objets d'autres utilisateurs ne sont jamais chargés
+            owned_queryset = queryset.filter(**{self.details_owner_field: request.user})
+        objects = {obj.pk: obj for obj in serializer_class.get_sparse_queryset(owned_queryset, fields)}
+
+        missing_ids = [pk for pk in ids if pk not in objects]
+        # Parmi les identifiants non renvoyés, seule l'existence est vérifiée (clés primaires uniquement)
+        existing_ids = set(queryset.filter(pk__in=missing_ids).values_list('pk', flat=True)) if missing_ids else set()
+
+        allowed = [objects[pk] for pk in ids if pk in objects]
+        forbidden_ids = [pk for pk in missing_ids if pk in existing_ids]
+        not_found_ids = [pk for pk in missing_ids if pk not in existing_ids]
+
+        if forbidden_ids:
+            # Capture l'exception et envoie une alerte à Sentry
+            capture_exception(Exception("Unauthorized access to batch_details"))
+
+        serializer = serializer_class(allowed, many=True, fields=fields)
+        return Response({
+            "data": serializer.data,
+            "found_ids": [obj.pk for obj in allowed],
+            "forbidden_ids": forbidden_ids,
+            "not_found_ids": not_found_ids,
+        })
 
 
 @method_decorator(csrf_protect, name='dispatch')
@@ -56,8 +127,7 @@ class LoginViewSet(generics.CreateAPIView):
             return Response({"detail": "Invalid credentials or account inactive"}, status=400)
 
 
-@method_decorator(csrf_protect, name='dispatch')
-class ClientViewSet(MultipleSerializerMixin, ModelViewSet):
+class ClientViewSet(BatchDetailsMixin, SparseFieldsetViewMixin, MultipleSerializerMixin, ModelViewSet):
     """ViewSet pour gérer les opérations CRUD sur les objets Client (CRM)."""
 
     def __init__(self, *args, **kwargs):
@@ -85,6 +155,11 @@ class ClientViewSet(MultipleSerializerMixin, ModelViewSet):
         'update': ClientDetailSerializer
     }
 
+    # client_details et batch_details : seuls les clients de l'utilisateur sont chargés
+    details_action = 'client_details'
+    details_serializer_class = ClientDetailSerializer
+    details_owner_field = 'user_contact'
+
     client_permissions = None
 
     def initialize_client_permissions(self):
@@ -98,33 +173,70 @@ class ClientViewSet(MultipleSerializerMixin, ModelViewSet):
         """
         return self.serializers.get(self.action, self.serializer_class)
 
+    def get_queryset(self):
+        """
+            Retourne le queryset en fonction de l'action de la vue.
+            Pour l'action 'overview', le filtre de propriété (user_contact) est appliqué directement
+            dans la requête et les contrats et événements des clients sont préchargés.
+        """
+        queryset = super().get_queryset()
+        if self.action == 'overview':
+            queryset = ClientOverviewSerializer.get_overview_queryset(queryset.filter(user_contact=self.request.user))
+        return queryset
+
     @action(detail=False, methods=['GET'])
     def clients_list(self, request):
         """Renvoie tous les clients associé à l'utilisateur."""
         clients = Client.objects.filter(user_contact=request.user)
-        serializer = ClientDetailSerializer(clients, many=True)
+        serializer = ClientDetailSerializer.from_request(request, clients)
         return Response(serializer.data)
 
     @action(detail=True, methods=['GET'])
     def client_details(self, request, pk=None):
         """Renvoie les détails d'un client spécifique associé à l'utilisateur."""
-        client = self.get_object()
+        try:
+            # Le queryset est déjà filtré sur le client de l'utilisateur actuellement authentifié
+            client = self.get_object()
+        except Http404:
+            # Distingue un client inexistant (404) d'un client appartenant à un autre utilisateur (403)
+            if not Client.objects.filter(pk=pk).exists():
+                raise
 
-        # Vérifie si le client appartient à l'utilisateur actuellement authentifié
-        if client.user_contact != request.user:
             # Capture l'exception et envoie une alerte à Sentry
             capture_exception(Exception("Unauthorized access to client_details"))
 
             return HttpResponseForbidden("You do not have permission to access this client.")
 
-        serializer = ClientDetailSerializer(client)
+        serializer = ClientDetailSerializer(client, fields=ClientDetailSerializer.get_sparse_fields(request))
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['GET'])
+    def overview(self, request, pk=None):
+        """
+            Renvoie la vue d'ensemble d'un client associé à l'utilisateur :
+            ses détails, ses contrats et ses événements (avec leur contact support), en une seule réponse.
+        """
+        try:
+            # Le queryset est filtré sur les clients de l'utilisateur et précharge contrats et événements
+            client = self.get_object()
+        except Http404:
+            # Distingue un client inexistant (404) d'un client appartenant à un autre utilisateur (403)
+            if not Client.objects.filter(pk=pk).exists():
+                raise
+
+            # Capture l'exception et envoie une alerte à Sentry
+            capture_exception(Exception("Unauthorized access to overview"))
+
+            return HttpResponseForbidden("You do not have permission to access this client.")
+
+        serializer = ClientOverviewSerializer(client)
         return Response(serializer.data)
 
     @action(detail=False, methods=['GET'])
     def all_clients_details(self, request):
         """Renvoie les détails de tous les clients."""
         clients = Client.objects.all()
-        serializer = ClientDetailSerializer(clients, many=True)
+        serializer = ClientDetailSerializer.from_request(request, clients)
         return Response(serializer.data)
 
     def create(self, request, *args, **kwargs):
@@ -171,8 +283,7 @@ class ClientViewSet(MultipleSerializerMixin, ModelViewSet):
         return Response({"message": success_message}, status=204)
 
 
-@method_decorator(csrf_protect, name='dispatch')
-class UserViewSet(MultipleSerializerMixin, ModelViewSet):
+class UserViewSet(BatchDetailsMixin, SparseFieldsetViewMixin, MultipleSerializerMixin, ModelViewSet):
     """ViewSet pour gérer les opérations CRUD sur les objets Utilisateur (CRM)."""
 
     def __init__(self, *args, **kwargs):
@@ -200,6 +311,10 @@ class UserViewSet(MultipleSerializerMixin, ModelViewSet):
         'update': UserDetailSerializer,
     }
 
+    # user_details et batch_details : tous les utilisateurs sont accessibles
+    details_action = 'user_details'
+    details_serializer_class = UserDetailSerializer
+
     user_permissions = None
 
     def initialize_user_permissions(self):
@@ -217,21 +332,21 @@ class UserViewSet(MultipleSerializerMixin, ModelViewSet):
     def users_list(self, request):
         """Renvoie tous les utilisateurs."""
         users = User.objects.all()
-        serializer = UserListSerializer(users, many=True)
+        serializer = UserListSerializer.from_request(request, users)
         return Response(serializer.data)
 
     @action(detail=True, methods=['GET'])
     def user_details(self, request, pk=None):
         """Renvoie les détails d'un utilisateur spécifique."""
         user = self.get_object()
-        serializer = UserDetailSerializer(user)
+        serializer = UserDetailSerializer(user, fields=UserDetailSerializer.get_sparse_fields(request))
         return Response(serializer.data)
 
     @action(detail=False, methods=['GET'])
     def all_users_details(self, request):
         """Renvoie les détails de tous les utilisateurs."""
         users = User.objects.all()
-        serializer = UserDetailSerializer(users, many=True)
+        serializer = UserDetailSerializer.from_request(request, users)
         return Response(serializer.data)
 
     def create(self, request, *args, **kwargs):
@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import SearchToken
+
+
+class SearchTokenAdmin(admin.ModelAdmin):
+    """
+        Personnalisation de l'interface d'administration pour le modèle SearchToken.
+        Affiche les entrées de l'index inversé utilisé par la recherche (crm/search/).
+    """
+
+    list_display = ('token', 'resource', 'object_id', 'weight')
+    list_filter = ('resource',)
+    ordering = ('token',)
+
+
+# Enregistre la classe SearchTokenAdmin avec le modèle SearchToken
+admin.site.register(SearchToken, SearchTokenAdmin)
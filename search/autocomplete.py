@@ -0,0 +1,391 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import islice
+from django.conf import settings
+from django.db import connection
+from sentry_sdk import capture_exception
+
+from profiles.models import User, Client
+from .text import MAX_TOKEN_LENGTH, normalize_text, split_words
+
+
+# Périmètres de l'autocomplétion : clients, et utilisateurs par rôle
+AUTOCOMPLETE_SCOPES = {
+    'clients': None,
+    'sales': User.ROLE_SALES,
+    'support': User.ROLE_SUPPORT,
+    'management': User.ROLE_MANAGEMENT,
+}
+
+
+# Trigrammes plus fréquents que ce nombre de noms : ignorés lors de la recherche des candidats (mots vides)
+MAX_TRIGRAM_POSTINGS = 500
+
+# Nombre maximal de candidats dont la similarité est calculée par une recherche approximative
+MAX_TRIGRAM_CANDIDATES = 200
+
+
+def get_user_scope(role):
+    """Renvoie le périmètre d'autocomplétion correspondant au rôle d'un utilisateur, ou None."""
+    for scope, scope_role in AUTOCOMPLETE_SCOPES.items():
+        if scope_role is not None and scope_role == role:
+            return scope
+    return None
+
+
+def normalize_prefix(text):
+    """Renvoie le préfixe recherché sous sa forme indexée (mots normalisés séparés par une espace)."""
+    prefix = ' '.join(split_words(text))
+    # Conserve l'espace finale : « ned » complète « ned », « ned » suivi d'une espace ne complète que le mot suivant
+    if prefix and normalize_text(text)[-1:].isspace():
+        prefix += ' '
+    return prefix
+
+
+class PrefixIndex:
+    """
+        Index de préfixes en mémoire : liste triée de couples (clé, id) interrogée par dichotomie (bisect).
+
+        Chaque valeur est indexée à partir du début de chacun de ses mots, afin que « fla »
+        trouve « Ned Flanders ». Une recherche coûte O(log n) plus le nombre de clés parcourues.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.entries = {}
+
+    @staticmethod
+    def get_keys(values):
+        """Renvoie les clés d'une valeur : la suite de ses mots à partir de chaque mot."""
+        keys = set()
+        for value in values:
+            words = split_words(value)
+            for index in range(len(words)):
+                keys.add(' '.join(words[index:]))
+        return keys
+
+    def build(self, items):
+        """Construit l'index à partir d'une liste de (id, valeurs indexées, données renvoyées)."""
+        self.entries = {}
+        for object_id, values, data in items:
+            self.entries[object_id] = (self.get_keys(values), data)
+        self.keys = sorted((key, object_id) for object_id, (keys, data) in self.entries.items() for key in keys)
+
+    def add(self, object_id, values, data):
+        """Ajoute ou remplace un objet dans l'index."""
+        self.remove(object_id)
+        keys = self.get_keys(values)
+        for key in keys:
+            insort(self.keys, (key, object_id))
+        self.entries[object_id] = (keys, data)
+
+    def remove(self, object_id):
+        """Retire un objet de l'index, s'il y est présent."""
+        entry = self.entries.pop(object_id, None)
+        if entry is None:
+            return
+        for key in entry[0]:
+            position = bisect_left(self.keys, (key, object_id))
+            if position < len(self.keys) and self.keys[position] == (key, object_id):
+                del self.keys[position]
+
+    def lookup(self, prefix, limit):
+        """Renvoie les données des objets (au plus limit) dont une clé commence par le préfixe."""
+        results, seen = [], set()
+        position = bisect_left(self.keys, (prefix,))
+        while position < len(self.keys) and len(results) < limit:
+            key, object_id = self.keys[position]
+            if not key.startswith(prefix):
+                break
+            if object_id not in seen:
+                seen.add(object_id)
+                results.append(self.entries[object_id][1])
+            position += 1
+        return results
+
+
+def get_trigrams(text):
+    """
+        Renvoie l'ensemble des trigrammes du texte normalisé (tronqué), complété par deux espaces au début
+        et une à la fin afin que les débuts et fins de nom pèsent dans la similarité.
+    """
+    words = split_words(text)
+    if not words:
+        return set()
+    padded = f"  {' '.join(words)[:MAX_TOKEN_LENGTH * 2]} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+        Index de trigrammes en mémoire : pour chaque trigramme, l'ensemble des objets dont le nom le contient.
+
+        La similarité entre deux noms est le rapport entre le nombre de trigrammes communs et
+        le nombre de trigrammes distincts des deux noms (indice de Jaccard, comme pg_trgm).
+        Les candidats sont les objets partageant le plus de trigrammes peu fréquents avec le nom recherché :
+        les trigrammes présents dans plus de MAX_TRIGRAM_POSTINGS noms sont ignorés, et seuls les
+        MAX_TRIGRAM_CANDIDATES meilleurs candidats sont évalués. Le coût ne croît pas avec le nombre de noms.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.trigrams = {}
+
+    def build(self, items):
+        """Construit l'index à partir d'une liste de (id, nom)."""
+        self.postings = {}
+        self.trigrams = {}
+        for object_id, name in items:
+            self.add(object_id, name)
+
+    def add(self, object_id, name):
+        """Ajoute ou remplace un objet dans l'index."""
+        self.remove(object_id)
+        trigrams = get_trigrams(name)
+        self.trigrams[object_id] = trigrams
+        for trigram in trigrams:
+            self.postings.setdefault(trigram, set()).add(object_id)
+
+    def remove(self, object_id):
+        """Retire un objet de l'index, s'il y est présent."""
+        for trigram in self.trigrams.pop(object_id, ()):
+            posting = self.postings[trigram]
+            posting.discard(object_id)
+            if not posting:
+                del self.postings[trigram]
+
+    def nearest(self, name, limit, min_similarity):
+        """Renvoie au plus limit couples (similarité, id), les plus similaires d'abord."""
+        query = get_trigrams(name)
+        hits = Counter()
+        # Trigrammes du plus rare au plus fréquent ; si tous sont trop fréquents, seul le plus rare est lu (tronqué)
+        for posting in sorted((self.postings.get(trigram, ()) for trigram in query), key=len):
+            if len(posting) > MAX_TRIGRAM_POSTINGS:
+                if not hits:
+                    hits.update(islice(posting, MAX_TRIGRAM_POSTINGS))
+                break
+            hits.update(posting)
+
+        scored = (
+            (count / (len(query) + len(self.trigrams[object_id]) - count), object_id)
+            for object_id, count in (
+                (object_id, len(query & self.trigrams[object_id]))
+                for object_id, _ in hits.most_common(MAX_TRIGRAM_CANDIDATES)
+            )
+        )
+        return heapq.nlargest(limit, (match for match in scored if match[0] >= min_similarity))
+
+
+class AutocompleteIndex:
+    """
+        Index d'autocomplétion des noms de clients (full_name, company_name) et d'utilisateurs (full_name, par rôle).
+        Un index de trigrammes des noms complets (full_name) sert à la résolution approximative des noms.
+
+        L'index est construit au démarrage du serveur par un fil d'arrière-plan (start_refresh), puis tenu à jour
+        par les signaux de sauvegarde et de suppression après la validation de la transaction :
+        les recherches ne font aucune requête en base de données.
+        Les modifications effectuées par un autre processus sont prises en compte par la reconstruction complète
+        que ce même fil effectue toutes les AUTOCOMPLETE_REFRESH_SECONDS secondes, hors du chemin des requêtes.
+
+        Une seule reconstruction a lieu à la fois (build_lock). Les modifications reçues pendant la lecture
+        des données sont mises en attente puis rejouées sur le nouvel index, juste après l'échange.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.scopes = None
+        self.trigrams = None
+        self.built_at = None
+        self.pending = None
+        self.refresh_thread = None
+
+    def is_built(self):
+        """Indique si l'index a été construit dans ce processus."""
+        return self.scopes is not None
+
+    def ensure_built(self):
+        """
+            Construit l'index s'il ne l'a jamais été (démarrage du fil d'arrière-plan non terminé ou absent).
+            Les appels concurrents attendent la construction en cours au lieu d'en lancer une autre.
+        """
+        if self.is_built():
+            return
+        with self.build_lock:
+            if not self.is_built():
+                self.build()
+
+    def rebuild(self):
+        """Reconstruit l'index, sauf si une reconstruction est déjà en cours dans un autre fil."""
+        if not self.build_lock.acquire(blocking=False):
+            return
+        try:
+            self.build()
+        finally:
+            self.build_lock.release()
+
+    def build(self):
+        """
+            Construit l'index à partir des clients et des utilisateurs actifs (une requête par modèle),
+            puis l'échange avec l'index courant. Doit être appelée sous build_lock.
+        """
+        with self.lock:
+            self.pending = []
+
+        try:
+            items = {scope: [] for scope in AUTOCOMPLETE_SCOPES}
+            for client_id, full_name, company_name in Client.objects.values_list('id', 'full_name', 'company_name'):
+                items['clients'].append(self.get_client_item(client_id, full_name, company_name))
+
+            users = User.objects.filter(is_active=True).values_list('id', 'full_name', 'role')
+            for user_id, full_name, role in users:
+                scope = get_user_scope(role)
+                if scope is not None:
+                    items[scope].append(self.get_user_item(user_id, full_name, role))
+
+            scopes, trigrams = {}, {}
+            for scope, scope_items in items.items():
+                scopes[scope] = PrefixIndex()
+                scopes[scope].build(scope_items)
+                trigrams[scope] = TrigramIndex()
+                trigrams[scope].build((object_id, data['full_name']) for object_id, values, data in scope_items)
+        except Exception:
+            with self.lock:
+                self.pending = None
+            raise
+
+        with self.lock:
+            self.scopes = scopes
+            self.trigrams = trigrams
+            self.built_at = time.monotonic()
+            # Rejoue les modifications validées pendant la lecture : elles peuvent manquer aux données lues
+            for method, args in self.pending:
+                method(*args)
+            self.pending = None
+
+    def start_refresh(self):
+        """
+            Démarre, une seule fois par processus, le fil d'arrière-plan qui construit l'index
+            puis le reconstruit toutes les AUTOCOMPLETE_REFRESH_SECONDS secondes.
+        """
+        with self.lock:
+            if self.refresh_thread is not None:
+                return
+            self.refresh_thread = threading.Thread(
+                target=self.refresh_forever, name='autocomplete-refresh', daemon=True
+            )
+        self.refresh_thread.start()
+
+    def refresh_forever(self):
+        """Boucle du fil d'arrière-plan : construction initiale, puis reconstruction périodique."""
+        refresh_seconds = getattr(settings, 'AUTOCOMPLETE_REFRESH_SECONDS', 300)
+        while True:
+            if self.is_built():
+                time.sleep(refresh_seconds)
+            try:
+                self.rebuild()
+            except Exception as e:
+                # Capture l'exception et envoie une alerte à Sentry, l'index courant reste utilisé
+                capture_exception(e)
+                if not self.is_built():
+                    time.sleep(refresh_seconds)
+            finally:
+                # La connexion de ce fil n'est pas gérée par le cycle des requêtes
+                connection.close()
+
+    def reset(self):
+        """Vide l'index : il sera reconstruit lors de la prochaine recherche."""
+        with self.lock:
+            self.scopes = None
+            self.trigrams = None
+            self.built_at = None
+
+    def apply(self, method, *args):
+        """
+            Applique une modification à l'index s'il est construit, et la met en attente
+            si une construction est en cours afin de la rejouer sur le nouvel index.
+        """
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append((method, args))
+            if self.scopes is not None:
+                method(*args)
+
+    @staticmethod
+    def get_client_item(client_id, full_name, company_name):
+        """Renvoie l'entrée de l'index d'un client."""
+        return client_id, [full_name, company_name], {
+            'id': client_id, 'full_name': full_name, 'company_name': company_name
+        }
+
+    @staticmethod
+    def get_user_item(user_id, full_name, role):
+        """Renvoie l'entrée de l'index d'un utilisateur."""
+        return user_id, [full_name], {'id': user_id, 'full_name': full_name, 'role': role}
+
+    def lookup(self, scope, query, limit=10):
+        """Renvoie les objets du périmètre dont un mot du nom commence par le texte saisi."""
+        self.ensure_built()
+        prefix = normalize_prefix(query)
+        if not prefix:
+            return []
+        with self.lock:
+            if self.scopes is None:
+                return []
+            return self.scopes[scope].lookup(prefix, limit)
+
+    def nearest(self, scope, name, limit=3, min_similarity=0.3):
+        """
+            Renvoie les objets du périmètre dont le nom complet est le plus proche du nom donné,
+            sous la forme d'une liste de (similarité, données), les plus similaires d'abord.
+
+            Utilisée sur le chemin des écritures : l'index n'est jamais construit ici.
+            Renvoie None si l'index n'est pas encore construit (fil d'arrière-plan non terminé).
+        """
+        with self.lock:
+            if self.trigrams is None:
+                return None
+            matches = self.trigrams[scope].nearest(name, limit, min_similarity)
+            return [(similarity, self.scopes[scope].entries[object_id][1]) for similarity, object_id in matches]
+
+    def update_client(self, client_id, full_name, company_name):
+        """Ajoute ou met à jour un client dans l'index, s'il est construit."""
+        self.apply(self.apply_update_client, client_id, full_name, company_name)
+
+    def update_user(self, user_id, full_name, role, is_active=True):
+        """Ajoute, déplace (changement de rôle) ou retire un utilisateur de l'index, s'il est construit."""
+        self.apply(self.apply_update_user, user_id, full_name, role, is_active)
+
+    def remove(self, scope, object_id):
+        """Retire un objet de l'index (tous les périmètres d'utilisateurs pour scope='users')."""
+        self.apply(self.apply_remove, scope, object_id)
+
+    def apply_update_client(self, client_id, full_name, company_name):
+        """Ajoute ou met à jour un client dans l'index courant (appelée sous self.lock)."""
+        self.scopes['clients'].add(*self.get_client_item(client_id, full_name, company_name))
+        self.trigrams['clients'].add(client_id, full_name)
+
+    def apply_update_user(self, user_id, full_name, role, is_active):
+        """Ajoute, déplace ou retire un utilisateur de l'index courant (appelée sous self.lock)."""
+        scope = get_user_scope(role) if is_active else None
+        for name, index in self.scopes.items():
+            if name == scope:
+                index.add(*self.get_user_item(user_id, full_name, role))
+                self.trigrams[name].add(user_id, full_name)
+            elif name != 'clients':
+                index.remove(user_id)
+                self.trigrams[name].remove(user_id)
+
+    def apply_remove(self, scope, object_id):
+        """Retire un objet de l'index courant (appelée sous self.lock)."""
+        for name, index in self.scopes.items():
+            if name == scope or (scope == 'users' and name != 'clients'):
+                index.remove(object_id)
+                self.trigrams[name].remove(object_id)
+
+
+# Index partagé par les requêtes du processus
+autocomplete_index = AutocompleteIndex()
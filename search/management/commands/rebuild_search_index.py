@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rich.console import Console
+from rich.table import Table
+
+from search.models import SEARCH_RESOURCES, SearchToken, index_object
+
+
+class Command(BaseCommand):
+    """
+        Cette commande reconstruit l'index de recherche à partir des clients, des événements et des utilisateurs.
+        Elle est à lancer après le déploiement de l'index, ou après des modifications effectuées
+        sans passer par save() (par exemple des mises à jour groupées par queryset.update()).
+    """
+    help = 'Reconstruire l\'index de recherche'
+
+    def add_arguments(self, parser):
+        """
+            Ajoute les arguments spécifiques à la commande.
+            Args:
+                parser (argparse.ArgumentParser): Le parseur d'arguments.
+        """
+        parser.add_argument(
+            '--resource', choices=list(SEARCH_RESOURCES), action='append',
+            help='Ressource à réindexer (toutes par défaut, option répétable)'
+        )
+        parser.add_argument('--chunk_size', type=int, default=500, help='Nombre d\'objets lus par requête')
+
+    def handle(self, *args, **options):
+        """
+            Gère l'exécution de la commande et affiche le nombre d'objets et de mots indexés par ressource.
+        """
+        console = Console()
+        resources = options['resource'] or list(SEARCH_RESOURCES)
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Ressource", style="cyan")
+        table.add_column("Objets indexés", style="cyan")
+        table.add_column("Mots indexés", style="cyan")
+
+        for resource in resources:
+            config = SEARCH_RESOURCES[resource]
+            fields = ['pk', *config['fields']]
+
+            with transaction.atomic():
+                SearchToken.objects.filter(resource=resource).delete()
+                count = 0
+                for instance in config['model'].objects.only(*fields).iterator(chunk_size=options['chunk_size']):
+                    index_object(resource, instance)
+                    count += 1
+
+            table.add_row(resource, str(count), str(SearchToken.objects.filter(resource=resource).count()))
+
+        console.print("[bold magenta]Index de recherche reconstruit[/bold magenta]")
+        console.print(table)
@@ -0,0 +1,209 @@
+from functools import reduce
+from operator import or_
+from django.db import models, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from events.models import Event
+from profiles.models import User, Client
+from .autocomplete import autocomplete_index
+from .text import MAX_TOKEN_LENGTH, tokenize
+
+
+# Nombre maximal de mots pris en compte dans une recherche
+MAX_QUERY_TOKENS = 8
+
+# Nombre maximal d'entrées de l'index lues par mot : borne le nombre d'objets candidats d'une recherche
+MAX_TOKEN_POSTINGS = 1000
+
+
+# Ressources indexées : modèle, champs indexés avec leur poids, champ servant de libellé
+SEARCH_RESOURCES = {
+    'clients': {
+        'model': Client,
+        'fields': {'full_name': 3, 'company_name': 2, 'email': 2},
+        'label': 'full_name',
+    },
+    'events': {
+        'model': Event,
+        'fields': {'event_name': 3, 'location': 1, 'notes': 1},
+        'label': 'event_name',
+    },
+    'users': {
+        'model': User,
+        'fields': {'full_name': 3, 'email': 2},
+        'label': 'full_name',
+    },
+}
+
+
+def get_resource_name(model):
+    """Renvoie le nom de la ressource indexée correspondant au modèle, ou None."""
+    for resource, config in SEARCH_RESOURCES.items():
+        if config['model'] is model:
+            return resource
+    return None
+
+
+class SearchToken(models.Model):
+    """
+        Modèle représentant une entrée de l'index inversé de recherche.
+
+        Chaque ligne associe un mot à un objet indexé. Le poids est la somme des poids
+        des champs de l'objet contenant ce mot (un nom pèse plus qu'une note).
+
+        Champs:
+            resource: Ressource de l'objet ('clients', 'events' ou 'users').
+            object_id: Identifiant de l'objet.
+            token: Mot normalisé (minuscules, sans accents).
+            weight: Poids du mot pour l'objet, utilisé pour le classement des résultats.
+
+        La recherche d'un mot est une égalité sur la colonne indexée token :
+        elle ne parcourt jamais la table, contrairement à un icontains.
+    """
+    resource = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    token = models.CharField(max_length=MAX_TOKEN_LENGTH)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['resource', 'object_id', 'token'], name='unique_search_token'),
+        ]
+        indexes = [
+            models.Index(fields=['token', 'resource'], name='search_token_idx'),
+        ]
+
+    def __str__(self):
+        """Renvoie une représentation lisible de l'instance de SearchToken."""
+        return f"{self.token} -> {self.resource} {self.object_id} ({self.weight})"
+
+
+def index_object(resource, instance):
+    """Remplace les entrées de l'index de l'objet par celles calculées à partir de ses champs actuels."""
+    weights = {}
+    for field, weight in SEARCH_RESOURCES[resource]['fields'].items():
+        for token in set(tokenize(getattr(instance, field))):
+            weights[token] = weights.get(token, 0) + weight
+
+    SearchToken.objects.filter(resource=resource, object_id=instance.pk).delete()
+    SearchToken.objects.bulk_create([
+        SearchToken(resource=resource, object_id=instance.pk, token=token, weight=weight)
+        for token, weight in weights.items()
+    ])
+
+
+def search(query, limit=20, resources=None, visible=None):
+    """
+        Recherche les objets contenant tous les mots de la requête.
+
+        Args:
+            query: Texte recherché (seuls les MAX_QUERY_TOKENS premiers mots sont pris en compte).
+            limit: Nombre maximal de résultats.
+            resources: Ressources interrogées (toutes par défaut).
+            visible: Dictionnaire {ressource: queryset} restreignant les objets visibles d'une ressource.
+
+        Renvoie une liste de dictionnaires {'resource', 'object_id', 'score'} classée par score décroissant.
+
+        Les objets candidats sont ceux du mot le plus rare de la requête (un objet doit contenir tous les mots) :
+        au plus MAX_TOKEN_POSTINGS entrées de l'index sont lues par mot pour estimer la fréquence des mots,
+        puis au plus MAX_TOKEN_POSTINGS candidats sont classés. Si même le mot le plus rare est plus fréquent,
+        seule une partie de ses objets est classée : le coût d'une recherche ne dépend pas de la taille de l'index.
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TOKENS]
+    if not tokens:
+        return []
+
+    postings = SearchToken.objects.all()
+    if resources is not None:
+        postings = postings.filter(resource__in=resources)
+    for resource, queryset in (visible or {}).items():
+        postings = postings.filter(~Q(resource=resource) | Q(object_id__in=queryset.values('pk')))
+
+    # Fréquence bornée de chaque mot (une requête COUNT sur au plus MAX_TOKEN_POSTINGS + 1 entrées par mot)
+    rarest = tokens[0]
+    if len(tokens) > 1:
+        frequencies = {token: postings.filter(token=token)[:MAX_TOKEN_POSTINGS + 1].count() for token in tokens}
+        rarest = min(tokens, key=frequencies.get)
+        if not frequencies[rarest]:
+            return []
+
+    candidates = {}
+    for resource, object_id in postings.filter(token=rarest).values_list('resource', 'object_id')[
+        :MAX_TOKEN_POSTINGS
+    ]:
+        candidates.setdefault(resource, []).append(object_id)
+    if not candidates:
+        return []
+
+    matches = postings.filter(token__in=tokens).filter(reduce(or_, (
+        Q(resource=resource, object_id__in=object_ids) for resource, object_ids in candidates.items()
+    )))
+    return list(
+        matches.values('resource', 'object_id')
+        .annotate(score=Sum('weight'), matched=Count('id'))
+        .filter(matched=len(tokens))
+        .order_by('-score', 'resource', 'object_id')
+        .values('resource', 'object_id', 'score')[:limit]
+    )
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=User)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    """
+        Fonction de réception appelée après la sauvegarde d'un client, d'un événement ou d'un utilisateur.
+        Met à jour l'index de recherche, sauf si aucun champ indexé n'a été sauvegardé
+        (par exemple la date de dernière connexion d'un utilisateur).
+    """
+    resource = get_resource_name(sender)
+    if update_fields is not None and not set(update_fields) & set(SEARCH_RESOURCES[resource]['fields']):
+        return
+    index_object(resource, instance)
+
+
+@receiver(post_delete, sender=Client)
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=User)
+def remove_from_search_index(sender, instance, **kwargs):
+    """
+        Fonction de réception appelée après la suppression d'un client, d'un événement ou d'un utilisateur.
+        Retire l'objet de l'index de recherche.
+    """
+    SearchToken.objects.filter(resource=get_resource_name(sender), object_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Client)
+def update_client_autocomplete(sender, instance, **kwargs):
+    """
+        Fonction de réception appelée après la sauvegarde d'un client.
+        Met à jour l'index d'autocomplétion en mémoire une fois la transaction validée.
+    """
+    values = (instance.pk, instance.full_name, instance.company_name)
+    transaction.on_commit(lambda: autocomplete_index.update_client(*values))
+
+
+@receiver(post_save, sender=User)
+def update_user_autocomplete(sender, instance, update_fields=None, **kwargs):
+    """
+        Fonction de réception appelée après la sauvegarde d'un utilisateur.
+        Met à jour l'index d'autocomplétion en mémoire une fois la transaction validée,
+        sauf si ni le nom, ni le rôle, ni l'activation du compte n'ont été sauvegardés.
+    """
+    if update_fields is not None and not set(update_fields) & {'full_name', 'role', 'is_active'}:
+        return
+    values = (instance.pk, instance.full_name, instance.role, instance.is_active)
+    transaction.on_commit(lambda: autocomplete_index.update_user(*values))
+
+
+@receiver(post_delete, sender=Client)
+@receiver(post_delete, sender=User)
+def remove_from_autocomplete(sender, instance, **kwargs):
+    """
+        Fonction de réception appelée après la suppression d'un client ou d'un utilisateur.
+        Retire l'objet de l'index d'autocomplétion en mémoire une fois la transaction validée.
+    """
+    scope, object_id = get_resource_name(sender), instance.pk
+    transaction.on_commit(lambda: autocomplete_index.remove(scope, object_id))
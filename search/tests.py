@@ -0,0 +1,314 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .autocomplete import MAX_TRIGRAM_POSTINGS, AutocompleteIndex, TrigramIndex, autocomplete_index
+from .models import MAX_TOKEN_POSTINGS, SearchToken, search, tokenize
+from events.models import Event
+from profiles.models import User, Client
+
+
+@pytest.mark.django_db
+class TestSearchView(TestCase):
+    """
+        Classe de tests pour la recherche plein texte (SearchView) et son index inversé.
+    """
+    url = '/crm/search/'
+
+    def create_user(self, email, role, full_name, phone_number, is_staff=True):
+        """
+            Crée et retourne un utilisateur avec les paramètres spécifiés.
+        """
+        return User.objects.create_user(
+            email=email,
+            password='Pingou123',
+            role=role,
+            full_name=full_name,
+            phone_number=phone_number,
+            is_staff=is_staff,
+        )
+
+    def create_client(self, email, full_name, phone_number, company_name):
+        """
+            Crée et retourne un client avec les paramètres spécifiés.
+        """
+        return Client.objects.create(
+            email=email,
+            full_name=full_name,
+            phone_number=phone_number,
+            company_name=company_name,
+        )
+
+    def setUp(self):
+        """
+            Mets en place les données nécessaires pour les tests.
+        """
+        self.sales_user = self.create_user(
+            email='Timothy@EpicEvents-Sales.com',
+            role=User.ROLE_SALES,
+            full_name='Timothy Lovejoy',
+            phone_number='+345678912',
+        )
+
+        self.support_user = self.create_user(
+            email='Homer@EpicEvents-Support.com',
+            role=User.ROLE_SUPPORT,
+            full_name='Homer Simpson',
+            phone_number='+345678913',
+        )
+
+        self.client1 = self.create_client(
+            email='Ned@EpicEvents.com',
+            full_name='Ned Flanders',
+            phone_number='+987654321',
+            company_name='Flanders & Co',
+        )
+
+        self.client2 = self.create_client(
+            email='Maude@EpicEvents.com',
+            full_name='Maude Flanders',
+            phone_number='+987654322',
+            company_name='Leftorium',
+        )
+
+        self.event = Event.objects.create(
+            event_name='Gala Flanders', client=self.client1, location='Springfield', notes='Soirée dansante'
+        )
+
+        # Crée un jeton d'accès pour sales_user
+        refresh_sales_user = RefreshToken.for_user(self.sales_user)
+        self.access_token_sales_user = str(refresh_sales_user.access_token)
+
+        # Crée un jeton d'accès pour support_user
+        refresh_support_user = RefreshToken.for_user(self.support_user)
+        self.access_token_support_user = str(refresh_support_user.access_token)
+
+    def search(self, token, **params):
+        """Effectue une requête GET vers la recherche avec le jeton indiqué."""
+        return self.client.get(self.url, params, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_tokenize(self):
+        tokens = tokenize('Soirée chez Ned@EpicEvents.com à 20h')
+        self.assertEqual(tokens, ['soiree', 'chez', 'ned', 'epicevents', 'com', '20h'])
+
+    def test_search_ranked_across_resources(self):
+        response = self.search(self.access_token_sales_user, q='flanders')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Ned Flanders (nom et compagnie) devance Maude Flanders (nom seul) et l'événement
+        results = [(result['resource'], result['id']) for result in response.data['results']]
+        self.assertEqual(results[0], ('clients', self.client1.id))
+        self.assertEqual(set(results), {
+            ('clients', self.client1.id), ('clients', self.client2.id), ('events', self.event.id)
+        })
+
+        # Tous les mots doivent être présents, sans tenir compte des accents ni de la casse
+        response = self.search(self.access_token_sales_user, q='SOIREE springfield')
+        self.assertEqual([result['id'] for result in response.data['results']], [self.event.id])
+        self.assertEqual(response.data['results'][0]['label'], 'Gala Flanders')
+
+        response = self.search(self.access_token_sales_user, q='flanders', type='users')
+        self.assertEqual(response.data['results'], [])
+
+    def test_search_bounds_postings_per_token(self):
+        # Un mot très fréquent : plus d'entrées dans l'index que MAX_TOKEN_POSTINGS
+        SearchToken.objects.bulk_create([
+            SearchToken(resource='clients', object_id=100000 + index, token='springfield')
+            for index in range(MAX_TOKEN_POSTINGS + 50)
+        ] + [SearchToken(resource='clients', object_id=self.client1.id, token='springfield')])
+
+        # Les candidats sont ceux du mot le plus rare, la fréquence des mots est lue de façon bornée
+        with CaptureQueriesContext(connection) as queries:
+            results = search('springfield ned')
+        self.assertEqual([(result['resource'], result['object_id']) for result in results], [
+            ('clients', self.client1.id)
+        ])
+        self.assertEqual(len(queries), 4)
+        self.assertTrue(all(f'LIMIT {MAX_TOKEN_POSTINGS + 1}' in query['sql'] for query in queries[:2]))
+
+    def test_index_follows_updates_and_deletions(self):
+        self.client2.company_name = 'Bowlarama'
+        self.client2.save()
+        response = self.search(self.access_token_sales_user, q='bowlarama')
+        self.assertEqual([result['id'] for result in response.data['results']], [self.client2.id])
+
+        self.client2.delete()
+        self.assertFalse(SearchToken.objects.filter(resource='clients', object_id=self.client2.id).exists())
+
+    def test_support_user_only_finds_own_events(self):
+        response = self.search(self.access_token_support_user, q='gala')
+        self.assertEqual(response.data['results'], [])
+
+        self.event.support_contact = self.support_user
+        self.event.save()
+        response = self.search(self.access_token_support_user, q='gala')
+        self.assertEqual([result['id'] for result in response.data['results']], [self.event.id])
+
+    def test_invalid_search(self):
+        self.assertEqual(self.search(self.access_token_sales_user).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.search(self.access_token_sales_user, q='ned', type='contracts')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_search_index(self):
+        SearchToken.objects.all().delete()
+        call_command('rebuild_search_index', stdout=StringIO())
+
+        response = self.search(self.access_token_sales_user, q='leftorium')
+        self.assertEqual([result['id'] for result in response.data['results']], [self.client2.id])
+
+
+@pytest.mark.django_db
+class TestAutocompleteView(TestCase):
+    """
+        Classe de tests pour l'autocomplétion des noms (AutocompleteView) et son index en mémoire.
+    """
+    url = '/crm/autocomplete/'
+
+    def create_user(self, email, role, full_name, phone_number, is_staff=True):
+        """
+            Crée et retourne un utilisateur avec les paramètres spécifiés.
+        """
+        return User.objects.create_user(
+            email=email,
+            password='Pingou123',
+            role=role,
+            full_name=full_name,
+            phone_number=phone_number,
+            is_staff=is_staff,
+        )
+
+    def setUp(self):
+        """
+            Mets en place les données nécessaires pour les tests.
+        """
+        # L'index est partagé par le processus : il est reconstruit pour chaque test
+        autocomplete_index.reset()
+
+        self.sales_user = self.create_user(
+            email='Timothy@EpicEvents-Sales.com',
+            role=User.ROLE_SALES,
+            full_name='Timothy Lovejoy',
+            phone_number='+345678912',
+        )
+
+        self.support_user = self.create_user(
+            email='Homer@EpicEvents-Support.com',
+            role=User.ROLE_SUPPORT,
+            full_name='Homer Simpson',
+            phone_number='+345678913',
+        )
+
+        self.client1 = Client.objects.create(
+            email='Ned@EpicEvents.com', full_name='Ned Flanders', phone_number='+987654321', company_name='Leftorium'
+        )
+
+        # Crée un jeton d'accès pour sales_user
+        refresh_sales_user = RefreshToken.for_user(self.sales_user)
+        self.access_token_sales_user = str(refresh_sales_user.access_token)
+
+    def tearDown(self):
+        """
+            Méthode appelée après l'exécution de chaque test.
+            Vide l'index, construit à partir des données du test.
+        """
+        autocomplete_index.reset()
+
+    def autocomplete(self, **params):
+        """Effectue une requête GET vers l'autocomplétion avec le jeton de sales_user."""
+        return self.client.get(self.url, params, HTTP_AUTHORIZATION=f'Bearer {self.access_token_sales_user}')
+
+    def test_autocomplete_by_scope(self):
+        # Complète le début de n'importe quel mot du nom ou de la compagnie
+        response = self.autocomplete(q='fla', type='clients')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [
+            {'id': self.client1.id, 'full_name': 'Ned Flanders', 'company_name': 'Leftorium'}
+        ])
+        self.assertEqual(self.autocomplete(q='LEFT', type='clients').data['results'][0]['id'], self.client1.id)
+
+        # Les utilisateurs sont séparés par rôle
+        self.assertEqual(self.autocomplete(q='hom', type='support').data['results'][0]['id'], self.support_user.id)
+        self.assertEqual(self.autocomplete(q='hom', type='sales').data['results'], [])
+
+        self.assertEqual(self.autocomplete(q='ned', type='contracts').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_autocomplete_without_queries(self):
+        autocomplete_index.ensure_built()
+        with CaptureQueriesContext(connection) as queries:
+            results = autocomplete_index.lookup('clients', 'ned f')
+        self.assertEqual([result['id'] for result in results], [self.client1.id])
+        self.assertEqual(len(queries), 0)
+
+    def test_autocomplete_incremental_updates(self):
+        autocomplete_index.ensure_built()
+
+        # Les modifications sont appliquées à l'index une fois la transaction validée
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client1.full_name = 'Rod Flanders'
+            self.client1.save()
+        self.assertEqual(autocomplete_index.lookup('clients', 'ned'), [])
+        self.assertEqual(autocomplete_index.lookup('clients', 'rod')[0]['id'], self.client1.id)
+
+        # Un changement de rôle déplace l'utilisateur
+        with self.captureOnCommitCallbacks(execute=True):
+            self.support_user.role = User.ROLE_SALES
+            self.support_user.save()
+        self.assertEqual(autocomplete_index.lookup('support', 'homer'), [])
+        self.assertEqual(autocomplete_index.lookup('sales', 'homer')[0]['id'], self.support_user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client1.delete()
+        self.assertEqual(autocomplete_index.lookup('clients', 'rod'), [])
+
+    def test_trigram_index_skips_frequent_trigrams(self):
+        index = TrigramIndex()
+        index.build([(object_id, f"Client {object_id}") for object_id in range(MAX_TRIGRAM_POSTINGS + 100)])
+        index.add(-1, 'Ned Flanders')
+
+        # Les trigrammes communs à tous les noms (« cli », « ent », ...) ne fournissent pas de candidats
+        self.assertEqual(index.nearest('Ned Flandres', limit=1, min_similarity=0.3)[0][1], -1)
+        self.assertEqual(index.nearest('Client 42', limit=1, min_similarity=0.3), [(1.0, 42)])
+
+        # Un nom dont tous les trigrammes sont fréquents est tout de même évalué, sur un nombre borné de candidats
+        self.assertEqual(len(index.nearest('Client', limit=5, min_similarity=0.0)), 5)
+
+    def test_autocomplete_replays_changes_made_during_build(self):
+        class RacingIndex(AutocompleteIndex):
+            """Index recevant la modification d'un client pendant la lecture des données de la construction."""
+            def get_client_item(self, client_id, full_name, company_name):
+                if full_name == 'Ned Flanders':
+                    self.update_client(client_id, 'Rod Flanders', company_name)
+                return super().get_client_item(client_id, full_name, company_name)
+
+        index = RacingIndex()
+        index.ensure_built()
+
+        # La modification reçue pendant la lecture est rejouée sur le nouvel index après l'échange
+        self.assertEqual(index.lookup('clients', 'ned'), [])
+        self.assertEqual(index.lookup('clients', 'rod')[0]['full_name'], 'Rod Flanders')
+        self.assertIsNone(index.pending)
+
+    def test_autocomplete_single_flight_rebuild(self):
+        autocomplete_index.ensure_built()
+        built_at = autocomplete_index.built_at
+
+        # Une reconstruction est déjà en cours : aucune autre n'est lancée
+        autocomplete_index.build_lock.acquire()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                autocomplete_index.rebuild()
+        finally:
+            autocomplete_index.build_lock.release()
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(autocomplete_index.built_at, built_at)
+
+        # Un index ancien n'est jamais reconstruit sur le chemin des requêtes
+        autocomplete_index.built_at -= 3600
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.autocomplete(q='ned', type='clients').status_code, status.HTTP_200_OK)
+        self.assertFalse(any('profiles_client' in query['sql'] for query in queries))
@@ -0,0 +1,30 @@
+import re
+import unicodedata
+
+
+# Longueurs minimale et maximale d'un mot indexé
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 64
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_text(text):
+    """Renvoie le texte en minuscules et sans accents, utilisé pour l'indexation et la recherche."""
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+
+
+def split_words(text):
+    """Renvoie les mots normalisés du texte, sans filtrer leur longueur."""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(normalize_text(text))
+
+
+def tokenize(text):
+    """
+        Découpe un texte en mots normalisés : minuscules, sans accents,
+        en ignorant les mots trop courts et en tronquant les mots trop longs.
+    """
+    return [token[:MAX_TOKEN_LENGTH] for token in split_words(text) if len(token) >= MIN_TOKEN_LENGTH]
@@ -0,0 +1,116 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .autocomplete import AUTOCOMPLETE_SCOPES, autocomplete_index
+from .models import SEARCH_RESOURCES, search
+from events.models import Event
+from profiles.models import User
+
+
+class SearchView(APIView):
+    """
+        Vue de recherche plein texte sur les clients, les événements et les utilisateurs (CRM).
+
+        La recherche utilise l'index inversé (SearchToken) : un objet est renvoyé s'il contient
+        tous les mots recherchés, et les résultats sont classés selon le poids des champs concernés.
+        Un membre de l'équipe support ne trouve que les événements qui lui sont associés.
+
+        Paramètres :
+            - q : texte recherché.
+            - type : ressources interrogées, séparées par des virgules (clients, events, users ; toutes par défaut).
+            - limit : nombre maximum de résultats (20 par défaut, 50 au maximum).
+    """
+    permission_classes = [IsAuthenticated]
+
+    default_limit = 20
+    max_limit = 50
+
+    def get(self, request):
+        """Renvoie les objets correspondant à la recherche, classés par pertinence."""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': "The q parameter is required."})
+
+        resources = [name.strip() for name in request.query_params.get('type', '').split(',') if name.strip()]
+        unknown = [name for name in resources if name not in SEARCH_RESOURCES]
+        if unknown:
+            raise ValidationError({'type': f"Unknown resource(s): {', '.join(unknown)}."})
+
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+            if limit < 1:
+                raise ValueError("Invalid limit.")
+        except ValueError:
+            raise ValidationError({'limit': "Invalid limit."})
+
+        visible = {}
+        if request.user.role == User.ROLE_SUPPORT:
+            # Un membre de l'équipe support ne voit que ses événements (comme pour all_events_details)
+            visible['events'] = Event.objects.filter(support_contact=request.user)
+
+        matches = search(query, limit=limit, resources=resources or None, visible=visible)
+        labels = self.get_labels(matches)
+
+        results = [
+            {
+                'resource': match['resource'],
+                'id': match['object_id'],
+                'label': labels[match['resource']][match['object_id']],
+                'score': match['score'],
+            }
+            for match in matches
+            # Un objet supprimé sans passer par save()/delete() peut subsister dans l'index
+            if match['object_id'] in labels[match['resource']]
+        ]
+        return Response({'query': query, 'results': results})
+
+    def get_labels(self, matches):
+        """Renvoie les libellés des objets trouvés ({ressource: {id: libellé}}), en une requête par ressource."""
+        ids = {}
+        for match in matches:
+            ids.setdefault(match['resource'], []).append(match['object_id'])
+
+        labels = {resource: {} for resource in SEARCH_RESOURCES}
+        for resource, object_ids in ids.items():
+            config = SEARCH_RESOURCES[resource]
+            labels[resource] = dict(
+                config['model'].objects.filter(pk__in=object_ids).values_list('pk', config['label'])
+            )
+        return labels
+
+
+class AutocompleteView(APIView):
+    """
+        Vue d'autocomplétion des noms de clients et d'utilisateurs (CRM).
+
+        Les noms sont ceux attendus par les champs client, sales_contact et support_contact
+        des contrats et des événements. La réponse est calculée à partir de l'index en mémoire,
+        sans requête en base de données.
+
+        Paramètres :
+            - q : début du nom saisi (un mot du nom ou de la compagnie peut être complété).
+            - type : périmètre (clients, sales, support ou management).
+            - limit : nombre maximum de résultats (10 par défaut, 50 au maximum).
+    """
+    permission_classes = [IsAuthenticated]
+
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request):
+        """Renvoie les noms commençant par le texte saisi."""
+        scope = request.query_params.get('type', '')
+        if scope not in AUTOCOMPLETE_SCOPES:
+            raise ValidationError({'type': f"The type parameter must be one of: {', '.join(AUTOCOMPLETE_SCOPES)}."})
+
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+            if limit < 1:
+                raise ValueError("Invalid limit.")
+        except ValueError:
+            raise ValidationError({'limit': "Invalid limit."})
+
+        query = request.query_params.get('q', '')
+        return Response({'query': query, 'results': autocomplete_index.lookup(scope, query, limit)})